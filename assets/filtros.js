@@ -0,0 +1,118 @@
+/* ========================================================================== */
+/* Filtros em lote (ver src/components/filtros.py)                            */
+/* ========================================================================== */
+/* Monta um único estado de filtro a partir dos controles da página e só o    */
+/* grava no dcc.Store quando o usuário clica em "Aplicar filtros" ou, no      */
+/* modo debounce, depois de um intervalo sem novas mudanças.                  */
+/*                                                                            */
+/* Também mantém o cache de resultados no navegador ("figuras-cache"):        */
+/* pagina|estado -> valores das saídas do callback da página. Grupos de      */
+/* saídas secundárias ("page3-tabela") usam o mesmo cache; os valores dos     */
+/* controles de que dependem vão em estado.extras e entram na chave.          */
+/* -------------------------------------------------------------------------- */
+
+(function () {
+    var timers = {};
+    var MAX_ITENS_CACHE = 24;
+
+    function montarEstado(programa, curso, status, inicio, fim) {
+        var lista = function (v) { return (v && v.length) ? v : null; };
+        return {
+            programa: lista(programa),
+            curso: lista(curso),
+            status: lista(status),
+            inicio: inicio || null,
+            fim: fim || null
+        };
+    }
+
+    function mesmoEstado(a, b) {
+        return JSON.stringify(a) === JSON.stringify(b);
+    }
+
+    function chaveCache(pagina, estado) {
+        estado = estado || {};
+        var partes = ["programa", "curso", "status", "inicio", "fim"].map(function (campo) {
+            var v = estado[campo];
+            if (Array.isArray(v)) { return v.slice().sort(); }
+            return v ? String(v).slice(0, 10) : null;
+        });
+        if (estado.extras !== undefined) { partes.push(estado.extras); }
+        return pagina + "|" + JSON.stringify(partes, chavesOrdenadas);
+    }
+
+    /* Objetos nos extras (ex.: seleção cruzada) com as chaves sempre na      */
+    /* mesma ordem, venham do navegador ou da resposta do servidor            */
+    function chavesOrdenadas(_chave, valor) {
+        if (valor && typeof valor === "object" && !Array.isArray(valor)) {
+            return Object.keys(valor).sort().reduce(function (ordenado, k) {
+                ordenado[k] = valor[k];
+                return ordenado;
+            }, {});
+        }
+        return valor;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        filtros: {
+            aplicar: function (n_clicks, programa, curso, status, inicio, fim) {
+                return montarEstado(programa, curso, status, inicio, fim);
+            },
+
+            debounce: function (programa, curso, status, inicio, fim, storeId, atual, atrasoMs) {
+                var novo = montarEstado(programa, curso, status, inicio, fim);
+                clearTimeout(timers[storeId]);
+                timers[storeId] = setTimeout(function () {
+                    if (!mesmoEstado(novo, atual)) {
+                        window.dash_clientside.set_props(storeId, {data: novo});
+                    }
+                }, atrasoMs);
+                return window.dash_clientside.no_update;
+            },
+
+            compartilhar: function (estado) {
+                return estado;
+            },
+
+            primeira_pagina: function (estado, pagina) {
+                return pagina ? 0 : window.dash_clientside.no_update;
+            },
+
+            consultar_cache: function (estado, cache, pedidoId) {
+                var no_update = window.dash_clientside.no_update;
+                var n = window.dash_clientside.callback_context.outputs_list.length;
+                var pagina = pedidoId.replace(/^pedido-/, "");
+                var extras = Array.prototype.slice.call(arguments, 3);
+                /* Mesmo formato de filtros.resposta(estado, *extras) no servidor */
+                var pedido = extras.length ? Object.assign({}, estado, {extras: extras}) : estado;
+                var item = (cache && cache.itens) ? cache.itens[chaveCache(pagina, pedido)] : null;
+                if (item) {
+                    return item.concat([no_update]);
+                }
+                var saida = [];
+                for (var i = 0; i < n - 1; i++) { saida.push(no_update); }
+                saida.push(pedido);
+                return saida;
+            },
+
+            guardar_cache: function () {
+                var args = Array.prototype.slice.call(arguments);
+                var estado = args[0];
+                var respostaId = args[args.length - 1];
+                var cache = args[args.length - 2] || {};
+                var valores = args.slice(1, args.length - 2);
+                var pagina = respostaId.replace(/^resposta-/, "");
+                var chave = chaveCache(pagina, estado);
+
+                var itens = Object.assign({}, cache.itens);
+                var ordem = (cache.ordem || []).filter(function (c) { return c !== chave; });
+                itens[chave] = valores;
+                ordem.push(chave);
+                while (ordem.length > MAX_ITENS_CACHE) {
+                    delete itens[ordem.shift()];
+                }
+                return {itens: itens, ordem: ordem};
+            }
+        }
+    });
+})();
@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+import timeit
+
+import pandas as pd
+import plotly.express as px
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import figuras  # noqa: E402
+
+# ============================================================
+# Benchmark: plotly.express x src.figuras (entradas já agregadas)
+# ============================================================
+# Mede, para cada figura pequena do dashboard, o tempo de montar a figura
+# e de montar + serializar em JSON (o que o Dash faz antes de responder).
+#   python benchmarks/bench_figuras.py [repetições]
+TEMPLATE = "plotly_dark"
+TRANSPARENTE = dict(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+
+anos = pd.Series(range(1990, 2026)).astype(str)
+totais = pd.Series(range(10, 10 + len(anos)))
+status = pd.Series([300, 3765, 195], index=["Ativos", "Titulados", "Desligados"])
+cores_status = {"Ativos": "#636EFA", "Titulados": "#00CC96", "Desligados": "#EF553B"}
+programas = pd.Series(range(15, 0, -1), index=[f"Programa {i}" for i in range(15)])
+
+
+def px_fig2():
+    df = pd.DataFrame({"Ano": anos, "Total": totais})
+    fig = px.bar(df, x="Ano", y="Total", title="Número de Matrículas por Ano",
+                 labels={"Ano": "Ano da Matrícula", "Total": "Nº de Alunos"}, template=TEMPLATE, barmode='group')
+    fig.update_traces(text=df["Total"], textposition="outside")
+    fig.update_layout(yaxis=dict(range=[0, totais.max()]), xaxis_tickangle=-45, bargap=0.2, bargroupgap=0.1,
+                      margin=dict(l=20, r=20, t=50, b=20), title_x=0.5, **TRANSPARENTE)
+    return fig
+
+
+def go_fig2():
+    return figuras.barras(anos, totais, "Número de Matrículas por Ano", "Ano da Matrícula", "Nº de Alunos",
+                          texto=True, posicao_texto="outside", yaxis=dict(range=[0, totais.max()]),
+                          xaxis=dict(tickangle=-45), bargap=0.2, bargroupgap=0.1,
+                          margin=dict(l=20, r=20, t=50, b=20), title_x=0.5)
+
+
+def px_fig3():
+    resumo = pd.DataFrame({"Ano": ["2025", "2026"], "Matriculados": [120, 98]})
+    fig = px.bar(resumo, x="Ano", y="Matriculados", title="Comparativo de Matrículas (2025 vs 2026)",
+                 text_auto=True, template=TEMPLATE)
+    fig.update_traces(textposition="outside", textfont=dict(size=14))
+    fig.update_layout(yaxis=dict(range=[0, 120 * 1.2]))
+    fig.update_layout(**TRANSPARENTE)
+    return fig
+
+
+def go_fig3():
+    fig = figuras.barras(["2025", "2026"], [120, 98], "Comparativo de Matrículas (2025 vs 2026)", "Ano",
+                         "Matriculados", texto=True, posicao_texto="outside", yaxis=dict(range=[0, 120 * 1.2]))
+    fig["data"][0]["textfont"] = dict(size=14)
+    return fig
+
+
+def px_fig5():
+    df = status.reset_index()
+    df.columns = ["Status", "Total"]
+    fig = px.pie(df, values="Total", names="Status", title="Distribuição de Status dos Alunos", hole=0.5,
+                 template=TEMPLATE, color="Status", color_discrete_map=cores_status)
+    fig.update_layout(**TRANSPARENTE)
+    return fig
+
+
+def go_fig5():
+    return figuras.pizza(status.index, status.values, "Distribuição de Status dos Alunos", "Status", "Total",
+                         buraco=0.5, cores=cores_status)
+
+
+def px_programa():
+    df = programas.reset_index()
+    df.columns = ["Programa", "Total"]
+    fig = px.bar(df, y="Programa", x="Total", orientation="h", title="Nº de Alunos por Programas", template=TEMPLATE)
+    fig.update_layout(yaxis={"categoryorder": "total ascending"}, xaxis_title="Nº de Alunos", yaxis_title=None,
+                      **TRANSPARENTE)
+    return fig
+
+
+def go_programa():
+    return figuras.barras(programas.index, programas.values, "Nº de Alunos por Programas", "Programa", "Total",
+                          horizontal=True, yaxis={"categoryorder": "total ascending", "title": None},
+                          xaxis={"title": {"text": "Nº de Alunos"}})
+
+
+CASOS = [
+    ("fig2 (matrículas por ano)", px_fig2, go_fig2),
+    ("fig3 (comparativo 2 barras)", px_fig3, go_fig3),
+    ("fig5 (donut de status)", px_fig5, go_fig5),
+    ("programas (barras horizontais)", px_programa, go_programa),
+]
+
+
+def medir(func, repeticoes):
+    return min(timeit.repeat(func, number=repeticoes, repeat=3)) / repeticoes * 1000
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'Figura':<32}{'px (ms)':>10}{'go (ms)':>10}{'ganho':>8}{'px+json':>10}{'go+json':>10}{'ganho':>8}")
+    for nome, com_px, com_go in CASOS:
+        t_px, t_go = medir(com_px, repeticoes), medir(com_go, repeticoes)
+        j_px = medir(lambda: json.dumps(com_px(), cls=PlotlyJSONEncoder), repeticoes)
+        j_go = medir(lambda: json.dumps(com_go(), cls=PlotlyJSONEncoder), repeticoes)
+        print(f"{nome:<32}{t_px:>10.2f}{t_go:>10.2f}{t_px / t_go:>7.0f}x{j_px:>10.2f}{j_go:>10.2f}{j_px / j_go:>7.0f}x")
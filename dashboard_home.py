@@ -1,20 +1,27 @@
+import functools
+import os
+
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, ctx, no_update
 import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 
 # Importar os layouts das páginas
-from pages import home, page1, page2, page3, page4
+from pages import home, page1, page2, page3, page4, page5, page6
+from src import aquecimento, cache, exportacao, figuras, metricas, paralelo, periodos, selecao, tarefas
+from src.components import comparacao, filtros
 
 #===========================================================================|
 #|                           Inicialização do App                          |
 #===========================================================================|
+gerenciador_tarefas = tarefas.criar_gerenciador()
+
 app = dash.Dash(
     __name__,
     external_stylesheets=[dbc.themes.VAPOR, dbc.icons.BOOTSTRAP],
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    background_callback_manager=gerenciador_tarefas
 )
 server = app.server
 
@@ -28,6 +35,7 @@ page1.register_callbacks(app)
 #===========================================================================|
 app.layout = html.Div(className="home-dashboard-scope", children=[
     dcc.Location(id='url', refresh=False),
+    *filtros.stores_globais(),
 
     dbc.Container([
         # Cabeçalho
@@ -53,6 +61,8 @@ app.layout = html.Div(className="home-dashboard-scope", children=[
                                 dbc.Button([html.I(className="bi bi-bar-chart-line-fill me-2"), "Análise Acadêmica"], color="secondary", href="/page2", className="ms-md-2 mt-2 mt-md-0"),
                                 dbc.Button([html.I(className="bi bi-file-earmark-arrow-down-fill me-2"), "Exploração Acadêmica"], color="info", href="/page3", className="ms-md-2 mt-2 mt-md-0"),
                                 dbc.Button([html.I(className="bi bi-file-earmark-person me-2"), "Análise Etária"], color="light", href="/page4", className="ms-md-2 mt-2 mt-md-0"),
+                                dbc.Button([html.I(className="bi bi-grid-3x3-gap-fill me-2"), "Coortes"], color="success", href="/page5", className="ms-md-2 mt-2 mt-md-0"),
+                                dbc.Button([html.I(className="bi bi-exclamation-triangle-fill me-2"), "Risco de Evasão"], color="danger", href="/page6", className="ms-md-2 mt-2 mt-md-0"),
                             ], width="auto", className="text-end")
                         ], justify="between", align="center")
                     ])
@@ -71,56 +81,146 @@ app.layout = html.Div(className="home-dashboard-scope", children=[
 #===========================================================================|
 @app.callback(
     Output('page-content', 'children'),
-    Input('url', 'pathname')
+    Input('url', 'pathname'),
+    State(filtros.ID_GLOBAL, 'data')
 )
-def display_page(pathname):
+def display_page(pathname, estado):
+    # As páginas de análise abrem com o último filtro aplicado na sessão
     if pathname == '/page1':
-        return page1.layout
+        return page1.criar_layout(estado)
     elif pathname == '/page2':
-        return page2.layout
+        return page2.criar_layout(estado)
     elif pathname == '/page3':
-        return page3.layout
+        return page3.criar_layout(estado)
     elif pathname == '/page4':
-        return page4.layout
+        return page4.criar_layout(estado)
+    elif pathname == '/page5':
+        return page5.criar_layout(estado)
+    elif pathname == '/page6':
+        return page6.criar_layout(estado)
     else:
         return home.layout
 
 #===========================================================================|
 #|                    Helpers para gráficos vazios                         |
 #===========================================================================|
-def _empty_fig(title):
-    fig = go.Figure()
-    fig.update_layout(
-        template="plotly_dark",
-        title=title,
-        xaxis_visible=False, yaxis_visible=False,
-        annotations=[dict(text="Sem dados para os filtros", x=0.5, y=0.5, showarrow=False)]
-    )
-    return fig
+def _empty_fig(title, **layout):
+    return figuras.vazia(title, **layout)
 
 #===========================================================================|
 #|              Callbacks para atualizar gráficos da Page2                 |
 #===========================================================================|
+SAIDAS_PAGE2 = [
+    ("fig2", "figure"),
+    ("fig5", "figure"),
+    ("fig6", "figure"),
+    ("fig7", "figure"),
+]
+
+
 @app.callback(
-    [
-        Output("fig2", "figure"),
-        Output("fig3", "figure"),
-        Output("fig5", "figure"),
-        Output("fig6", "figure"),
-        Output("fig7", "figure"),
-        Output("variacao-label", "children"),
-        Output("variacao-label", "className"),
-    ],
-    [
-        Input("filtro-programa", "value"),
-        Input("filtro-curso", "value"),
-        Input("filtro-ativos", "value"),
-        Input("filtro-periodo2", "start_date"),
-        Input("filtro-periodo2", "end_date"),
-    ]
+    filtros.saidas_servidor(SAIDAS_PAGE2, "page2"),
+    Input("pedido-page2", "data"),
+    prevent_initial_call=True,
 )
-def atualizar_page2(programa, curso, status, start_date, end_date):
-    df = page2.df.copy()
+def atualizar_page2(estado):
+    return (*calcular_page2(*filtros.valores(estado)), estado)
+
+
+filtros.registrar_lote("page2", "filtro-programa", "filtro-curso", "filtro-ativos", "filtro-periodo2")
+filtros.registrar_cache("page2", SAIDAS_PAGE2)
+filtros.registrar_opcoes("page2", page2.indice_opcoes, "filtro-programa", "filtro-curso", "filtro-ativos")
+
+
+def estado_padrao_page2():
+    datas = page2.df["Primeira matrícula"]
+    return None, None, None, datas.min().date(), datas.max().date()
+
+
+# fig2 - Matrículas por ano
+def _fig2_matriculas_ano(df):
+    df_matriculas = df.groupby("Ano_matricula").size().reset_index(name="Total").sort_values("Ano_matricula")
+    if df_matriculas.empty:
+        return _empty_fig("Número de Matrículas por Ano", title_x=0.5)
+    return figuras.barras(
+        df_matriculas["Ano_matricula"].astype(str), df_matriculas["Total"],
+        "Número de Matrículas por Ano", "Ano da Matrícula", "Nº de Alunos",
+        texto=True, posicao_texto="outside",
+        yaxis=dict(range=[0, max(df_matriculas["Total"].max(), 5)]),
+        xaxis=dict(tickangle=-45),  # nomes na diagonal
+        bargap=0.2,
+        bargroupgap=0.1,
+        margin=dict(l=20, r=20, t=50, b=20),
+        title_x=0.5
+    )
+
+
+# fig3 - Comparativo (período atual vs anterior) + KPI de variação
+def _fig3_comparativo(contagens, tipo):
+    resultado = periodos.comparar(contagens, tipo)
+    anterior, atual = resultado["anterior"], resultado["atual"]
+    titulo = f"Comparativo de Matrículas ({anterior['rotulo']} vs {atual['rotulo']})"
+    if atual["total"] + anterior["total"] == 0:
+        fig3 = _empty_fig(titulo)
+    else:
+        fig3 = figuras.barras(
+            [anterior["rotulo"], atual["rotulo"]], [anterior["total"], atual["total"]],
+            titulo, periodos.TIPOS[tipo], "Matriculados",
+            texto=True, posicao_texto="outside",
+            yaxis=dict(range=[0, max(anterior["total"], atual["total"]) * 1.2]),  # 20% a mais
+            xaxis=dict(type="category")
+        )
+        fig3["data"][0]["textfont"] = dict(size=14)
+
+    # Variação
+    variacao = resultado["variacao"] or 0
+    variacao_texto = f"{variacao:.2f}%"
+    variacao_classe = "card-text text-center display-4 text-success" if variacao >= 0 else "card-text text-center display-4 text-danger"
+    return fig3, variacao_texto, variacao_classe, f"Variação vs {periodos.ANTERIOR[tipo]}"
+
+
+# fig5  Distribuição de Status dos Alunos (Ativos, Titulados, Desligados)
+def _fig5_status(df):
+    status_categorias = ["Ativos", "Titulados", "Desligados"]
+    df_status = df["Status_aluno"].value_counts().reindex(status_categorias, fill_value=0)
+
+    if df_status.sum() == 0:
+        return _empty_fig("Distribuição de Status dos Alunos")
+    return figuras.pizza(
+        df_status.index, df_status.values,
+        "Distribuição de Status dos Alunos", "Status", "Total",
+        buraco=0.5,
+        cores={
+            "Ativos": "#636EFA",
+            "Titulados": "#00CC96",
+            "Desligados": "#EF553B"
+        }
+    )
+
+
+# fig6 - Nacionalidade
+def _fig6_nacionalidade(df):
+    tot_br = df[df["Nacionalidade"].str.lower() == "brasileira"].shape[0]
+    tot_est = df[~df["Nacionalidade"].str.lower().isin(["brasileira"])].shape[0]
+    if tot_br + tot_est == 0:
+        return _empty_fig("Nacionalidade dos Alunos (Geral)")
+    return figuras.pizza(["Brasileiros", "Estrangeiros"], [tot_br, tot_est],
+                         "Nacionalidade dos Alunos (Geral)", "Nacionalidade", "Total")
+
+
+# fig7 - Estrangeiros
+def _fig7_estrangeiros(df):
+    estrangeiros_counts = df.loc[~df["Nacionalidade"].str.lower().isin(["brasileira"]), "Nacionalidade"].value_counts()
+    if estrangeiros_counts.empty:
+        return _empty_fig("Distribuição de Alunos Estrangeiros")
+    return figuras.barras(estrangeiros_counts.index, estrangeiros_counts.values,
+                          "Distribuição de Alunos Estrangeiros", "País", "Nº de Alunos",
+                          xaxis=dict(tickangle=-45))  # nomes na diagonal
+
+
+def filtrar_page2(programa, curso, status, start_date, end_date, base=None):
+    # `base`: linhas já recortadas por Programa (relatórios em lote, src/relatorios.py)
+    df = (page2.df if base is None else base).copy()
 
     # Filtros
     if programa:
@@ -135,135 +235,240 @@ def atualizar_page2(programa, curso, status, start_date, end_date):
             (df["Primeira matrícula"] >= pd.to_datetime(start_date)) &
             (df["Primeira matrícula"] <= pd.to_datetime(end_date))
         ]
+    return df
 
-    TEMPLATE = "plotly_dark"
-
-    # fig1 - Histograma período
-    fig1 = (_empty_fig("Tempo de Curso (Meses)") if df.empty else
-            px.histogram(df, x="período_meses_inteiros", nbins=50,
-                         title="Tempo de Curso (Meses)",
-                         #labels={"período_meses_inteiros": "Meses desde a Matrícula"},
-                         template=TEMPLATE))
-    fig1.update_layout(
-        yaxis_title="Nº de Alunos",
-        xaxis_title="Meses desde a Matrícula",
-        bargap=0.2,
-        bargroupgap=0.1,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=20, r=20, t=50, b=20),
-        title_x=0.5
-    )
-    # fig2 - Matrículas por ano
-    df_matriculas = df.groupby("Ano_matricula").size().reset_index(name="Total").sort_values("Ano_matricula")
-    if df_matriculas.empty:
-        fig2 = _empty_fig("Número de Matrículas por Ano")
-    else:
-        df_matriculas["Ano"] = df_matriculas["Ano_matricula"].astype(str)
-        fig2 = px.bar(df_matriculas, x="Ano", y="Total",
-                      title="Número de Matrículas por Ano",
-                      labels={"Ano": "Ano da Matrícula", "Total": "Nº de Alunos"},
-                      template=TEMPLATE, barmode='group')
-        fig2.update_traces(text=df_matriculas["Total"], textposition="outside")
-        fig2.update_layout(yaxis=dict(range=[0, max(df_matriculas["Total"].max(), 5)]), # Metodo Antigo 
-        xaxis_tickangle=-45,  # nomes na diagonal    
-        bargap=0.2,
-        bargroupgap=0.1,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=20, r=20, t=50, b=20),
-        title_x=0.5
-        )      
-        
-    # fig3 - Comparativo (ano atual vs anterior)
-    ano_atual = pd.Timestamp.today().year
-    ano_anterior = ano_atual - 1
-    atual = df[df["Ano_matricula"] == ano_atual].shape[0]
-    anterior = df[df["Ano_matricula"] == ano_anterior].shape[0]
-    resumo = pd.DataFrame({"Ano": [str(ano_anterior), str(ano_atual)], "Matriculados": [anterior, atual]})
-    if resumo["Matriculados"].sum() == 0:
-        fig3 = _empty_fig(f"Comparativo de Matrículas ({ano_anterior} vs {ano_atual})")
-    else:
-        fig3 = px.bar(resumo, x="Ano", y="Matriculados",
-                      title=f"Comparativo de Matrículas ({ano_anterior} vs {ano_atual})",
-                      text_auto=True, template=TEMPLATE)        
-        fig3.update_traces(textposition="outside", textfont=dict(size=14))
-        #fig3.update_layout(yaxis=dict(range=[0, max(resumo["Matriculados"].max(), 5)])) # Metodo Antigo       
-        fig3.update_layout(yaxis=dict(range=[0, resumo["Matriculados"].max() * 1.2]))  # 20% a mais
-    fig3.update_layout(
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)"
-    )  
-
-    # fig5  Distribuição de Status dos Alunos (Ativos, Titulados, Desligados)
-    status_categorias = ["Ativos", "Titulados", "Desligados"]
 
-    df_status = (
-    df["Status_aluno"]
-    .value_counts()
-    .reindex(status_categorias, fill_value=0)
-    .reset_index()
+comparacao.registrar("page2", page2.df, filtrar_page2, "Status_aluno")
+
+
+@cache.memoizar("page2", estado_padrao=estado_padrao_page2, versao=2)
+def calcular_page2(programa, curso, status, start_date, end_date, base=None):
+    df = filtrar_page2(programa, curso, status, start_date, end_date, base)
+
+    # Figuras independentes, montadas em paralelo sobre o mesmo recorte
+    return tuple(paralelo.construir_figuras("page2", df, {
+        "fig2": _fig2_matriculas_ano,
+        "fig5": _fig5_status,
+        "fig6": _fig6_nacionalidade,
+        "fig7": _fig7_estrangeiros,
+    }))
+
+
+# Contagens mensais acumuladas do recorte (src/periodos.py): trocar o tipo
+# de período só consulta essas contagens, sem filtrar a tabela de novo
+@cache.memoizar("page2_periodos", estado_padrao=estado_padrao_page2)
+def contagens_page2(programa, curso, status, start_date, end_date, base=None):
+    return periodos.contagens_mensais(filtrar_page2(programa, curso, status, start_date, end_date, base)["Primeira matrícula"])
+
+
+def _status_selecionado(status, sel):
+    # Status clicado no donut (fig5) restringe o filtro de status da página
+    escolhidos = ((sel or {}).get("valores") or {}).get("Status")
+    if not escolhidos:
+        return status
+    return [s for s in (status or escolhidos) if s in escolhidos] or escolhidos
+
+
+SAIDAS_VARIACAO = [
+    ("fig3", "figure"),
+    ("variacao-label", "children"),
+    ("variacao-label", "className"),
+    ("variacao-titulo", "children"),
+]
+filtros.registrar_cache("page2", SAIDAS_VARIACAO, grupo="variacao",
+                        extras=[("variacao-periodo", "value"), ("selecao-page2", "data")])
+
+
+# Período ou seleção novos vão direto ao servidor; estado novo passa antes
+# pelo cache do navegador (grupo "variacao")
+@app.callback(
+    filtros.saidas_servidor(SAIDAS_VARIACAO, "page2", grupo="variacao"),
+    Input(filtros.id_pedido("page2", "variacao"), "data"),
+    Input("variacao-periodo", "value"),
+    Input("selecao-page2", "data"),
+    State(filtros.id_estado("page2"), "data"),
+    prevent_initial_call=True,
 )
-    df_status.columns = ["Status", "Total"]
+def atualizar_variacao(_pedido, tipo, sel, estado):
+    if ctx.triggered_id == "selecao-page2" and not selecao.afeta(sel, ["Status"]):
+        return (no_update,) * (len(SAIDAS_VARIACAO) + 1)
+    programa, curso, status, inicio, fim = filtros.valores(estado)
+    contagens = contagens_page2(programa, curso, _status_selecionado(status, sel), inicio, fim)
+    return (*_fig3_comparativo(contagens, tipo or periodos.PADRAO), filtros.resposta(estado, tipo, sel))
 
-    if df_status["Total"].sum() == 0:
-       fig5 = _empty_fig("Distribuição de Status dos Alunos")
-    else:
-        fig5 = px.pie(
-        df_status,
-        values="Total",
-        names="Status",
-        title="Distribuição de Status dos Alunos",
-        hole=0.5,
-        template=TEMPLATE,
-        color="Status",
-        color_discrete_map={
-            "Ativos": "#636EFA",
-            "Titulados": "#00CC96",
-            "Desligados": "#EF553B"
-        }
-    )
 
-    fig5.update_layout(
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)"
+#===========================================================================|
+#|                  Seleção cruzada entre gráficos da Page2                 |
+#===========================================================================|
+# Clique no donut de status (fig5) ou em um ano (fig2, clique ou caixa)
+# filtra os demais gráficos; cada um só é redesenhado se depende da
+# dimensão alterada, sobre o recorte dos filtros já calculado.
+COLUNAS_SELECAO_PAGE2 = {"Status": "Status_aluno", "Ano": "Ano_matricula"}
+SELECAO_PAGE2 = {
+    # saída: (função da figura, dimensão que o próprio gráfico define)
+    "fig2": (_fig2_matriculas_ano, "Ano"),
+    "fig5": (_fig5_status, "Status"),
+    "fig6": (_fig6_nacionalidade, None),
+    "fig7": (_fig7_estrangeiros, None),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def base_page2(chave):
+    return filtrar_page2(*chave)
+
+
+def _anos(evento):
+    return [int(float(x)) for x in selecao.pontos(evento, "x")]
+
+
+@app.callback(
+    Output("selecao-page2", "data"),
+    Input("fig5", "clickData"),
+    Input("fig2", "clickData"),
+    Input("fig2", "selectedData"),
+    Input("btn-limpar-selecao-page2", "n_clicks"),
+    Input(filtros.id_estado("page2"), "data"),
+    State("selecao-page2", "data"),
+    prevent_initial_call=True,
 )
+def atualizar_selecao_page2(clique_status, clique_ano, caixa_ano, _limpar, _estado, sel):
+    disparo = next(iter(ctx.triggered_prop_ids), None)
+    if disparo == "fig5.clickData":
+        return selecao.alternar(sel, "Status", selecao.pontos(clique_status, "label"))
+    if disparo == "fig2.clickData":
+        return selecao.alternar(sel, "Ano", _anos(clique_ano))
+    if disparo == "fig2.selectedData":
+        return selecao.alternar(sel, "Ano", _anos(caixa_ano))
+    if disparo == "btn-limpar-selecao-page2.n_clicks":
+        return selecao.limpar(sel)
+    # Filtros novos: os gráficos já são redesenhados pelo callback da página
+    return selecao.vazia()
 
-    # fig6 - Nacionalidade
-    tot_br = df[df["Nacionalidade"].str.lower() == "brasileira"].shape[0]
-    tot_est = df[~df["Nacionalidade"].str.lower().isin(["brasileira"])].shape[0]
-    df_nac = pd.DataFrame({"Nacionalidade": ["Brasileiros", "Estrangeiros"], "Total": [tot_br, tot_est]})
-    fig6 = (_empty_fig("Nacionalidade dos Alunos (Geral)") if df_nac["Total"].sum() == 0
-            else px.pie(df_nac, values="Total", names="Nacionalidade",
-                        title="Nacionalidade dos Alunos (Geral)", template=TEMPLATE))
-    fig6.update_layout(
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)"
-    )
 
-    # fig7 - Estrangeiros
-    estrangeiros_counts = (
-        df[~df["Nacionalidade"].str.lower().isin(["brasileira"])]
-        .value_counts(subset=["Nacionalidade"]).reset_index(name="Total")
-        .rename(columns={"Nacionalidade": "País"})
-    )
-    fig7 = (_empty_fig("Distribuição de Alunos Estrangeiros") if estrangeiros_counts.empty
-            else px.bar(estrangeiros_counts, x="País", y="Total",
-                        title="Distribuição de Alunos Estrangeiros",
-                        labels={"País": "País", "Total": "Nº de Alunos"},
-                        template=TEMPLATE))
-    fig7.update_layout(
-    xaxis_tickangle=-45,  # nomes na diagonal
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)"
-    )
+@app.callback(
+    *[Output(saida, "figure", allow_duplicate=True) for saida in SELECAO_PAGE2],
+    Output("selecao-page2-texto", "children"),
+    Input("selecao-page2", "data"),
+    State(filtros.id_estado("page2"), "data"),
+    prevent_initial_call=True,
+)
+def aplicar_selecao_page2(sel, estado):
+    base = base_page2(cache.chave_filtros(filtros.valores(estado)))
+    saidas = []
+    for figura, propria in SELECAO_PAGE2.values():
+        dependencias = [d for d in COLUNAS_SELECAO_PAGE2 if d != propria]
+        if selecao.afeta(sel, dependencias):
+            saidas.append(figura(selecao.aplicar(base, sel, COLUNAS_SELECAO_PAGE2, ignorar=(propria,))))
+        else:
+            saidas.append(no_update)
+    return (*saidas, selecao.descrever(sel))
+
+#===========================================================================|
+#|        Análise histórica por coorte da Page2 (em segundo plano)          |
+#===========================================================================|
+def analise_coortes_historica(set_progress, n_clicks, estado):
+    programa, curso = filtros.valores(estado)[:2]
+    df = page2.df
+    if programa:
+        df = df[df["Programa"].isin(programa)]
+    if curso:
+        df = df[df["Curso"].isin(curso)]
+
+    anos = sorted(df["Ano_matricula"].dropna().unique())
+    if not anos:
+        return _empty_fig("Análise Histórica por Coorte")
+
+    linhas = []
+    for i, ano in enumerate(anos, start=1):
+        coorte = df[df["Ano_matricula"] == ano]
+        contagem = coorte["Status_aluno"].value_counts()
+        tempo_mediano = coorte.loc[coorte["Status_aluno"] == "Titulados", "período_meses_inteiros"].median()
+        for status_aluno in ["Ativos", "Titulados", "Desligados", "Outros"]:
+            linhas.append({
+                "Coorte": str(int(ano)),
+                "Status": status_aluno,
+                "Alunos": int(contagem.get(status_aluno, 0)),
+                "Percentual": 100 * contagem.get(status_aluno, 0) / len(coorte),
+                "Meses até titular (mediana)": tempo_mediano,
+            })
+        set_progress((100 * i / len(anos), f"Coorte {int(ano)} ({i}/{len(anos)})"))
+
+    resumo = pd.DataFrame(linhas)
+    fig = px.bar(resumo, x="Coorte", y="Percentual", color="Status",
+                 title="Situação Atual por Coorte de Ingresso (%)",
+                 hover_data=["Alunos", "Meses até titular (mediana)"],
+                 color_discrete_map={
+                     "Ativos": "#636EFA",
+                     "Titulados": "#00CC96",
+                     "Desligados": "#EF553B",
+                     "Outros": "#AB63FA"
+                 },
+                 template=figuras.TEMPLATE)
+    fig.update_layout(barmode="stack", xaxis_tickangle=-45, yaxis_title="% da Coorte", title_x=0.5)
+    return fig
 
-    # Variação
-    variacao = ((atual - anterior) / anterior) * 100 if anterior > 0 else 0
-    variacao_texto = f"{variacao:.2f}%"
-    variacao_classe = "card-text text-center display-4 text-success" if variacao >= 0 else "card-text text-center display-4 text-danger"
 
-    return fig2, fig3, fig5, fig6, fig7, variacao_texto, variacao_classe
+if gerenciador_tarefas is not None:
+    app.callback(
+        Output("fig-coortes-historico", "figure"),
+        Input("btn-coortes", "n_clicks"),
+        State(filtros.id_estado("page2"), "data"),
+        background=True,
+        running=[
+            (Output("btn-coortes", "disabled"), True, False),
+            (Output("btn-cancelar-coortes", "disabled"), False, True),
+        ],
+        cancel=[Input("btn-cancelar-coortes", "n_clicks")],
+        progress=[Output("progresso-coortes", "value"), Output("progresso-coortes", "label")],
+        prevent_initial_call=True,
+        # n_clicks fora da chave: clicar de novo com o mesmo filtro reaproveita a tarefa
+        cache_args_to_ignore=[0],
+    )(analise_coortes_historica)
+
+
+#===========================================================================|
+#|        Exportação dos alunos filtrados da Page3 (downloads)              |
+#===========================================================================|
+exportacao.registrar_rotas(server, page3.dados_exportacao)
+
+
+def exportacao_segundo_plano(set_progress, n_clicks, estado, formato):
+    # Exportações grandes: o arquivo é gravado em disco e reaproveitado
+    # enquanto o filtro e a versão dos dados forem os mesmos
+    nome = exportacao.nome_arquivo(estado or {}, formato)
+    destino = os.path.join(exportacao.EXPORTACOES_DIR, nome)
+    if not os.path.exists(destino):
+        df = page3.dados_exportacao(*filtros.valores(estado))
+        exportacao.gravar(df, formato, destino,
+                          lambda escritas, total: set_progress((100 * escritas / total, f"{escritas}/{total} linhas")))
+    set_progress((100, "Arquivo pronto"))
+    return html.A([html.I(className="bi bi-download me-2"), "Baixar arquivo"], href=f"/exportar/arquivos/{nome}")
+
+
+if gerenciador_tarefas is not None:
+    app.callback(
+        Output("exportacao-link", "children", allow_duplicate=True),
+        Input("btn-gerar-exportacao", "n_clicks"),
+        State(filtros.id_estado("page3"), "data"),
+        State("exportar-formato", "value"),
+        background=True,
+        running=[(Output("btn-gerar-exportacao", "disabled"), True, False)],
+        progress=[Output("progresso-exportacao", "value"), Output("progresso-exportacao", "label")],
+        prevent_initial_call=True,
+        cache_args_to_ignore=[0],
+    )(exportacao_segundo_plano)
+
+#===========================================================================|
+#|              API de métricas (JSON para outros sistemas)                 |
+#===========================================================================|
+metricas.registrar_rotas(server)
+
+#===========================================================================|
+#|          Aquecimento do cache (após registrar todos os callbacks)        |
+#===========================================================================|
+aquecimento.registrar_rota(server)
+aquecimento.iniciar()
 
 #===========================================================================|
 #|                             Executar o App                              |
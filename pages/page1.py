@@ -1,9 +1,11 @@
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 import os
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, State
+
+from src import cache, dimensoes, figuras, paralelo, previsao, sobrevivencia
+from src.components import filtros
 
 # ============================================================
 # Carregar os dados
@@ -61,196 +63,306 @@ programas_opcoes = sorted(df["Programa"].dropna().unique()) if "Programa" in df.
 cursos_opcoes = sorted(df["Curso"].dropna().unique()) if "Curso" in df.columns else []
 status_opcoes = ["Ativos", "Titulados", "Desligados"]
 
+# Opções dependentes: contagens por Programa x Curso x Status x data de ingresso
+indice_opcoes = dimensoes.IndiceDimensoes(
+    df, {"programa": "Programa", "curso": "Curso", "status": "Status"}, "Primeira matrícula",
+    permitidos={"status": status_opcoes},
+) if {"Programa", "Curso", "Status", "Primeira matrícula"} <= set(df.columns) else None
+
+ESTRATOS_SOBREVIVENCIA = ["Curso", "Programa"]
+
 # ============================================================
 # Configuração de tema e figura vazia
 # ============================================================
-TEMPLATE = "plotly_dark"
-
 def create_empty_fig(title: str):
-    fig = go.Figure()
-    fig.update_layout(
-        title=f"{title} - Sem dados",
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(color="#CCCCCC"),
-        xaxis_visible=False,
-        yaxis_visible=False,
-        annotations=[dict(text="Sem dados para exibir", showarrow=False, font=dict(size=14, color="#CCCCCC"))],
-    )
+    fig = figuras.vazia(f"{title} - Sem dados", "Sem dados para exibir", font=dict(color="#CCCCCC"))
+    fig["layout"]["annotations"][0]["font"] = dict(size=14, color="#CCCCCC")
     return fig
 
 # ============================================================
 # Layout da Página 1
 # ============================================================
-layout = dbc.Container([
+def criar_layout(estado=None):
+    estado = filtros.restaurar(
+        estado, programas_opcoes, cursos_opcoes, status_opcoes,
+        df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
+        df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
+    )
+    return dbc.Container([
 
-    dbc.Row(
-        dbc.Col(
-            html.H2("Informações Pessoais e Acadêmicas", className="text-center text-primary my-4"),
-            width=12
-        )
-    ),
-    dbc.Row(
-        dbc.Col(html.H1("Filtros Analíticos", className="text-center my-4"), width=12)
-    ),
-
-    # ===================== Linha de Filtros =====================
-    dbc.Row([
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    dbc.Row([
-
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-programa',
-                                options=[{'label': i, 'value': i} for i in programas_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Programa(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-curso',
-                                options=[{'label': i, 'value': i} for i in cursos_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Curso(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-status',
-                                options=[{'label': i, 'value': i} for i in status_opcoes],
-                                multi=True,
-                                placeholder="Selecione o Status (Ativos / Titulados / Desligados)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-
-                        dbc.Col(
-                            dcc.DatePickerRange(
-                                id='filtro-periodo2',
-                                min_date_allowed=df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
-                                max_date_allowed=df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
-                                start_date=df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
-                                end_date=df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
-                                display_format='DD/MM/YYYY',
-                                style={"height": "38px", "width": "100%"}
-                            ), md=3
-                        ),
+        dbc.Row(
+            dbc.Col(
+                html.H2("Informações Pessoais e Acadêmicas", className="text-center text-primary my-4"),
+                width=12
+            )
+        ),
+        dbc.Row(
+            dbc.Col(html.H1("Filtros Analíticos", className="text-center my-4"), width=12)
+        ),
 
+        # ===================== Linha de Filtros =====================
+        dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-programa',
+                                    value=estado["programa"],
+                                    options=filtros.opcoes_programa("page1", estado),  # demais opções: busca no servidor
+                                    multi=True,
+                                    placeholder="Selecione o(s) Programa(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-curso',
+                                    value=estado["curso"],
+                                    options=[{'label': i, 'value': i} for i in cursos_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione o(s) Curso(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-status',
+                                    value=estado["status"],
+                                    options=[{'label': i, 'value': i} for i in status_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione o Status (Ativos / Titulados / Desligados)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+
+                            dbc.Col(
+                                dcc.DatePickerRange(
+                                    id='filtro-periodo2',
+                                    min_date_allowed=df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
+                                    max_date_allowed=df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
+                                    start_date=estado["inicio"],
+                                    end_date=estado["fim"],
+                                    updatemode='bothdates',
+                                    display_format='DD/MM/YYYY',
+                                    style={"height": "38px", "width": "100%"}
+                                ), md=3
+                            ),
+
+                        ]),
+                        filtros.controles_lote("page1", estado, grupos=["sobrevivencia"]),
                     ])
-                ])
-            ], className="bg-dark"),
-            width=12,
-            className="mb-4"
-        )
-    ]),
+                ], className="bg-dark"),
+                width=12,
+                className="mb-4"
+            )
+        ]),
 
-    # ===================== Linha de Gráficos =====================
-    dbc.Row([
-        html.H4("Perfil Demográfico", className="text-secondary mb-3"),
-        dbc.Col(dcc.Graph(id='raca-graph', style={"height": "400px"}), md=6, className="mb-4"),
-        dbc.Col(dcc.Graph(id='titulacao-graph', style={"height": "400px"}), md=6, className="mb-4"),
-    ], className="g-4"),
+        # ===================== Linha de Gráficos =====================
+        dbc.Row([
+            html.H4("Perfil Demográfico", className="text-secondary mb-3"),
+            dbc.Col(dcc.Graph(id='raca-graph', style={"height": "400px"}), md=6, className="mb-4"),
+            dbc.Col(dcc.Graph(id='titulacao-graph', style={"height": "400px"}), md=6, className="mb-4"),
+        ], className="g-4"),
 
-    dbc.Row([
-        html.H4("Perfil Acadêmico e Financeiro", className="text-secondary my-3"),
-        dbc.Col(dcc.Graph(id='financiamento-graph', style={"height": "400px"}), md=12, className="mb-4"),
-    ], className="g-4"),
+        dbc.Row([
+            html.H4("Tempo até a Titulação (Kaplan–Meier)", className="text-secondary my-3"),
+            dbc.Col(
+                dbc.RadioItems(
+                    id='sobrevivencia-estrato',
+                    options=[{'label': f"Por {i}", 'value': i} for i in ESTRATOS_SOBREVIVENCIA],
+                    value=ESTRATOS_SOBREVIVENCIA[0],
+                    inline=True,
+                ), md=12
+            ),
+            dbc.Col(dcc.Graph(id='sobrevivencia-graph', style={"height": "420px"}), md=12, className="mb-4"),
+        ], className="g-4"),
 
-], fluid=True)
+        dbc.Row([
+            html.H4("Titulações Previstas (alunos ativos)", className="text-secondary my-3"),
+            dbc.Col(dcc.Graph(id='previsao-graph', style={"height": "400px"}), md=12, className="mb-4"),
+        ], className="g-4"),
+
+        dbc.Row([
+            html.H4("Perfil Acadêmico e Financeiro", className="text-secondary my-3"),
+            dbc.Col(dcc.Graph(id='financiamento-graph', style={"height": "400px"}), md=12, className="mb-4"),
+        ], className="g-4"),
+
+    ], fluid=True)
+
+
+layout = criar_layout()
 
 # ============================================================
 # Callbacks
 # ============================================================
+def estado_padrao():
+    inicio = df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None
+    fim = df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None
+    return None, None, None, inicio, fim
+
+
+# ===================== Gráfico Raça/Cor =====================
+def figura_raca(dff):
+    if "Raça/Cor" in dff.columns and not dff["Raça/Cor"].dropna().empty:
+        raca = dff["Raça/Cor"].fillna("Sem informação").replace("", "Sem informação")
+        df_raca = raca.value_counts()
+        return figuras.barras(
+            df_raca.index, df_raca.values,
+            "Distribuição por Raça/Cor", "Raça/Cor", "Total",
+            texto=True, posicao_texto="outside",
+            yaxis=dict(range=[0, df_raca.max() * 1.2]),
+            margin=dict(t=80, b=40, l=40, r=40), xaxis=dict(tickangle=-45)
+        )
+    return create_empty_fig("Raça/Cor")
+
+
+# ===================== Gráfico Titulação =====================
+def figura_titulacao(dff):
+    if "Tempo para titulação (meses)" in dff.columns and not dff.dropna(subset=["Tempo para titulação (meses)"]).empty:
+        fig_titulacao = px.histogram(
+            dff.dropna(subset=["Tempo para titulação (meses)"]),
+            x="Tempo para titulação (meses)",
+            nbins=40,
+            title="Distribuição do Tempo para Titulação",
+            labels={"Tempo para titulação (meses)": "Meses"},
+            template=figuras.TEMPLATE
+        )
+        fig_titulacao.update_layout(bargap=0.2, bargroupgap=0.1, xaxis_title="Meses para Titulação",
+                                    yaxis_title="Quantidade")
+    else:
+        fig_titulacao = create_empty_fig("Tempo para Titulação")
+    return fig_titulacao
+
+
+# ===================== Gráfico Financiamento =====================
+def figura_financiamento(dff):
+    if "Financiamento" in dff.columns and not dff["Financiamento"].dropna().empty:
+        df_fin = dff["Financiamento"].value_counts()
+        return figuras.barras(
+            df_fin.index, df_fin.values,
+            "Fontes de Financiamento", "Financiamento", "Total",
+            texto=True, posicao_texto="outside",
+            yaxis=dict(range=[0, df_fin.max() * 1.2]),
+            margin=dict(t=80, b=40, l=40, r=40), xaxis=dict(tickangle=-45)
+        )
+    return create_empty_fig("Financiamento")
+
+
+def filtrar(programa, curso, status, start_date, end_date, base=None):
+    # `base`: linhas já recortadas por Programa (relatórios em lote, src/relatorios.py)
+    dff = (df if base is None else base).copy()
+
+    # ===================== Aplicar filtros =====================
+    if programa:
+        dff = dff[dff["Programa"].isin(programa)]
+    if curso:
+        dff = dff[dff["Curso"].isin(curso)]
+    if status:
+        dff = dff[dff["Status"].isin(status)]
+    if start_date and end_date and "Primeira matrícula" in dff.columns:
+        dff["Primeira matrícula"] = pd.to_datetime(dff["Primeira matrícula"], errors="coerce")
+        dff = dff[
+            (dff["Primeira matrícula"] >= pd.to_datetime(start_date)) &
+            (dff["Primeira matrícula"] <= pd.to_datetime(end_date))
+        ]
+    return dff
+
+
+# ===================== Tempo até a titulação (Kaplan–Meier) =====================
+# Ativos e desligados entram como censurados (ver src/sobrevivencia.py); a
+# data de corte é a mesma para qualquer filtro (última ocorrência registrada).
+CORTE_DADOS = df["Data da ocorrência"].max() if "Data da ocorrência" in df.columns else None
+
+
+def estado_padrao_sobrevivencia():
+    return (*estado_padrao(), ESTRATOS_SOBREVIVENCIA[0])
+
+
+@cache.memoizar("page1_sobrevivencia", estado_padrao=estado_padrao_sobrevivencia)
+def curvas_titulacao(programa, curso, status, start_date, end_date, estrato):
+    dff = filtrar(programa, curso, status, start_date, end_date)
+    if dff.empty or estrato not in dff.columns:
+        return []
+    meses, titulou = sobrevivencia.tempos_e_eventos(dff, CORTE_DADOS)
+    return sobrevivencia.kaplan_meier(meses, titulou, dff.loc[meses.index, estrato])
+
+
+def figura_sobrevivencia(curvas, estrato):
+    titulo = f"Fração Titulada ao Longo do Tempo por {estrato}"
+    if not curvas:
+        return create_empty_fig("Tempo até a Titulação")
+    nomes = [
+        f"{c['grupo']} (n={c['alunos']}, mediana {c['mediana'] if c['mediana'] is not None else '—'} meses)"
+        for c in curvas
+    ]
+    return figuras.degraus(
+        [c["meses"] for c in curvas], [c["titulados"] for c in curvas], nomes, titulo,
+        "Meses desde a primeira matrícula", "Já titulados",
+        extras=[c["em_risco"] for c in curvas], rotulo_extra="Em risco",
+        legend=dict(orientation="h", yanchor="top", y=-0.2),
+    )
+
+
+# ===================== Titulações previstas =====================
+# As previsões por aluno vêm prontas do artefato (src/previsao.py); aqui só
+# são contadas por trimestre para o recorte filtrado.
+def figura_previsao(resumo):
+    if not resumo["total"]:
+        return create_empty_fig("Titulações Previstas")
+    return figuras.barras(
+        resumo["trimestres"], resumo["alunos"],
+        f"Titulações Previstas por Trimestre ({resumo['total']} alunos ativos)", "Trimestre", "Alunos",
+        texto=True, posicao_texto="outside",
+        yaxis=dict(range=[0, max(resumo["alunos"]) * 1.2]),
+        margin=dict(t=80, b=40, l=40, r=40), xaxis=dict(tickangle=-45, type="category")
+    )
+
+
+@cache.memoizar("page1", estado_padrao=estado_padrao, versao=2)
+def gerar_figuras(programa, curso, status, start_date, end_date, base=None):
+    dff = filtrar(programa, curso, status, start_date, end_date, base)
+
+    # As três figuras são independentes e leem o mesmo recorte filtrado
+    return tuple(paralelo.construir_figuras("page1", dff, {
+        "raca": figura_raca,
+        "titulacao": figura_titulacao,
+        "financiamento": figura_financiamento,
+    }))
+
+
 def register_callbacks(app):
+    saidas = [('raca-graph', 'figure'), ('titulacao-graph', 'figure'), ('financiamento-graph', 'figure'),
+              ('previsao-graph', 'figure')]
+    saidas_sobrevivencia = [('sobrevivencia-graph', 'figure')]
+    filtros.registrar_lote("page1", 'filtro-programa', 'filtro-curso', 'filtro-status', 'filtro-periodo2')
+    filtros.registrar_cache("page1", saidas)
+    filtros.registrar_cache("page1", saidas_sobrevivencia, grupo="sobrevivencia",
+                            extras=[('sobrevivencia-estrato', 'value')])
+    if indice_opcoes is not None:
+        filtros.registrar_opcoes("page1", indice_opcoes, 'filtro-programa', 'filtro-curso', 'filtro-status')
+
     @app.callback(
-        [
-            Output('raca-graph', 'figure'),
-            Output('titulacao-graph', 'figure'),
-            Output('financiamento-graph', 'figure'),
-        ],
-        [
-            Input('filtro-programa', 'value'),
-            Input('filtro-curso', 'value'),
-            Input('filtro-status', 'value'),
-            Input('filtro-periodo2', 'start_date'),
-            Input('filtro-periodo2', 'end_date'),
-        ]
+        filtros.saidas_servidor(saidas, "page1"),
+        Input('pedido-page1', 'data'),
+        prevent_initial_call=True,
     )
-    def atualizar_graficos(programa, curso, status, start_date, end_date):
-        dff = df.copy()
-
-        # ===================== Aplicar filtros =====================
-        if programa:
-            dff = dff[dff["Programa"].isin(programa)]
-        if curso:
-            dff = dff[dff["Curso"].isin(curso)]
-        if status:
-            dff = dff[dff["Status"].isin(status)]
-        if start_date and end_date and "Primeira matrícula" in dff.columns:
-            dff["Primeira matrícula"] = pd.to_datetime(dff["Primeira matrícula"], errors="coerce")
-            dff = dff[
-                (dff["Primeira matrícula"] >= pd.to_datetime(start_date)) &
-                (dff["Primeira matrícula"] <= pd.to_datetime(end_date))
-            ]
-
-        # ===================== Gráfico Raça/Cor =====================
-        if "Raça/Cor" in dff.columns and not dff["Raça/Cor"].dropna().empty:
-            dff["Raça/Cor"] = dff["Raça/Cor"].fillna("Sem informação").replace("", "Sem informação")
-            df_raca = dff["Raça/Cor"].value_counts().reset_index()
-            df_raca.columns = ["Raça/Cor", "Total"]
-
-            fig_raca = px.bar(
-                df_raca, x="Raça/Cor", y="Total",
-                title="Distribuição por Raça/Cor",
-                template=TEMPLATE, text_auto=True
-            )
-            fig_raca.update_traces(textposition="outside")
-            max_value = df_raca["Total"].max()
-            fig_raca.update_yaxes(range=[0, max_value * 1.2])
-            fig_raca.update_layout(margin=dict(t=80, b=40, l=40, r=40), xaxis_tickangle=-45)
-        else:
-            fig_raca = create_empty_fig("Raça/Cor")
-
-        # ===================== Gráfico Titulação =====================
-        if "Tempo para titulação (meses)" in dff.columns and not dff.dropna(subset=["Tempo para titulação (meses)"]).empty:
-            fig_titulacao = px.histogram(
-                dff.dropna(subset=["Tempo para titulação (meses)"]),
-                x="Tempo para titulação (meses)",
-                nbins=40,
-                title="Distribuição do Tempo para Titulação",
-                labels={"Tempo para titulação (meses)": "Meses"},
-                template=TEMPLATE
-            )
-            fig_titulacao.update_yaxes(title_text="Quantidade")
-            fig_titulacao.update_layout(bargap=0.2, bargroupgap=0.1, xaxis_title="Meses para Titulação")
-        else:
-            fig_titulacao = create_empty_fig("Tempo para Titulação")
-
-        # ===================== Gráfico Financiamento =====================
-        if "Financiamento" in dff.columns and not dff["Financiamento"].dropna().empty:
-            df_fin = dff["Financiamento"].value_counts().reset_index()
-            df_fin.columns = ["Financiamento", "Total"]
-            fig_fin = px.bar(
-                df_fin, x="Financiamento", y="Total",
-                title="Fontes de Financiamento",
-                template=TEMPLATE, text_auto=True
-            )
-            fig_fin.update_traces(textposition="outside")
-            max_value = df_fin["Total"].max()
-            fig_fin.update_yaxes(range=[0, max_value * 1.2])
-            fig_fin.update_layout(margin=dict(t=80, b=40, l=40, r=40), xaxis_tickangle=-45)
-        else:
-            fig_fin = create_empty_fig("Financiamento")
-
-        # ===================== Ajuste de Layout =====================
-        for f in [fig_raca, fig_titulacao, fig_fin]:
-            f.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-
-        return fig_raca, fig_titulacao, fig_fin
+    def atualizar_graficos(estado):
+        previstas = figura_previsao(previsao.titulacoes_previstas(*filtros.valores(estado)))
+        return (*gerar_figuras(*filtros.valores(estado)), previstas, estado)
+
+    # Estrato novo vai direto ao servidor; estado novo passa antes pelo cache do navegador
+    @app.callback(
+        filtros.saidas_servidor(saidas_sobrevivencia, "page1", grupo="sobrevivencia"),
+        Input(filtros.id_pedido("page1", "sobrevivencia"), 'data'),
+        Input('sobrevivencia-estrato', 'value'),
+        State(filtros.id_estado("page1"), 'data'),
+        prevent_initial_call=True,
+    )
+    def atualizar_sobrevivencia(_pedido, estrato, estado):
+        figura = figura_sobrevivencia(curvas_titulacao(*filtros.valores(estado), estrato), estrato)
+        return figura, filtros.resposta(estado, estrato)
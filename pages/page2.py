@@ -1,8 +1,10 @@
 import pandas as pd
-import plotly.express as px
 from dateutil.relativedelta import relativedelta
 import dash_bootstrap_components as dbc
 from dash import html, dcc
+
+from src import dimensoes, periodos, selecao
+from src.components import comparacao, filtros
 import os # Certifique-se de que esta linha está no topo do arquivo com os outros imports
 
 # ============================================================
@@ -75,89 +77,149 @@ programas_opcoes = sorted(df["Programa"].dropna().unique()) if "Programa" in df.
 cursos_opcoes = sorted(df["Curso"].dropna().unique()) if "Curso" in df.columns else []
 ativos_opcoes = sorted(df["Status_aluno"].dropna().unique())
 
+# Opções dependentes: contagens por Programa x Curso x Status x data de ingresso
+indice_opcoes = dimensoes.IndiceDimensoes(
+    df, {"programa": "Programa", "curso": "Curso", "status": "Status_aluno"}, "Primeira matrícula",
+)
+
 #|==========================================================================|
 #|                       Layout do Conteúdo da Página 2                     |
 #|==========================================================================|
-layout = dbc.Container([
-    dbc.Row(dbc.Col(html.H2("Dashboard Acadêmico - Análise de Alunos",
-                            className="text-center text-primary my-4"), width=12)),
-    dbc.Row(
-        dbc.Col(html.H1("Filtros Analíticos",
-                        className="text-center my-4"), width=12)
-    ),
-    # Linha de Filtros
-    dbc.Row([
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-programa',
-                                options=[{'label': i, 'value': i} for i in programas_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Programa(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-curso',
-                                options=[{'label': i, 'value': i} for i in cursos_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Curso(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-ativos',
-                                options=[{'label': i, 'value': i} for i in ativos_opcoes],
-                                multi=True,
-                                placeholder="Selecione Status (Ativos/Desligados)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-                        dbc.Col(
-                            dcc.DatePickerRange(
-                            id='filtro-periodo2',
-                            min_date_allowed=df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
-                            max_date_allowed=df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
-                            start_date=df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
-                            end_date=df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
-                            display_format='DD/MM/YYYY',
-                            style={"height": "38px", "width": "100%"}
-                            ), md=3
-                        ),
+def criar_layout(estado=None):
+    estado = filtros.restaurar(
+        estado, programas_opcoes, cursos_opcoes, ativos_opcoes,
+        df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
+        df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
+    )
+    return dbc.Container([
+        dbc.Row(dbc.Col(html.H2("Dashboard Acadêmico - Análise de Alunos",
+                                className="text-center text-primary my-4"), width=12)),
+        dbc.Row(
+            dbc.Col(html.H1("Filtros Analíticos",
+                            className="text-center my-4"), width=12)
+        ),
+        # Linha de Filtros
+        dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-programa',
+                                    value=estado["programa"],
+                                    options=filtros.opcoes_programa("page2", estado),  # demais opções: busca no servidor
+                                    multi=True,
+                                    placeholder="Selecione o(s) Programa(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-curso',
+                                    value=estado["curso"],
+                                    options=[{'label': i, 'value': i} for i in cursos_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione o(s) Curso(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-ativos',
+                                    value=estado["status"],
+                                    options=[{'label': i, 'value': i} for i in ativos_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione Status (Ativos/Desligados)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+                            dbc.Col(
+                                dcc.DatePickerRange(
+                                id='filtro-periodo2',
+                                min_date_allowed=df["Primeira matrícula"].min().date() if "Primeira matrícula" in df.columns else None,
+                                max_date_allowed=df["Primeira matrícula"].max().date() if "Primeira matrícula" in df.columns else None,
+                                start_date=estado["inicio"],
+                                end_date=estado["fim"],
+                                updatemode='bothdates',
+                                display_format='DD/MM/YYYY',
+                                style={"height": "38px", "width": "100%"}
+                                ), md=3
+                            ),
+                        ]),
+                        filtros.controles_lote("page2", estado, grupos=["variacao"]),
                     ])
-                ])
-            ], className="bg-dark"),
-            width=12,
-            className="mb-4"
-        )
-    ]),
-
-    # Gráficos
-    dbc.Row([
-        dbc.Col(dcc.Graph(id="fig2", style={"height": "400px"}), md=12, className="mb-4"),    
-    ], className="g-4"),
-    # Linha do KPI sozinho
-    dbc.Row([
-        dbc.Col(
-            dbc.Card(dbc.CardBody([
-            html.H4("Variação vs Ano Anterior", className="card-title text-center"),
-            html.P(id="variacao-label",
-                   className="card-text text-center display-4 text-success")
-        ])), md=12, className="mb-4")
-    ], className="g-4"),
-
-    # Linha dos gráficos lado a lado
-    dbc.Row([
-        dbc.Col(dcc.Graph(id="fig3"), md=6, className="mb-4"),
-            dbc.Col(dcc.Graph(id="fig5"), md=6, className="mb-4"),
-    ], className="g-4"),
-    dbc.Row([
-        dbc.Col(dcc.Graph(id="fig6"), md=4, className="mb-4"),
-        dbc.Col(dcc.Graph(id="fig7"), md=8, className="mb-4"),
-    ], className="g-4"),
-], fluid=True)
+                ], className="bg-dark"),
+                width=12,
+                className="mb-4"
+            )
+        ]),
+
+        # Seleção cruzada: cliques/caixas nos gráficos filtram os demais
+        dbc.Row([
+            dbc.Col([
+                dcc.Store(id="selecao-page2", data=selecao.vazia()),
+                html.Span(selecao.descrever(None), id="selecao-page2-texto", className="text-muted me-3"),
+                dbc.Button([html.I(className="bi bi-x-circle me-2"), "Limpar seleção"],
+                           id="btn-limpar-selecao-page2", color="secondary", size="sm"),
+            ], md=12, className="mb-3")
+        ]),
+
+        # Gráficos
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="fig2", style={"height": "400px"}), md=12, className="mb-4"),    
+        ], className="g-4"),
+        # Linha do KPI sozinho
+        dbc.Row([
+            dbc.Col(
+                dbc.Card(dbc.CardBody([
+                html.H4("Variação vs Ano Anterior", id="variacao-titulo", className="card-title text-center"),
+                dbc.RadioItems(
+                    id="variacao-periodo",
+                    options=[{"label": nome, "value": tipo} for tipo, nome in periodos.TIPOS.items()],
+                    value=periodos.PADRAO,
+                    inline=True,
+                    className="text-center"
+                ),
+                html.P(id="variacao-label",
+                       className="card-text text-center display-4 text-success")
+            ])), md=12, className="mb-4")
+        ], className="g-4"),
+
+        # Linha dos gráficos lado a lado
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="fig3"), md=6, className="mb-4"),
+                dbc.Col(dcc.Graph(id="fig5"), md=6, className="mb-4"),
+        ], className="g-4"),
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="fig6"), md=4, className="mb-4"),
+            dbc.Col(dcc.Graph(id="fig7"), md=8, className="mb-4"),
+        ], className="g-4"),
+
+        # Comparação de conjuntos de filtros lado a lado
+        dbc.Row([dbc.Col(comparacao.cartao("page2"), md=12)], className="g-4"),
+
+        # Análise pesada: roda em segundo plano (ver src/tarefas.py)
+        dbc.Row([
+            dbc.Col(
+                dbc.Card(dbc.CardBody([
+                    html.H4("Análise Histórica por Coorte", className="card-title text-center"),
+                    html.P("Situação de cada coorte de ingresso ao longo de todo o histórico "
+                           "(respeita os filtros de Programa e Curso).",
+                           className="text-center text-secondary"),
+                    dbc.Row([
+                        dbc.Col(dbc.Button([html.I(className="bi bi-play-fill me-2"), "Gerar análise"],
+                                           id="btn-coortes", color="primary"), width="auto"),
+                        dbc.Col(dbc.Button([html.I(className="bi bi-x-circle me-2"), "Cancelar"],
+                                           id="btn-cancelar-coortes", color="secondary", disabled=True), width="auto"),
+                        dbc.Col(dbc.Progress(id="progresso-coortes", value=0, striped=True, animated=True,
+                                             style={"height": "38px"}), className="align-self-center"),
+                    ], className="g-2 mb-3"),
+                    dcc.Graph(id="fig-coortes-historico", style={"height": "450px"}),
+                ])), md=12, className="mb-4"
+            )
+        ], className="g-4"),
+    ], fluid=True)
+
+
+layout = criar_layout()
@@ -1,9 +1,14 @@
+import functools
+import json
+
 import pandas as pd
-import plotly.express as px
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, dash_table, Input, Output, State, ALL, ClientsideFunction, callback, clientside_callback, ctx, no_update
 import os
 
+from src import cache, config, detalhamento, dimensoes, exportacao, figuras, paralelo, selecao, series, tabela, tarefas, tendencias
+from src.components import comparacao, filtros
+
 # ============================================================
 # Carregar e Tratar Dados
 # ============================================================
@@ -47,120 +52,267 @@ status_opcoes = ["Ativos", "Titulados", "Desligados"]
 min_date = df["Primeira matrícula"].min()
 max_date = df["Primeira matrícula"].max()
 
-TEMPLATE = "plotly_dark"
+# Opções dependentes: contagens por Programa x Curso x Status x data de ingresso
+indice_opcoes = dimensoes.IndiceDimensoes(
+    df, {"programa": "Programa", "curso": "Curso", "status": "Status"}, "Primeira matrícula",
+    permitidos={"status": status_opcoes},
+)
+
+# Tabela de alunos (paginação, ordenação e filtros por coluna no servidor)
+COLUNAS_TABELA = [
+    "NUSP", "Nome", "Programa", "Curso", "Status", "Primeira matrícula",
+    "Última ocorrência", "Data da ocorrência", "Tempo para titulação (meses)",
+    "Último orientador", "Financiamento",
+]
+TAMANHO_PAGINA = 25
+tabela_alunos = tabela.TabelaPaginada(df, COLUNAS_TABELA)
+
+# Médias móveis por (Programa, Curso): matrículas pelo Mes_Ano_Matricula e
+# titulações pelo mês da defesa (ver src/tendencias.py)
+tendencias_alunos = tendencias.Tendencias()
+tendencias_alunos.acrescentar("Matrículas", df["Mes_Ano_Matricula"], df["Programa"], df["Curso"])
+_titulados = df[df["Status"] == "Titulados"]
+if "Data da defesa" in _titulados.columns:
+    tendencias_alunos.acrescentar("Titulações", _titulados["Data da defesa"], _titulados["Programa"], _titulados["Curso"])
 
 # ============================================================
 # Layout da Página
 # ============================================================
-layout = dbc.Container([
-
-    dbc.Row(
-        dbc.Col(html.H1("Informações Acadêmicas", className="text-center text-primary my-4"), width=12)
-    ),
-    dbc.Row(
-        dbc.Col(html.H2("Filtros Analíticos", className="text-center my-4"), width=12)
-    ),
-
-    # ================= Filtros =================
-    dbc.Row([
-        dbc.Col(
-            dbc.Card([
+def criar_layout(estado=None):
+    estado = filtros.restaurar(
+        estado, programas_opcoes, cursos_opcoes, status_opcoes,
+        min_date.date() if pd.notna(min_date) else None,
+        max_date.date() if pd.notna(max_date) else None,
+    )
+    return dbc.Container([
+
+        dbc.Row(
+            dbc.Col(html.H1("Informações Acadêmicas", className="text-center text-primary my-4"), width=12)
+        ),
+        dbc.Row(
+            dbc.Col(html.H2("Filtros Analíticos", className="text-center my-4"), width=12)
+        ),
+
+        # ================= Filtros =================
+        dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-programa',
+                                    value=estado["programa"],
+                                    options=filtros.opcoes_programa("page3", estado),  # demais opções: busca no servidor
+                                    multi=True,
+                                    placeholder="Selecione o(s) Programa(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black"}
+                                ), md=3
+                            ),
+
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-curso',
+                                    value=estado["curso"],
+                                    options=[{'label': i, 'value': i} for i in cursos_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione o(s) Curso(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black"}
+                                ), md=3
+                            ),
+
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-status',
+                                    value=estado["status"],
+                                    options=[{'label': i, 'value': i} for i in status_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione o Status (Ativos/Titulados/Desligados)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black"}
+                                ), md=3
+                            ),
+
+                            dbc.Col(
+                                dcc.DatePickerRange(
+                                    id='filtro-periodo',
+                                    min_date_allowed=min_date.date() if pd.notna(min_date) else None,
+                                    max_date_allowed=max_date.date() if pd.notna(max_date) else None,
+                                    start_date=estado["inicio"],
+                                    end_date=estado["fim"],
+                                    updatemode='bothdates',
+                                    display_format='DD/MM/YYYY',
+                                    style={"backgroundColor": "#2c2c2c", "color": "white"}
+                                ), md=3
+                            )
+
+                        ]),
+                        filtros.controles_lote("page3", estado, grupos=["tabela", "exportacao", "tendencia"]),
+                    ])
+                ], className="bg-dark"),
+                width=12, className="mb-4"
+            )
+        ]),
+
+        # KPI
+        dbc.Row([
+            dbc.Col(dbc.Card([
                 dbc.CardBody([
-                    dbc.Row([
+                    html.H4("Total de Alunos Selecionados", className="card-title text-center"),
+                    html.P(id='kpi-total-alunos', className="display-4 text-center mt-3")
+                ])
+            ]), md=4),
+            # Seleção cruzada: cliques/caixas nos gráficos filtram os demais
+            dbc.Col([
+                dcc.Store(id='selecao-page3', data=selecao.vazia()),
+                dbc.RadioItems(
+                    id='modo-clique-page3',
+                    options=[{'label': "Clique filtra os demais gráficos", 'value': "filtrar"},
+                             {'label': "Clique detalha (drill-down)", 'value': "detalhar"}],
+                    value="filtrar",
+                    inline=True,
+                    className="mb-2"
+                ),
+                html.P(selecao.descrever(None), id='selecao-page3-texto', className="text-muted mb-2"),
+                dbc.Button([html.I(className="bi bi-x-circle me-2"), "Limpar seleção"],
+                           id='btn-limpar-selecao-page3', color="secondary", size="sm"),
+            ], md=8, className="align-self-center"),
+        ]),
+
+        # Gráficos
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='grafico-evolucao-matriculas'), md=8, className="mt-4"),
+            dbc.Col(dcc.Graph(id='grafico-distribuicao-curso'), md=4, className="mt-4"),
+        ], className="g-4"),
 
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='grafico-distribuicao-programa'), md=12, className="mt-4"),
+        ]),
+
+        # Tendências (médias móveis por Programa e Curso)
+        dbc.Row([
+            dbc.Col(dbc.Card([
+                dbc.CardBody([
+                    dbc.Row([
                         dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-programa',
-                                options=[{'label': i, 'value': i} for i in programas_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Programa(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black"}
-                            ), md=3
+                            dbc.RadioItems(
+                                id='tendencia-serie',
+                                options=[{'label': i, 'value': i} for i in tendencias.SERIES],
+                                value=tendencias.SERIES[0],
+                                inline=True,
+                            ), md=6
                         ),
-
                         dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-curso',
-                                options=[{'label': i, 'value': i} for i in cursos_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Curso(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black"}
-                            ), md=3
+                            dbc.RadioItems(
+                                id='tendencia-janela',
+                                options=[{'label': f"{i} meses", 'value': i} for i in tendencias.JANELAS],
+                                value=tendencias.JANELAS[-1],
+                                inline=True,
+                            ), md=6, className="text-end"
                         ),
+                    ]),
+                    dcc.Graph(id='grafico-tendencia'),
+                ])
+            ], className="bg-dark"), md=12, className="mt-4"),
+        ]),
 
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-status',
-                                options=[{'label': i, 'value': i} for i in status_opcoes],
-                                multi=True,
-                                placeholder="Selecione o Status (Ativos/Titulados/Desligados)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black"}
-                            ), md=3
+        # Detalhamento: Programa → Curso → Coorte → Alunos
+        dbc.Row([
+            dbc.Col(dbc.Card([
+                dbc.CardHeader(html.H5("Detalhamento", className="mb-0")),
+                dbc.CardBody([
+                    dcc.Store(id='drill-caminho', data=[]),
+                    html.Div(id='drill-trilha', className="mb-2"),
+                    dcc.Graph(id='grafico-drill'),
+                    html.Div(
+                        dash_table.DataTable(
+                            id='drill-tabela',
+                            columns=tabela_alunos.colunas_datatable(),
+                            page_current=0,
+                            page_size=TAMANHO_PAGINA,
+                            page_action='custom',
+                            sort_action='custom',
+                            sort_mode='single',
+                            style_table={"overflowX": "auto"},
+                            style_header={"backgroundColor": "#2c2c2c", "color": "white", "fontWeight": "bold"},
+                            style_cell={"backgroundColor": "#1e1e1e", "color": "white", "textAlign": "left",
+                                        "minWidth": "100px", "maxWidth": "320px", "whiteSpace": "normal"},
                         ),
+                        id='drill-detalhe', style={"display": "none"},
+                    ),
+                ])
+            ], className="bg-dark"), md=12, className="mt-4"),
+        ]),
 
-                        dbc.Col(
-                            dcc.DatePickerRange(
-                                id='filtro-periodo',
-                                min_date_allowed=min_date.date() if pd.notna(min_date) else None,
-                                max_date_allowed=max_date.date() if pd.notna(max_date) else None,
-                                start_date=min_date.date() if pd.notna(min_date) else None,
-                                end_date=max_date.date() if pd.notna(max_date) else None,
-                                display_format='DD/MM/YYYY',
-                                style={"backgroundColor": "#2c2c2c", "color": "white"}
-                            ), md=3
-                        )
+        # Comparação de conjuntos de filtros lado a lado
+        dbc.Row([dbc.Col(comparacao.cartao("page3"), md=12, className="mt-4")]),
 
-                    ])
+        # Alunos
+        dbc.Row([
+            dbc.Col(dbc.Card([
+                dbc.CardBody([
+                    dbc.Row([
+                        dbc.Col([
+                            html.H4("Alunos Selecionados", className="card-title"),
+                            html.P(id='tabela-alunos-total', className="text-muted"),
+                        ]),
+                        # Exportação dos alunos filtrados
+                        dbc.Col(
+                            dbc.InputGroup([
+                                dbc.Select(
+                                    id='exportar-formato',
+                                    options=[{'label': f.upper(), 'value': f} for f in exportacao.DISPONIVEIS],
+                                    value=exportacao.DISPONIVEIS[0],
+                                ),
+                                dbc.Button([html.I(className="bi bi-file-earmark-arrow-down-fill me-2"), "Exportar"],
+                                           id='btn-exportar', color="info", external_link=True),
+                                dbc.Button([html.I(className="bi bi-hourglass-split me-2"), "Gerar arquivo"],
+                                           id='btn-gerar-exportacao', color="warning", style={"display": "none"}),
+                            ], size="sm"),
+                            width="auto"
+                        ),
+                    ]),
+                    dbc.Progress(id='progresso-exportacao', value=0, striped=True, animated=True,
+                                 className="mb-2", style={"display": "none"}),
+                    html.Div(id='exportacao-link', className="mb-2"),
+                    dash_table.DataTable(
+                        id='tabela-alunos',
+                        columns=tabela_alunos.colunas_datatable(),
+                        page_current=0,
+                        page_size=TAMANHO_PAGINA,
+                        page_action='custom',
+                        sort_action='custom',
+                        sort_mode='single',
+                        filter_action='custom',
+                        filter_query='',
+                        style_table={"overflowX": "auto"},
+                        style_header={"backgroundColor": "#2c2c2c", "color": "white", "fontWeight": "bold"},
+                        style_filter={"backgroundColor": "#3a3a3a", "color": "white"},
+                        style_cell={"backgroundColor": "#1e1e1e", "color": "white", "textAlign": "left",
+                                    "minWidth": "100px", "maxWidth": "320px", "whiteSpace": "normal"},
+                    ),
                 ])
-            ], className="bg-dark"),
-            width=12, className="mb-4"
-        )
-    ]),
-
-    # KPI
-    dbc.Row([
-        dbc.Col(dbc.Card([
-            dbc.CardBody([
-                html.H4("Total de Alunos Selecionados", className="card-title text-center"),
-                html.P(id='kpi-total-alunos', className="display-4 text-center mt-3")
-            ])
-        ]), md=4),
-    ]),
-
-    # Gráficos
-    dbc.Row([
-        dbc.Col(dcc.Graph(id='grafico-evolucao-matriculas'), md=8, className="mt-4"),
-        dbc.Col(dcc.Graph(id='grafico-distribuicao-curso'), md=4, className="mt-4"),
-    ], className="g-4"),
-
-    dbc.Row([
-        dbc.Col(dcc.Graph(id='grafico-distribuicao-programa'), md=12, className="mt-4"),
-    ])
-
-], fluid=True)
+            ], className="bg-dark"), md=12, className="mt-4 mb-4"),
+        ])
+
+    ], fluid=True)
+
+
+layout = criar_layout()
 
 # ============================================================
 # Callbacks da Página
 # ============================================================
-@callback(
-    [
-        Output('kpi-total-alunos', 'children'),
-        Output('grafico-evolucao-matriculas', 'figure'),
-        Output('grafico-distribuicao-curso', 'figure'),
-        Output('grafico-distribuicao-programa', 'figure')
-    ],
-    [
-        Input('filtro-programa', 'value'),
-        Input('filtro-curso', 'value'),
-        Input('filtro-status', 'value'),
-        Input('filtro-periodo', 'start_date'),
-        Input('filtro-periodo', 'end_date')
-    ]
-)
-def update_dashboard(programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date):
-    dff = df.copy()
+def estado_padrao():
+    inicio = min_date.date() if pd.notna(min_date) else None
+    fim = max_date.date() if pd.notna(max_date) else None
+    return None, None, None, inicio, fim
+
+
+def filtrar(programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date, base=None):
+    # `base`: linhas já recortadas por Programa (relatórios em lote, src/relatorios.py)
+    dff = df if base is None else base
 
-    # Aplicar filtros
     if start_date and end_date:
         dff = dff[(dff['Primeira matrícula'] >= start_date) & (dff['Primeira matrícula'] <= end_date)]
     if programas_selecionados:
@@ -169,53 +321,432 @@ def update_dashboard(programas_selecionados, cursos_selecionados, status_selecio
         dff = dff[dff['Curso'].isin(cursos_selecionados)]
     if status_selecionado:
         dff = dff[dff['Status'].isin(status_selecionado)]
+    return dff
 
-    total_alunos = len(dff)
 
-    # ================= Evolução de Matrículas =================
-    if not dff.empty:
-        evolucao = dff.groupby(['Mes_Ano_Matricula', 'Curso']).size().reset_index(name='Quantidade')
-        fig_evolucao = px.area(
-            evolucao, x='Mes_Ano_Matricula', y='Quantidade', color='Curso',
-            title="Evolução de Novas Matrículas por Mês", template=TEMPLATE
-        )
-    else:
-        fig_evolucao = px.area(title="Evolução de Novas Matrículas por Mês")
+@functools.lru_cache(maxsize=32)
+def base_filtrada(chave):
+    # Recorte dos filtros da página, reaproveitado pela tabela e pela seleção cruzada
+    return filtrar(*chave)
+
+
+# Seleção cruzada: dimensão -> coluna, e de quais dimensões cada saída depende
+# (cada gráfico ignora a dimensão que ele próprio define)
+COLUNAS_SELECAO = {"Programa": "Programa", "Curso": "Curso", "Período": "Primeira matrícula"}
+DEPENDENCIAS_SELECAO = {
+    "kpi": ("Programa", "Curso", "Período"),
+    "evolucao": ("Programa", "Curso"),
+    "curso": ("Programa", "Período"),
+    "programa": ("Curso", "Período"),
+}
+DEFINE_SELECAO = {"evolucao": "Período", "curso": "Curso", "programa": "Programa"}
+
+
+def restricao_evolucao(sel):
+    # Chave (texto) da seleção que vale para a série de evolução
+    valores = {d: v for d, v in ((sel or {}).get("valores") or {}).items() if d in DEPENDENCIAS_SELECAO["evolucao"]}
+    return json.dumps({"valores": valores}, sort_keys=True) if valores else None
+
+
+# ================= Evolução de Matrículas =================
+# Série mensal por curso em eixo de datas com traces WebGL; só o intervalo
+# visível vai ao navegador, reduzido conforme o zoom (ver src/series.py).
+TITULO_EVOLUCAO = "Evolução de Novas Matrículas por Mês"
+ROTULOS_RESOLUCAO = {
+    "mes": "mensal",
+    "trimestre": "por trimestre (mín./máx. mensal)",
+    "ano": "por ano (mín./máx. mensal)",
+}
+
+
+def serie_evolucao(dff):
+    return series.contagens_mensais(dff['Primeira matrícula'], dff['Curso'])
 
-    fig_evolucao.update_layout(
-        yaxis_title="Nº de Alunos", xaxis_title="Período",
-        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)"
+
+@functools.lru_cache(maxsize=32)
+def serie_evolucao_cacheada(chave, restricao=None):
+    # Uma série por estado de filtro (e seleção cruzada): o zoom só recorta e reduz
+    dff = base_filtrada(chave)
+    if restricao:
+        dff = selecao.aplicar(dff, json.loads(restricao), COLUNAS_SELECAO, ignorar=("Período",), faixas=("Período",))
+    return serie_evolucao(dff)
+
+
+def figura_evolucao_serie(serie, chave, inicio=None, fim=None):
+    meses, cursos, matriz = serie
+    if not cursos:
+        return figuras.vazia(TITULO_EVOLUCAO)
+
+    resolucao, xs, ys = series.reduzir(meses, matriz, inicio, fim)
+    eixo_x = {"range": [str(inicio), str(fim)]} if inicio is not None else {}
+    return figuras.linhas_tempo(
+        xs, ys, cursos, TITULO_EVOLUCAO, "Período", "Nº de Alunos",
+        title={"text": TITULO_EVOLUCAO, "subtitle": {"text": f"Resolução: {ROTULOS_RESOLUCAO[resolucao]}"}},
+        xaxis=eixo_x,
+        # Mesmo estado de filtro -> o zoom do usuário é mantido entre as respostas
+        uirevision=json.dumps(chave),
     )
 
-    # ================= Distribuição por Curso =================
+
+def figura_evolucao(dff, chave=None):
+    return figura_evolucao_serie(serie_evolucao(dff), chave)
+
+
+# ================= Distribuição por Curso =================
+def figura_distribuicao_curso(dff):
     if not dff.empty:
-        dist_curso = dff['Curso'].value_counts().reset_index()
-        dist_curso.columns = ['Curso', 'Total']
-        fig_dist_curso = px.pie(
-            dist_curso, names='Curso', values='Total',
-            title="Distribuição por Curso", template=TEMPLATE, hole=0.4
-        )
-    else:
-        fig_dist_curso = px.pie(title="Distribuição por Curso")
+        dist_curso = dff['Curso'].value_counts()
+        return figuras.pizza(dist_curso.index, dist_curso.values,
+                             "Distribuição por Curso", "Curso", "Total", buraco=0.4)
 
-    fig_dist_curso.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+    return figuras.vazia("Distribuição por Curso")
 
-    # ================= Distribuição por Programa =================
+
+# ================= Distribuição por Programa =================
+def figura_distribuicao_programa(dff):
     if not dff.empty:
-        dist_programa = dff['Programa'].value_counts().nlargest(15).reset_index()
-        dist_programa.columns = ['Programa', 'Total']
-        fig_dist_programa = px.bar(
-            dist_programa, y='Programa', x='Total', orientation='h',
-            title="Nº de Alunos por Programas", template=TEMPLATE
+        dist_programa = dff['Programa'].value_counts().nlargest(15)
+        return figuras.barras(
+            dist_programa.index, dist_programa.values,
+            "Nº de Alunos por Programas", "Programa", "Total", horizontal=True,
+            yaxis={'categoryorder': 'total ascending', 'title': None},
+            xaxis={'title': {'text': "Nº de Alunos"}}
         )
-    else:
-        fig_dist_programa = px.bar(title="Nº de Alunos por Programas")
 
-    fig_dist_programa.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        xaxis_title="Nº de Alunos", yaxis_title=None,
-        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)"
-    )
+    return figuras.vazia("Nº de Alunos por Programas")
+
+
+@cache.memoizar("page3", estado_padrao=estado_padrao, versao=3)
+def gerar_figuras(programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date, base=None):
+    chave = cache.chave_filtros((programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date))
+    dff = filtrar(programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date, base)
+
+    total_alunos = len(dff)
+
+    fig_evolucao, fig_dist_curso, fig_dist_programa = paralelo.construir_figuras("page3", dff, {
+        "evolucao": functools.partial(figura_evolucao, chave=chave),
+        "curso": figura_distribuicao_curso,
+        "programa": figura_distribuicao_programa,
+    })
 
     return total_alunos, fig_evolucao, fig_dist_curso, fig_dist_programa
 
+
+SAIDAS = [
+    ('kpi-total-alunos', 'children'),
+    ('grafico-evolucao-matriculas', 'figure'),
+    ('grafico-distribuicao-curso', 'figure'),
+    ('grafico-distribuicao-programa', 'figure'),
+]
+
+
+@callback(
+    filtros.saidas_servidor(SAIDAS, "page3"),
+    Input('pedido-page3', 'data'),
+    prevent_initial_call=True,
+)
+def update_dashboard(estado):
+    return (*gerar_figuras(*filtros.valores(estado)), estado)
+
+
+@functools.lru_cache(maxsize=32)
+def mascara_tabela(chave):
+    return tabela_alunos.mascara_indices(base_filtrada(chave).index)
+
+
+# Tabela de alunos: só a página visível vai ao navegador. A primeira página
+# de cada estado (com a ordenação e o filtro das colunas) fica no cache do
+# navegador, grupo "tabela"; trocar de página vai sempre ao servidor.
+SAIDAS_TABELA = [('tabela-alunos', 'data'), ('tabela-alunos', 'page_count'), ('tabela-alunos-total', 'children')]
+EXTRAS_TABELA = [('tabela-alunos', 'page_size'), ('tabela-alunos', 'sort_by'), ('tabela-alunos', 'filter_query')]
+filtros.registrar_cache("page3", SAIDAS_TABELA, grupo="tabela", extras=EXTRAS_TABELA)
+
+# Estado novo volta para a primeira página (só muda se não estiver nela)
+clientside_callback(
+    ClientsideFunction(namespace="filtros", function_name="primeira_pagina"),
+    Output('tabela-alunos', 'page_current', allow_duplicate=True),
+    Input(filtros.id_estado("page3"), 'data'),
+    State('tabela-alunos', 'page_current'),
+    prevent_initial_call=True,
+)
+
+
+@callback(
+    *filtros.saidas_servidor(SAIDAS_TABELA, "page3", grupo="tabela"),
+    Output('tabela-alunos', 'page_current'),
+    Input(filtros.id_pedido("page3", "tabela"), 'data'),
+    Input('tabela-alunos', 'page_current'),
+    Input('tabela-alunos', 'page_size'),
+    Input('tabela-alunos', 'sort_by'),
+    Input('tabela-alunos', 'filter_query'),
+    State(filtros.id_estado("page3"), 'data'),
+    prevent_initial_call=True,
+)
+def atualizar_tabela(_pedido, pagina, tamanho, sort_by, filter_query, estado):
+    # Filtro ou ordenação novos voltam para a primeira página
+    if 'tabela-alunos.page_current' not in ctx.triggered_prop_ids:
+        pagina = 0
+    mascara = mascara_tabela(cache.chave_filtros(filtros.valores(estado)))
+    linhas, total, paginas = tabela_alunos.pagina(mascara, pagina, tamanho or TAMANHO_PAGINA, sort_by, filter_query)
+    pagina = min(pagina or 0, paginas - 1)
+    # Só a primeira página entra no cache do navegador
+    guardar = filtros.resposta(estado, tamanho, sort_by, filter_query) if pagina == 0 else no_update
+    return linhas, paginas, f"{total} aluno(s) encontrados", guardar, pagina
+
+
+def dados_exportacao(programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date):
+    dff = filtrar(programas_selecionados, cursos_selecionados, status_selecionado, start_date, end_date)
+    return dff.drop(columns=["Mes_Ano_Matricula"], errors="ignore")
+
+
+# Exportação: link de download direto (streaming) ou, acima do limite ou
+# para formatos sem streaming (XLSX), geração do arquivo em segundo plano
+# (ver dashboard_home.py)
+SAIDAS_EXPORTACAO = [
+    ('btn-exportar', 'href'),
+    ('btn-exportar', 'style'),
+    ('btn-gerar-exportacao', 'style'),
+    ('progresso-exportacao', 'style'),
+    ('exportacao-link', 'children'),
+]
+filtros.registrar_cache("page3", SAIDAS_EXPORTACAO, grupo="exportacao", extras=[('exportar-formato', 'value')])
+
+
+@callback(
+    filtros.saidas_servidor(SAIDAS_EXPORTACAO, "page3", grupo="exportacao"),
+    Input(filtros.id_pedido("page3", "exportacao"), 'data'),
+    Input('exportar-formato', 'value'),
+    State(filtros.id_estado("page3"), 'data'),
+    prevent_initial_call=True,
+)
+def atualizar_exportacao(_pedido, formato, estado):
+    total = int(mascara_tabela(cache.chave_filtros(filtros.valores(estado))).sum())
+    oculto, visivel = {"display": "none"}, {}
+    guardar = filtros.resposta(estado, formato)
+    if (total > config.EXPORTAR_LIMITE_DIRETO or formato not in exportacao.STREAMING) and tarefas.disponivel():
+        return None, oculto, visivel, visivel, None, guardar
+    return exportacao.url_exportacao(estado, formato), visivel, oculto, oculto, None, guardar
+
+
+# Tendências: só escolhe as linhas (Programa, Curso) das médias já calculadas;
+# o período do filtro vira o intervalo visível
+SAIDAS_TENDENCIA = [('grafico-tendencia', 'figure')]
+filtros.registrar_cache("page3", SAIDAS_TENDENCIA, grupo="tendencia",
+                        extras=[('tendencia-serie', 'value'), ('tendencia-janela', 'value')])
+
+
+@callback(
+    filtros.saidas_servidor(SAIDAS_TENDENCIA, "page3", grupo="tendencia"),
+    Input(filtros.id_pedido("page3", "tendencia"), 'data'),
+    Input('tendencia-serie', 'value'),
+    Input('tendencia-janela', 'value'),
+    State(filtros.id_estado("page3"), 'data'),
+    prevent_initial_call=True,
+)
+def atualizar_tendencia(_pedido, serie, janela, estado):
+    return figura_tendencia(estado, serie, janela), filtros.resposta(estado, serie, janela)
+
+
+def figura_tendencia(estado, serie, janela):
+    programas_selecionados, cursos_selecionados, _, inicio, fim = filtros.valores(estado)
+    meses, nomes, matriz = tendencias_alunos.media_movel(serie, janela, programas_selecionados, cursos_selecionados)
+    titulo = f"{serie}: média mensal móvel ({janela} meses) por Programa e Curso"
+    if not nomes:
+        return figuras.vazia(titulo)
+    resolucao, xs, ys = series.reduzir(meses, matriz, inicio, fim)
+    return figuras.linhas_tempo(
+        xs, ys, nomes, titulo, "Período", f"{serie} por mês",
+        title={"text": titulo, "subtitle": {"text": f"Resolução: {ROTULOS_RESOLUCAO[resolucao]}"}},
+    )
+
+
+# Zoom/pan na evolução: pede só a faixa visível, na resolução adequada
+@callback(
+    Output('grafico-evolucao-matriculas', 'figure', allow_duplicate=True),
+    Input('grafico-evolucao-matriculas', 'relayoutData'),
+    State(filtros.id_estado("page3"), 'data'),
+    State('selecao-page3', 'data'),
+    prevent_initial_call=True,
+)
+def atualizar_zoom_evolucao(relayout, estado, sel):
+    intervalo = series.intervalo_relayout(relayout)
+    if intervalo is None:
+        return no_update
+    chave = cache.chave_filtros(filtros.valores(estado))
+    return figura_evolucao_serie(serie_evolucao_cacheada(chave, restricao_evolucao(sel)), chave, *intervalo)
+
+
+# ================= Seleção cruzada =================
+@callback(
+    Output('selecao-page3', 'data'),
+    Input('grafico-distribuicao-programa', 'clickData'),
+    Input('grafico-distribuicao-programa', 'selectedData'),
+    Input('grafico-distribuicao-curso', 'clickData'),
+    Input('grafico-evolucao-matriculas', 'selectedData'),
+    Input('btn-limpar-selecao-page3', 'n_clicks'),
+    Input(filtros.id_estado("page3"), 'data'),
+    State('selecao-page3', 'data'),
+    State('modo-clique-page3', 'value'),
+    prevent_initial_call=True,
+)
+def atualizar_selecao(clique_programa, caixa_programa, clique_curso, caixa_evolucao, _limpar, _estado, sel, modo):
+    disparo = next(iter(ctx.triggered_prop_ids), None)
+    if modo == "detalhar" and disparo == 'grafico-distribuicao-programa.clickData':
+        # No modo de detalhamento o clique no programa abre o drill-down
+        return no_update
+    if disparo == 'grafico-distribuicao-programa.clickData':
+        return selecao.alternar(sel, "Programa", selecao.pontos(clique_programa, "y"))
+    if disparo == 'grafico-distribuicao-programa.selectedData':
+        return selecao.alternar(sel, "Programa", selecao.pontos(caixa_programa, "y"))
+    if disparo == 'grafico-distribuicao-curso.clickData':
+        return selecao.alternar(sel, "Curso", selecao.pontos(clique_curso, "label"))
+    if disparo == 'grafico-evolucao-matriculas.selectedData':
+        return selecao.alternar(sel, "Período", selecao.faixa(caixa_evolucao))
+    if disparo == 'btn-limpar-selecao-page3.n_clicks':
+        return selecao.limpar(sel)
+    # Filtros novos: os gráficos já são redesenhados pelo callback da página
+    return selecao.vazia()
+
+
+@callback(
+    Output('kpi-total-alunos', 'children', allow_duplicate=True),
+    Output('grafico-evolucao-matriculas', 'figure', allow_duplicate=True),
+    Output('grafico-distribuicao-curso', 'figure', allow_duplicate=True),
+    Output('grafico-distribuicao-programa', 'figure', allow_duplicate=True),
+    Output('selecao-page3-texto', 'children'),
+    Input('selecao-page3', 'data'),
+    State(filtros.id_estado("page3"), 'data'),
+    prevent_initial_call=True,
+)
+def aplicar_selecao(sel, estado):
+    # Só redesenha o que depende das dimensões alteradas, sobre o recorte já filtrado
+    chave = cache.chave_filtros(filtros.valores(estado))
+    base = base_filtrada(chave)
+
+    def recorte(saida):
+        return selecao.aplicar(base, sel, COLUNAS_SELECAO, ignorar=(DEFINE_SELECAO.get(saida),), faixas=("Período",))
+
+    construtores = {
+        "kpi": lambda: len(recorte("kpi")),
+        "evolucao": lambda: figura_evolucao_serie(serie_evolucao_cacheada(chave, restricao_evolucao(sel)), chave),
+        "curso": lambda: figura_distribuicao_curso(recorte("curso")),
+        "programa": lambda: figura_distribuicao_programa(recorte("programa")),
+    }
+    saidas = [
+        construir() if selecao.afeta(sel, DEPENDENCIAS_SELECAO[nome]) else no_update
+        for nome, construir in construtores.items()
+    ]
+    return (*saidas, selecao.descrever(sel))
+
+
+# ================= Detalhamento (drill-down) =================
+# Cada nível soma o índice de contagens do recorte (src/detalhamento.py);
+# os alunos só são buscados, paginados, no último nível.
+@functools.lru_cache(maxsize=32)
+def indice_detalhamento(chave):
+    return detalhamento.indice_contagens(base_filtrada(chave))
+
+
+@functools.lru_cache(maxsize=128)
+def nivel_detalhamento(chave, caminho):
+    # Níveis já visitados ficam em cache: voltar pelo breadcrumb não recalcula
+    return detalhamento.agregado(indice_detalhamento(chave), json.loads(caminho))
+
+
+@functools.lru_cache(maxsize=32)
+def mascara_detalhamento(chave, caminho):
+    base = base_filtrada(chave)
+    linhas = base.index[detalhamento.mascara(base, json.loads(caminho)).to_numpy()]
+    return tabela_alunos.mascara_indices(linhas)
+
+
+@callback(
+    Output('drill-caminho', 'data'),
+    Input('grafico-distribuicao-programa', 'clickData'),
+    Input('grafico-evolucao-matriculas', 'clickData'),
+    Input('grafico-drill', 'clickData'),
+    Input({'type': 'drill-nivel', 'index': ALL}, 'n_clicks'),
+    Input(filtros.id_estado("page3"), 'data'),
+    State('drill-caminho', 'data'),
+    State('modo-clique-page3', 'value'),
+    State('selecao-page3', 'data'),
+    prevent_initial_call=True,
+)
+def atualizar_caminho(clique_programa, clique_evolucao, clique_drill, niveis, estado, caminho, modo, sel):
+    disparo = next(iter(ctx.triggered_prop_ids), None)
+    if disparo == 'grafico-drill.clickData':
+        nivel = detalhamento.proximo_nivel(caminho)
+        valores = selecao.pontos(clique_drill, "x")
+        return detalhamento.avancar(caminho, nivel, valores[0]) if nivel and valores else no_update
+    if disparo and disparo.startswith('{'):
+        # Breadcrumb: volta ao nível clicado (componentes recém-criados chegam sem clique)
+        if not any(niveis):
+            return no_update
+        return caminho[:ctx.triggered_id["index"]]
+    if modo != "detalhar":
+        return [] if disparo == f'{filtros.id_estado("page3")}.data' else no_update
+    if disparo == 'grafico-distribuicao-programa.clickData':
+        valores = selecao.pontos(clique_programa, "y")
+        return detalhamento.avancar([], "Programa", valores[0]) if valores else no_update
+    if disparo == 'grafico-evolucao-matriculas.clickData':
+        # Ponto da evolução: curso da linha clicada e coorte do mês
+        pontos = (clique_evolucao or {}).get("points") or []
+        if not pontos:
+            return no_update
+        chave = cache.chave_filtros(filtros.valores(estado))
+        cursos = serie_evolucao_cacheada(chave, restricao_evolucao(sel))[1]
+        curso = cursos[pontos[0]["curveNumber"]]
+        caminho = detalhamento.avancar(caminho, "Curso", curso)
+        return detalhamento.avancar(caminho, "Ano", str(pontos[0]["x"])[:4])
+    return []
+
+
+@callback(
+    Output('drill-trilha', 'children'),
+    Output('grafico-drill', 'figure'),
+    Output('grafico-drill', 'style'),
+    Output('drill-detalhe', 'style'),
+    Output('drill-tabela', 'data'),
+    Output('drill-tabela', 'page_count'),
+    Output('drill-tabela', 'page_current'),
+    Input('drill-caminho', 'data'),
+    Input('drill-tabela', 'page_current'),
+    Input('drill-tabela', 'sort_by'),
+    State(filtros.id_estado("page3"), 'data'),
+)
+def atualizar_detalhamento(caminho, pagina, sort_by, estado):
+    caminho = caminho or []
+    rotulos = detalhamento.trilha(caminho)
+    trilha = [
+        dbc.Button(rotulo, id={'type': 'drill-nivel', 'index': i}, color="link", size="sm",
+                   disabled=i == len(rotulos) - 1, className="px-1")
+        for i, rotulo in enumerate(rotulos)
+    ]
+    trilha = [item for i, botao in enumerate(trilha) for item in ([html.Span("›")] if i else []) + [botao]]
+
+    chave = cache.chave_filtros(filtros.valores(estado))
+    chave_caminho = json.dumps(caminho)
+    oculto, visivel = {"display": "none"}, {}
+    nivel, contagens = nivel_detalhamento(chave, chave_caminho)
+    if nivel is None:
+        # Último nível: alunos, paginados no servidor
+        if 'drill-tabela.page_current' not in ctx.triggered_prop_ids:
+            pagina = 0
+        linhas, _, paginas = tabela_alunos.pagina(mascara_detalhamento(chave, chave_caminho), pagina, TAMANHO_PAGINA, sort_by)
+        return trilha, no_update, oculto, visivel, linhas, paginas, min(pagina or 0, paginas - 1)
+
+    titulo = f"Alunos por {detalhamento.ROTULOS[nivel]} (clique para detalhar)"
+    if contagens.empty:
+        figura = figuras.vazia(titulo)
+    else:
+        figura = figuras.barras(
+            contagens.index.astype(str), contagens.values, titulo, detalhamento.ROTULOS[nivel], "Nº de Alunos",
+            texto=True, xaxis=dict(type="category"),
+        )
+    return trilha, figura, visivel, oculto, [], 1, 0
+
+
+filtros.registrar_lote("page3", 'filtro-programa', 'filtro-curso', 'filtro-status', 'filtro-periodo')
+filtros.registrar_cache("page3", SAIDAS)
+filtros.registrar_opcoes("page3", indice_opcoes, 'filtro-programa', 'filtro-curso', 'filtro-status')
+comparacao.registrar("page3", df, filtrar, "Status")
@@ -1,9 +1,12 @@
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, callback
 import dash_bootstrap_components as dbc
 
+from src import cache, dimensoes, figuras, paralelo
+from src.components import filtros
+
 # ==========================================================
 # CARREGAMENTO E TRATAMENTO DE DADOS
 # ==========================================================
@@ -66,111 +69,113 @@ status_opcoes = sorted(df["Status"].dropna().unique())
 min_date = df["Início da contagem de prazo"].min().date()
 max_date = df["Início da contagem de prazo"].max().date()
 
+# Opções dependentes: contagens por Programa x Curso x Status x início do prazo
+indice_opcoes = dimensoes.IndiceDimensoes(
+    df, {"programa": "Programa", "curso": "Curso", "status": "Status"}, "Início da contagem de prazo",
+    permitidos={"status": status_opcoes},
+)
+
 # ==========================================================
 # LAYOUT DA PÁGINA 4
 # ==========================================================
-layout = dbc.Container([
-    dbc.Row([
-        dbc.Col(html.H2("Análise de Alunos por Curso",
-                        className="text-center text-primary my-4"), width=12)
-    ]),
-    dbc.Row(
-        dbc.Col(html.H1("Filtros Analítico",
-                        className="text-center my-4"), width=12)
-    ),
-
-    # Linha de Filtros
-    dbc.Row([
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-programa',
-                                options=[{'label': i, 'value': i} for i in programas_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Programa(s)",                  
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-
-                        ),
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-curso',
-                                options=[{'label': i, 'value': i} for i in cursos_opcoes],
-                                multi=True,
-                                placeholder="Selecione o(s) Curso(s)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-                        dbc.Col(
-                            dcc.Dropdown(
-                                id='filtro-status',
-                                options=[{'label': i, 'value': i} for i in status_opcoes],
-                                multi=True,
-                                placeholder="Selecione Status (Ativos/Titulados/Desligados)",
-                                style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
-                            ), md=3
-                        ),
-                        dbc.Col(
-                            dcc.DatePickerRange(
-                                id='filtro-periodo',
-                                min_date_allowed=min_date,
-                                max_date_allowed=max_date,
-                                start_date=min_date,
-                                end_date=max_date,
-                                display_format='DD/MM/YYYY'
-                            ), md=3
-                        ),
+def criar_layout(estado=None):
+    estado = filtros.restaurar(
+        estado, programas_opcoes, cursos_opcoes, status_opcoes,
+        min_date,
+        max_date,
+    )
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col(html.H2("Análise de Alunos por Curso",
+                            className="text-center text-primary my-4"), width=12)
+        ]),
+        dbc.Row(
+            dbc.Col(html.H1("Filtros Analítico",
+                            className="text-center my-4"), width=12)
+        ),
+
+        # Linha de Filtros
+        dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-programa',
+                                    value=estado["programa"],
+                                    options=filtros.opcoes_programa("page4", estado),  # demais opções: busca no servidor
+                                    multi=True,
+                                    placeholder="Selecione o(s) Programa(s)",                  
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+
+                            ),
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-curso',
+                                    value=estado["curso"],
+                                    options=[{'label': i, 'value': i} for i in cursos_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione o(s) Curso(s)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='filtro-status',
+                                    value=estado["status"],
+                                    options=[{'label': i, 'value': i} for i in status_opcoes],
+                                    multi=True,
+                                    placeholder="Selecione Status (Ativos/Titulados/Desligados)",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black", "height": "38px"}
+                                ), md=3
+                            ),
+                            dbc.Col(
+                                dcc.DatePickerRange(
+                                    id='filtro-periodo',
+                                    min_date_allowed=min_date,
+                                    max_date_allowed=max_date,
+                                    start_date=estado["inicio"],
+                                    end_date=estado["fim"],
+                                    updatemode='bothdates',
+                                    display_format='DD/MM/YYYY'
+                                ), md=3
+                            ),
+                        ]),
+                        filtros.controles_lote("page4", estado),
                     ])
-                ])
-            ], className="bg-dark text-light"),
-            width=12,
-            className="mb-4"
-        )
-    ]),
+                ], className="bg-dark text-light"),
+                width=12,
+                className="mb-4"
+            )
+        ]),
+
+        # Gráfico 1
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="grafico1", style={"height": "420px"}), md=12)
+        ], className="mb-4"),
 
-    # Gráfico 1
-    dbc.Row([
-        dbc.Col(dcc.Graph(id="grafico1", style={"height": "420px"}), md=12)
-    ], className="mb-4"),
+        # Gráfico 2
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="grafico2", style={"height": "420px"}), md=12)
+        ])
+    ], fluid=True)
 
-    # Gráfico 2
-    dbc.Row([
-        dbc.Col(dcc.Graph(id="grafico2", style={"height": "420px"}), md=12)
-    ])
-], fluid=True)
+
+layout = criar_layout()
 
 # ==========================================================
 # CALLBACKS
 # ==========================================================
-@callback(
-    Output("grafico1", "figure"),
-    Output("grafico2", "figure"),
-    Input("filtro-programa", "value"),
-    Input("filtro-curso", "value"),
-    Input("filtro-status", "value"),
-    Input("filtro-periodo", "start_date"),
-    Input("filtro-periodo", "end_date"),
-)
-def atualizar_graficos(programa, curso, status, data_inicio, data_fim):
-    dff = df.copy()
+def estado_padrao():
+    return None, None, None, min_date, max_date
 
-    if programa:
-        dff = dff[dff["Programa"].isin(programa)]
-    if curso:
-        dff = dff[dff["Curso"].isin(curso)]
-    if status:
-        dff = dff[dff["Status"].isin(status)]
-    if data_inicio:
-        dff = dff[dff["Início da contagem de prazo"] >= pd.to_datetime(data_inicio)]
-    if data_fim:
-        dff = dff[dff["Início da contagem de prazo"] <= pd.to_datetime(data_fim)]
 
-    # --- Gráfico 1: Faixa Etária x Curso
+# --- Gráfico 1: Faixa Etária x Curso
+def figura_faixa_curso(dff):
     if dff.empty:
-        fig1 = px.bar(title="Nenhum dado encontrado")
+        fig1 = px.bar(title="Nenhum dado encontrado", template=figuras.TEMPLATE_FAIXAS)
     else:
         fig1 = px.histogram(
             dff,
@@ -179,17 +184,17 @@ def atualizar_graficos(programa, curso, status, data_inicio, data_fim):
             category_orders={"Faixa Etária": faixa_labels},
             barmode="group",
             text_auto=True,
-            title="Distribuição de Faixa Etária por Curso"
+            title="Distribuição de Faixa Etária por Curso",
+            template=figuras.TEMPLATE_FAIXAS
         )
-        #fig1.update_layout(yaxis_title="Quantidade", xaxis_title="Faixa Etária")
-        fig1.update_yaxes(title_text="Quantidade")
-        fig1.update_layout(
-        xaxis=dict(type='category', showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)")) 
+        fig1.update_layout(xaxis_type="category", yaxis_title="Quantidade")
+    return fig1
 
-    # --- Gráfico 2: Faixa Etária x Ano de Início
+
+# --- Gráfico 2: Faixa Etária x Ano de Início
+def figura_faixa_ano(dff):
     if dff.empty:
-        fig2 = px.bar(title="Nenhum dado encontrado")
+        fig2 = px.bar(title="Nenhum dado encontrado", template=figuras.TEMPLATE_FAIXAS)
     else:
         dados_ano = dff.groupby(["Ano Início", "Faixa Etária"]).size().reset_index(name="Quantidade")
         fig2 = px.bar(
@@ -199,25 +204,47 @@ def atualizar_graficos(programa, curso, status, data_inicio, data_fim):
             color="Faixa Etária",
             category_orders={"Faixa Etária": faixa_labels},
             barmode="stack",
-            title="Faixa Etária x Ano de Início"
-        )
-        fig2.update_layout(
-        xaxis=dict(type='category', tickangle=-45, showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)"))       
-
-    # Tema escuro coerente com o layout
-    for fig in [fig1, fig2]:
-        fig.update_layout(
-            plot_bgcolor="#1a1a2e",
-            paper_bgcolor="#0f0b1a",
-            font_color="#dbe9ff",
-            title_font_size=18,
-            title_x=0.5
+            title="Faixa Etária x Ano de Início",
+            template=figuras.TEMPLATE_FAIXAS
         )
-    # Fundo transparente
-    for f in [fig1, fig2]:
-        f.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+        fig2.update_layout(xaxis_type="category", xaxis_tickangle=-45)
+    return fig2
 
-    return fig1, fig2
+
+@cache.memoizar("page4", estado_padrao=estado_padrao, versao=2)
+def gerar_figuras(programa, curso, status, data_inicio, data_fim, base=None):
+    # `base`: linhas já recortadas por Programa (relatórios em lote, src/relatorios.py)
+    dff = (df if base is None else base).copy()
+
+    if programa:
+        dff = dff[dff["Programa"].isin(programa)]
+    if curso:
+        dff = dff[dff["Curso"].isin(curso)]
+    if status:
+        dff = dff[dff["Status"].isin(status)]
+    if data_inicio:
+        dff = dff[dff["Início da contagem de prazo"] >= pd.to_datetime(data_inicio)]
+    if data_fim:
+        dff = dff[dff["Início da contagem de prazo"] <= pd.to_datetime(data_fim)]
+
+    return tuple(paralelo.construir_figuras("page4", dff, {
+        "faixa_curso": figura_faixa_curso,
+        "faixa_ano": figura_faixa_ano,
+    }))
+
+
+SAIDAS = [("grafico1", "figure"), ("grafico2", "figure")]
+
+
+@callback(
+    filtros.saidas_servidor(SAIDAS, "page4"),
+    Input("pedido-page4", "data"),
+    prevent_initial_call=True,
+)
+def atualizar_graficos(estado):
+    return (*gerar_figuras(*filtros.valores(estado)), estado)
 
 
+filtros.registrar_lote("page4", "filtro-programa", "filtro-curso", "filtro-status", "filtro-periodo")
+filtros.registrar_cache("page4", SAIDAS)
+filtros.registrar_opcoes("page4", indice_opcoes, "filtro-programa", "filtro-curso", "filtro-status")
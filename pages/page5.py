@@ -0,0 +1,87 @@
+import dash_bootstrap_components as dbc
+from dash import html, dcc, Input, Output, callback
+
+from src import coortes, figuras
+
+# ============================================================
+# Página de Coortes: situação acumulada por mês decorrido
+# ============================================================
+# Cada linha do mapa é uma coorte (ano da primeira matrícula) do curso
+# escolhido; cada coluna, um mês desde a matrícula. A cor é a fração da
+# coorte já titulada, já desligada ou ainda ativa naquele mês. Os números
+# vêm do motor de coortes (src/coortes.py), calculado uma vez por versão
+# dos dados.
+cursos_opcoes = sorted(set(coortes.calcular()["cursos"]))
+situacoes_opcoes = coortes.SITUACOES
+
+
+def criar_layout(estado=None):
+    return dbc.Container([
+        dbc.Row(
+            dbc.Col(html.H1("Análise por Coorte", className="text-center text-primary my-4"), width=12)
+        ),
+
+        # ================= Controles =================
+        dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='coortes-curso',
+                                    options=[{'label': i, 'value': i} for i in cursos_opcoes],
+                                    value=cursos_opcoes[0] if cursos_opcoes else None,
+                                    clearable=False,
+                                    style={"backgroundColor": "#2c2c2c", "color": "black"}
+                                ), md=4
+                            ),
+                            dbc.Col(
+                                dbc.RadioItems(
+                                    id='coortes-situacao',
+                                    options=[{'label': i, 'value': i} for i in situacoes_opcoes],
+                                    value=situacoes_opcoes[0],
+                                    inline=True,
+                                ), md=8, className="d-flex align-items-center"
+                            ),
+                        ]),
+                    ])
+                ], className="bg-dark"),
+                width=12, className="mb-4"
+            )
+        ]),
+
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='grafico-coortes', style={"height": "720px"}), md=12),
+        ]),
+        dbc.Row([
+            dbc.Col(html.P(id='coortes-nota', className="text-muted mt-2"), md=12),
+        ]),
+    ], fluid=True)
+
+
+layout = criar_layout()
+
+
+# ============================================================
+# Callbacks da Página
+# ============================================================
+@callback(
+    Output('grafico-coortes', 'figure'),
+    Output('coortes-nota', 'children'),
+    Input('coortes-curso', 'value'),
+    Input('coortes-situacao', 'value'),
+)
+def atualizar_coortes(curso, situacao):
+    anos, meses, valores, alunos = coortes.matriz(curso, situacao)
+    titulo = f"{situacao} (fração acumulada) por coorte - {curso}"
+    if not anos:
+        return figuras.vazia(titulo), ""
+    fig = figuras.mapa_calor(
+        meses, anos, valores, titulo,
+        "Meses desde a primeira matrícula", "Coorte (ano de ingresso)", situacao,
+        extra=alunos, rotulo_extra="Alunos na coorte",
+    )
+    nota = (f"Dados até {coortes.calcular()['corte']}. Meses que a coorte ainda não completou "
+            "ficam em branco.")
+    return fig, nota
@@ -0,0 +1,169 @@
+import dash_bootstrap_components as dbc
+from dash import html, dcc, dash_table, Input, Output, callback, ctx
+
+from src import figuras, risco, tabela
+
+# ============================================================
+# Página de Risco de Evasão
+# ============================================================
+# Lê as pontuações já calculadas (src/risco.py, artefato marcado com a
+# versão dos dados): os filtros só recortam a tabela dos alunos ativos,
+# sem treinar nem pontuar nada na hora. A tabela é paginada no servidor
+# (src/tabela.py): o navegador só recebe a página visível.
+pontuacoes = risco.pontuacoes()
+modelo = risco.artefato_atual()["modelo"]
+programas_opcoes = sorted(pontuacoes["Programa"].dropna().unique())
+cursos_opcoes = sorted(pontuacoes["Curso"].dropna().unique())
+TAMANHO_PAGINA = 15
+tabela_risco = tabela.TabelaPaginada(pontuacoes, risco.COLUNAS_PONTUACAO)
+
+
+def _cartao(faixa):
+    return dbc.Col(dbc.Card(dbc.CardBody([
+        html.H4(f"Risco {faixa.lower()}", className="card-title"),
+        html.P(id=f"risco-total-{faixa.lower()}", className="card-value"),
+    ])), md=4)
+
+
+def criar_layout(estado=None):
+    return dbc.Container([
+        dbc.Row(
+            dbc.Col(html.H1("Risco de Evasão", className="text-center text-primary my-4"), width=12)
+        ),
+
+        # ================= Filtros =================
+        dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='risco-programa',
+                                    options=[{'label': i, 'value': i} for i in programas_opcoes],
+                                    multi=True,
+                                    placeholder="Programa",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black"}
+                                ), md=6
+                            ),
+                            dbc.Col(
+                                dcc.Dropdown(
+                                    id='risco-curso',
+                                    options=[{'label': i, 'value': i} for i in cursos_opcoes],
+                                    multi=True,
+                                    placeholder="Curso",
+                                    style={"backgroundColor": "#2c2c2c", "color": "black"}
+                                ), md=6
+                            ),
+                        ]),
+                    ])
+                ], className="bg-dark"),
+                width=12, className="mb-4"
+            )
+        ]),
+
+        dbc.Row([_cartao(faixa) for faixa in risco.FAIXAS], className="mb-4 g-4"),
+
+        dbc.Row([
+            dbc.Col(dcc.Graph(id='risco-por-programa'), md=6),
+            dbc.Col(dcc.Graph(id='risco-distribuicao'), md=6),
+        ]),
+
+        dbc.Row([
+            dbc.Col(dbc.Card([
+                dbc.CardHeader(html.H5("Alunos ativos por risco de evasão", className="mb-0")),
+                dbc.CardBody([
+                    dash_table.DataTable(
+                        id='risco-tabela',
+                        columns=tabela_risco.colunas_datatable(),
+                        page_current=0,
+                        page_size=TAMANHO_PAGINA,
+                        page_action='custom',
+                        sort_action='custom',
+                        sort_mode='single',
+                        style_table={"overflowX": "auto"},
+                        style_header={"backgroundColor": "#2c2c2c", "color": "white", "fontWeight": "bold"},
+                        style_cell={"backgroundColor": "#1e1e1e", "color": "white", "textAlign": "left",
+                                    "minWidth": "100px", "maxWidth": "320px", "whiteSpace": "normal"},
+                    ),
+                ])
+            ], className="bg-dark"), md=12, className="mt-4"),
+        ]),
+        dbc.Row([
+            dbc.Col(html.P(id='risco-nota', className="text-muted mt-2"), md=12),
+        ]),
+    ], fluid=True)
+
+
+layout = criar_layout()
+
+
+def _nota():
+    artefato = risco.artefato_atual()
+    auc = f"{modelo['auc_treino']:.2f}" if modelo["auc_treino"] is not None else "-"
+    return (f"Regressão logística treinada com {modelo['amostras']['desligados']} desligados e "
+            f"{modelo['amostras']['titulados']} titulados (AUC no treino: {auc}). "
+            f"Dados até {artefato['corte']}; modelo gerado em {artefato['gerado_em']}. "
+            f"Faixas: médio a partir de {risco.LIMIARES[0]:.0%}, alto a partir de {risco.LIMIARES[1]:.0%}.")
+
+
+def recorte(programa, curso):
+    df = pontuacoes
+    if programa:
+        df = df[df["Programa"].isin(programa)]
+    if curso:
+        df = df[df["Curso"].isin(curso)]
+    return df
+
+
+# ============================================================
+# Callbacks da Página
+# ============================================================
+@callback(
+    *[Output(f"risco-total-{faixa.lower()}", 'children') for faixa in risco.FAIXAS],
+    Output('risco-por-programa', 'figure'),
+    Output('risco-distribuicao', 'figure'),
+    Output('risco-nota', 'children'),
+    Input('risco-programa', 'value'),
+    Input('risco-curso', 'value'),
+)
+def atualizar_risco(programa, curso):
+    df = recorte(programa, curso)
+    totais = df["Faixa"].value_counts().reindex(risco.FAIXAS, fill_value=0)
+    if df.empty:
+        fig_programa = figuras.vazia("Risco médio por Programa")
+        fig_distribuicao = figuras.vazia("Alunos por faixa de risco")
+    else:
+        medio = df.groupby("Programa")["Risco"].mean().sort_values()
+        fig_programa = figuras.barras(
+            medio.index, (medio * 100).round(1), "Risco médio por Programa", "Programa", "Risco médio (%)",
+            texto=True, horizontal=True,
+        )
+        fig_distribuicao = figuras.barras(
+            totais.index, totais.values, "Alunos por faixa de risco", "Faixa", "Alunos", texto=True,
+        )
+    return (
+        *[str(int(total)) for total in totais.values],
+        fig_programa,
+        fig_distribuicao,
+        _nota(),
+    )
+
+
+# Tabela: só a página visível vai ao navegador (maior risco primeiro)
+@callback(
+    Output('risco-tabela', 'data'),
+    Output('risco-tabela', 'page_count'),
+    Output('risco-tabela', 'page_current'),
+    Input('risco-programa', 'value'),
+    Input('risco-curso', 'value'),
+    Input('risco-tabela', 'page_current'),
+    Input('risco-tabela', 'sort_by'),
+)
+def atualizar_tabela(programa, curso, pagina, sort_by):
+    # Filtro ou ordenação novos voltam para a primeira página
+    if 'risco-tabela.page_current' not in ctx.triggered_prop_ids:
+        pagina = 0
+    mascara = tabela_risco.mascara_indices(recorte(programa, curso).index)
+    linhas, _, paginas = tabela_risco.pagina(mascara, pagina, TAMANHO_PAGINA, sort_by)
+    return linhas, paginas, min(pagina or 0, paginas - 1)
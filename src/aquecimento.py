@@ -0,0 +1,60 @@
+import threading
+import time
+
+from src import cache, config
+
+# ============================================================
+# Aquecimento do cache após o boot
+# ============================================================
+# Depois que o worker sobe, uma thread em segundo plano monta as figuras
+# do estado inicial de cada página (todos os programas, todos os cursos,
+# período completo) e das combinações de filtro mais usadas recentemente
+# por todos os workers (ver cache.salvar_populares). A flag de prontidão
+# só vira quando tudo terminou.
+_pronto = threading.Event()
+_thread = None
+
+
+def pronto():
+    return _pronto.is_set()
+
+
+def estados_para_aquecer(funcao, top_n):
+    estados = [cache.chave_filtros(funcao.padrao())]
+    for chave in cache.populares(funcao.nome, top_n):
+        if chave not in estados:
+            estados.append(chave)
+    return estados
+
+
+def aquecer(top_n=None):
+    top_n = config.AQUECIMENTO_TOP_N if top_n is None else top_n
+    inicio = time.perf_counter()
+    total = 0
+    for nome, funcao in list(cache.REGISTRO.items()):
+        for estado in estados_para_aquecer(funcao, top_n):
+            try:
+                funcao.aquecer(*estado)
+                total += 1
+            except Exception as e:
+                print(f"⚠️ AVISO (aquecimento): falha ao aquecer '{nome}' com {estado}: {e}")
+    _pronto.set()
+    print(f"✅ Cache aquecido: {total} estado(s) em {time.perf_counter() - inicio:.1f}s")
+
+
+def iniciar():
+    global _thread
+    if not config.AQUECIMENTO_ATIVO:
+        _pronto.set()
+        return
+    if _thread is None:
+        _thread = threading.Thread(target=aquecer, name="aquecimento-cache", daemon=True)
+        _thread.start()
+
+
+def registrar_rota(server):
+    @server.route("/ready")
+    def ready():
+        if pronto():
+            return {"pronto": True}, 200
+        return {"pronto": False}, 503
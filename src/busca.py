@@ -0,0 +1,61 @@
+import bisect
+import heapq
+import re
+import unicodedata
+
+# ============================================================
+# Busca por prefixo, sem acentos, para dropdowns de muitas opções
+# ============================================================
+# Com dados de várias instituições o dropdown de Programa passa de centenas
+# de opções; em vez de mandar a lista inteira em cada layout, o servidor
+# devolve só as melhores correspondências do que foi digitado.
+#   - Cada nome é normalizado (sem acentos, minúsculo, espaços simples) e
+#     entra no índice uma vez por início de palavra: "Saúde Pública" gera
+#     "saude publica" e "publica".
+#   - O índice é uma lista ordenada desses sufixos; a busca de um prefixo é
+#     um bisect para achar a faixa de sufixos que começam com ele.
+# Como a consulta casa sempre com um trecho contínuo do nome normalizado, o
+# filtro do próprio dropdown no navegador (campo "search") não esconde
+# nenhum resultado. Serve para qualquer lista de nomes (orientadores,
+# linhas de pesquisa...).
+
+
+def normalizar(texto):
+    sem_acentos = unicodedata.normalize("NFKD", str(texto))
+    sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sem_acentos).strip().lower()
+
+
+class IndiceBusca:
+    def __init__(self, nomes):
+        self.nomes = list(nomes)
+        self.normalizados = [normalizar(n) for n in self.nomes]
+        sufixos = []
+        for posicao, texto in enumerate(self.normalizados):
+            for inicio in [0] + [m.end() for m in re.finditer(r"[^0-9a-z]+", texto)]:
+                if inicio < len(texto):
+                    sufixos.append((texto[inicio:], inicio, posicao))
+        sufixos.sort()
+        self.sufixos = [s for s, _, _ in sufixos]
+        self.entradas = [(inicio, posicao) for _, inicio, posicao in sufixos]
+
+    def buscar(self, texto, limite, aceitar=None):
+        """Posições (em `nomes`) dos nomes com alguma palavra começando por `texto`.
+
+        Nomes que começam pelo texto vêm primeiro, depois ordem alfabética.
+        `aceitar` (sequência de bool por posição) descarta nomes antes do corte.
+        """
+        consulta = normalizar(texto)
+        if not consulta:
+            return []
+        de = bisect.bisect_left(self.sufixos, consulta)
+        ate = bisect.bisect_left(self.sufixos, consulta + "\uffff", lo=de)
+        melhores = {}
+        for inicio, posicao in self.entradas[de:ate]:
+            if aceitar is not None and not aceitar[posicao]:
+                continue
+            melhores[posicao] = min(melhores.get(posicao, inicio), inicio)
+        return heapq.nsmallest(
+            limite, melhores,
+            key=lambda p: (melhores[p] > 0, self.normalizados[p]),
+        )
@@ -0,0 +1,212 @@
+import argparse
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows: servidor de desenvolvimento, um processo só
+    fcntl = None
+
+from plotly.utils import PlotlyJSONEncoder
+
+from src import config, dados
+from src.cache_backends import BackendMemoria, criar_backend
+
+# ============================================================
+# Cache de figuras por estado de filtro
+# ============================================================
+# Cada página registra a função que monta suas figuras com @memoizar.
+# O resultado (figuras e KPIs) é serializado em JSON e guardado no backend
+# configurado (memória, arquivos ou SQLite; ver src/cache_backends.py) por
+# estado de filtro normalizado, versão dos dados e versão do resultado
+# (`versao` em @memoizar, para o cache persistente não servir o formato
+# antigo depois de uma mudança no código). Cada uso é contabilizado,
+# para que o próximo boot saiba quais combinações aquecer primeiro
+# (ver src/aquecimento.py).
+POPULARES_PATH = os.path.join(config.CACHE_DIR, "filtros_populares.json")
+SALVAR_A_CADA = 50
+# Contagens gravadas perdem metade do peso a cada MEIA_VIDA_DIAS
+MEIA_VIDA_DIAS = 7
+
+REGISTRO = {}
+
+_lock = threading.Lock()
+_usos = Counter()
+_backend = None
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = _criar_backend()
+    return _backend
+
+
+def _criar_backend():
+    max_bytes = config.CACHE_MAX_MB * 1024 * 1024
+    try:
+        return criar_backend(config.CACHE_BACKEND, config.CACHE_DIR, dados.versao_dados(), max_bytes)
+    except OSError as e:
+        print(f"⚠️ AVISO (cache): backend '{config.CACHE_BACKEND}' indisponível ({e}). Usando memória.")
+        return BackendMemoria(dados.versao_dados(), max_bytes)
+
+
+def normalizar_valor(valor):
+    # Dropdown "multi" limpo chega como [] ou None; a ordem de seleção não importa
+    if isinstance(valor, (list, tuple)):
+        return tuple(sorted(map(str, valor))) or None
+    if valor in ("", None):
+        return None
+    # Datas do DatePickerRange chegam como "YYYY-MM-DD" ou "YYYY-MM-DDTHH:MM:SS"
+    return str(valor)[:10]
+
+
+def chave_filtros(args):
+    return tuple(normalizar_valor(v) for v in args)
+
+
+class FuncaoCacheada:
+    def __init__(self, nome, func, estado_padrao=None, versao=1):
+        self.nome = nome
+        self.versao = versao
+        self.func = func
+        self.estado_padrao = estado_padrao
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args):
+        chave = chave_filtros(args)
+        with _lock:
+            _usos[(self.nome, chave)] += 1
+            salvar = sum(_usos.values()) % SALVAR_A_CADA == 0
+        if salvar:
+            salvar_populares()
+        return self._obter(chave, args)
+
+    def aquecer(self, *args):
+        # Mesmo caminho do __call__, mas sem contar como uso real
+        return self._obter(chave_filtros(args), args)
+
+    def padrao(self):
+        return tuple(self.estado_padrao()) if self.estado_padrao else ()
+
+    def _obter(self, chave, args):
+        item = f"{dados.versao_dados()}|{self.nome}|v{self.versao}|{json.dumps(chave)}"
+        valor = backend().get(item)
+        if valor is not None:
+            return json.loads(valor)
+        resultado = self.func(*args)
+        valor = json.dumps(resultado, cls=PlotlyJSONEncoder).encode("utf-8")
+        backend().set(item, valor)
+        return json.loads(valor)
+
+
+def memoizar(nome, estado_padrao=None, versao=1):
+    """Registra `func` como construtora de figuras da página `nome`.
+
+    `estado_padrao` é uma função sem argumentos que devolve os valores
+    iniciais dos filtros da página (o que o layout mostra ao abrir).
+    `versao` entra na chave do cache: suba-a sempre que o formato ou o
+    conteúdo do resultado mudar (ex.: uma figura a mais ou a menos).
+    """
+    def decorador(func):
+        cacheada = FuncaoCacheada(nome, func, estado_padrao, versao)
+        REGISTRO[nome] = cacheada
+        return cacheada
+    return decorador
+
+
+def limpar():
+    backend().limpar()
+
+
+def remover_versoes_antigas():
+    # Passo explícito (build/CLI): os workers não apagam outras versões ao subir
+    return backend().remover_versoes_antigas()
+
+
+# ============================================================
+# Combinações de filtro mais usadas (persistidas entre execuções)
+# ============================================================
+# Vários workers gravam o mesmo arquivo: cada um soma só os usos que ainda
+# não gravou (_usos - _gravados) ao que está no disco, sob um lock de
+# arquivo, em vez de sobrescrever com a sua visão. As contagens do disco
+# decaem com o tempo (MEIA_VIDA_DIAS), para que combinações que deixaram
+# de ser usadas saiam do aquecimento.
+_gravados = Counter()
+
+
+def _decair(usos, desde):
+    fator = 0.5 ** (max(time.time() - desde, 0) / (MEIA_VIDA_DIAS * 86400))
+    return Counter({item: n * fator for item, n in usos.items() if n * fator >= 0.5})
+
+
+def _carregar_populares():
+    try:
+        with open(POPULARES_PATH, encoding="utf-8") as f:
+            conteudo = json.load(f)
+        atualizado = conteudo["atualizado"]
+        registros = conteudo["registros"]
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return Counter()
+    usos = Counter()
+    for r in registros:
+        chave = tuple(tuple(v) if isinstance(v, list) else v for v in r["filtros"])
+        usos[(r["pagina"], chave)] = r["usos"]
+    return _decair(usos, atualizado)
+
+
+_anteriores = _carregar_populares()
+
+
+def populares(nome, n):
+    with _lock:
+        total = _anteriores + (_usos - _gravados)
+    itens = [(chave, usos) for (pagina, chave), usos in total.most_common() if pagina == nome]
+    return [chave for chave, _ in itens[:n]]
+
+
+def salvar_populares():
+    global _anteriores
+    with _lock:
+        usos = Counter(_usos)
+    novos = usos - _gravados
+    if not novos:
+        return
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    with open(f"{POPULARES_PATH}.lock", "w") as trava:
+        if fcntl is not None:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+        total = _carregar_populares() + novos
+        registros = [
+            {"pagina": pagina, "filtros": list(chave), "usos": round(n, 2)}
+            for (pagina, chave), n in total.most_common(500)
+        ]
+        tmp = f"{POPULARES_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"atualizado": time.time(), "registros": registros}, f, ensure_ascii=False)
+        os.replace(tmp, POPULARES_PATH)
+    with _lock:
+        _gravados.update(novos)
+        _anteriores = total
+
+
+atexit.register(salvar_populares)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manutenção do cache de figuras.")
+    parser.add_argument("--purgar", action="store_true",
+                        help="Remove as entradas gravadas com outra versão dos dados")
+    args = parser.parse_args()
+    if not args.purgar:
+        parser.error("nada a fazer (use --purgar)")
+    removidas = remover_versoes_antigas()
+    print(f"✅ Cache '{config.CACHE_BACKEND}': {removidas} entrada(s) de outras versões dos dados removida(s) "
+          f"(versão atual {dados.versao_dados()})")
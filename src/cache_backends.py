@@ -0,0 +1,211 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# Backends do cache de resultados
+# ============================================================
+# Todos guardam bytes (JSON já serializado) sob uma chave texto e são
+# limitados por tamanho total: ao passar do limite, as entradas acessadas
+# há mais tempo saem primeiro. Só o backend de memória é por processo;
+# arquivos e SQLite ficam em disco e são compartilhados por todos os
+# workers do gunicorn na mesma máquina. A versão dos dados separa as
+# entradas: o que foi gravado com outra versão nunca é servido. Entradas de
+# outras versões não são apagadas quando um worker sobe (um worker novo e
+# um antigo podem estar servindo versões diferentes durante um deploy):
+# como não são mais lidas, saem primeiro pelo limite de tamanho, ou de
+# uma vez com remover_versoes_antigas() (python -m src.cache --purgar).
+
+
+class BackendMemoria:
+    def __init__(self, versao, max_bytes):
+        self.versao = versao
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._tamanho = 0
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is not None:
+                self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._tamanho -= len(antigo)
+            self._itens[chave] = valor
+            self._tamanho += len(valor)
+            while self._tamanho > self.max_bytes and len(self._itens) > 1:
+                _, removido = self._itens.popitem(last=False)
+                self._tamanho -= len(removido)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._tamanho = 0
+
+    def remover_versoes_antigas(self):
+        # Por processo: só guarda a versão com que foi criado
+        return 0
+
+
+class BackendArquivos:
+    # Um arquivo por entrada em <pasta>/<versao>/; a data de modificação
+    # é atualizada a cada leitura e serve de ordem para a remoção.
+    VERIFICAR_A_CADA = 20
+
+    def __init__(self, pasta, versao, max_bytes):
+        self.versao = versao
+        self.max_bytes = max_bytes
+        self.raiz = pasta
+        self.pasta = os.path.join(pasta, versao)
+        os.makedirs(self.pasta, exist_ok=True)
+        self._gravacoes = 0
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, hashlib.sha1(chave.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                valor = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return valor
+
+    def set(self, chave, valor):
+        caminho = self._caminho(chave)
+        tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(valor)
+        os.replace(tmp, caminho)
+        self._gravacoes += 1
+        if self._gravacoes % self.VERIFICAR_A_CADA == 1:
+            self._aplicar_limite()
+
+    def _versoes_antigas(self):
+        return [
+            os.path.join(self.raiz, nome) for nome in os.listdir(self.raiz)
+            if nome != self.versao and os.path.isdir(os.path.join(self.raiz, nome))
+        ]
+
+    def remover_versoes_antigas(self):
+        removidas = 0
+        for caminho in self._versoes_antigas():
+            removidas += len(os.listdir(caminho))
+            shutil.rmtree(caminho, ignore_errors=True)
+        return removidas
+
+    def _aplicar_limite(self):
+        # O limite vale para a pasta inteira: arquivos de outras versões não
+        # são mais lidos, então ficam com as datas mais antigas e saem antes
+        arquivos = []
+        for pasta in [self.pasta] + self._versoes_antigas():
+            for entrada in os.scandir(pasta):
+                try:
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+
+    def limpar(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+        os.makedirs(self.pasta, exist_ok=True)
+
+
+class BackendSQLite:
+    # Uma conexão por thread; WAL permite leituras simultâneas de vários
+    # processos enquanto um deles grava.
+    def __init__(self, caminho, versao, max_bytes):
+        self.versao = versao
+        self.max_bytes = max_bytes
+        self.caminho = caminho
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with self._conexao() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "chave TEXT PRIMARY KEY, versao TEXT, valor BLOB, tamanho INTEGER, acesso REAL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS cache_acesso ON cache (acesso)")
+
+    def _conexao(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def get(self, chave):
+        con = self._conexao()
+        linha = con.execute(
+            "SELECT valor FROM cache WHERE chave = ? AND versao = ?", (chave, self.versao)
+        ).fetchone()
+        if linha is None:
+            return None
+        with con:
+            con.execute("UPDATE cache SET acesso = ? WHERE chave = ?", (time.time(), chave))
+        return linha[0]
+
+    def set(self, chave, valor):
+        con = self._conexao()
+        with con:
+            con.execute(
+                "INSERT OR REPLACE INTO cache (chave, versao, valor, tamanho, acesso) VALUES (?, ?, ?, ?, ?)",
+                (chave, self.versao, valor, len(valor), time.time()),
+            )
+            total = con.execute("SELECT COALESCE(SUM(tamanho), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                # Remove as entradas menos acessadas até cobrir o excedente
+                con.execute(
+                    "DELETE FROM cache WHERE chave IN ("
+                    " SELECT chave FROM ("
+                    "  SELECT chave, SUM(tamanho) OVER (ORDER BY acesso) - tamanho AS anterior FROM cache"
+                    " ) WHERE anterior < ?"
+                    ")",
+                    (total - self.max_bytes,),
+                )
+
+    def limpar(self):
+        con = self._conexao()
+        with con:
+            con.execute("DELETE FROM cache")
+
+    def remover_versoes_antigas(self):
+        con = self._conexao()
+        with con:
+            return con.execute("DELETE FROM cache WHERE versao != ?", (self.versao,)).rowcount
+
+
+def criar_backend(tipo, pasta, versao, max_bytes):
+    if tipo == "memoria":
+        return BackendMemoria(versao, max_bytes)
+    if tipo == "arquivos":
+        return BackendArquivos(os.path.join(pasta, "figuras"), versao, max_bytes)
+    if tipo == "sqlite":
+        return BackendSQLite(os.path.join(pasta, "cache.sqlite3"), versao, max_bytes)
+    raise ValueError(f"Backend de cache desconhecido: '{tipo}' (use memoria, arquivos ou sqlite)")
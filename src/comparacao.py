@@ -0,0 +1,91 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from src import cache
+
+# ============================================================
+# Comparação de N conjuntos de filtros em uma passada
+# ============================================================
+# Cada conjunto (programa, curso, status, período) vira uma coluna de uma
+# matriz de pertinência alunos x conjuntos. As linhas são "desdobradas"
+# (um par aluno/conjunto por aluno que pertence ao conjunto) e uma única
+# agregação agrupada por (Conjunto, Ano de matrícula, Status) dá tudo o
+# que os gráficos de comparação usam: matrículas por ano e distribuição de
+# status de cada conjunto saem de somas sobre esse cubo.
+#
+# Cada página compara sobre a própria tabela e com o próprio filtro (a
+# Análise Acadêmica classifica o status por Status_aluno, a Exploração por
+# Status): assim um conjunto conta os mesmos alunos que a página mostra.
+STATUS = ["Ativos", "Titulados", "Desligados", "Outros"]
+MAX_CONJUNTOS = 6
+
+# pagina -> (tabela, filtrar(programa, curso, status, inicio, fim), coluna de status)
+FONTES = {}
+
+
+def registrar_fonte(pagina, df, filtrar, coluna_status):
+    FONTES[pagina] = (df, filtrar, coluna_status)
+    comparar.cache_clear()
+
+
+def nome_conjunto(indice, programa=None, curso=None, status=None, inicio=None, fim=None):
+    partes = [", ".join(v) for v in (programa, curso, status) if v]
+    if inicio or fim:
+        partes.append(f"{inicio or '…'} a {fim or '…'}")
+    return f"{chr(ord('A') + indice)}: {' | '.join(partes) or 'Todos'}"
+
+
+def chaves(estados):
+    """Estados de filtro (dicts da página) -> tupla hashable de filtros normalizados."""
+    return tuple(cache.chave_filtros(estado) for estado in estados)
+
+
+@functools.lru_cache(maxsize=32)
+def comparar(pagina, conjuntos):
+    """Agrega os conjuntos de `chaves(...)` juntos sobre a tabela da página."""
+    df, filtrar, coluna_status = FONTES[pagina]
+    nomes = [nome_conjunto(i, *filtros) for i, filtros in enumerate(conjuntos)]
+    if not conjuntos:
+        return {"conjuntos": [], "anos": [], "matriculas": [], "status": {}, "kpis": []}
+
+    pertence = np.column_stack([
+        df.index.isin(filtrar(*filtros).index) for filtros in conjuntos
+    ])
+    linhas, grupo = np.nonzero(pertence)
+    longo = pd.DataFrame({
+        "Conjunto": pd.Categorical.from_codes(grupo, categories=nomes),
+        "Ano": pd.to_datetime(df["Primeira matrícula"], errors="coerce").dt.year.to_numpy()[linhas],
+        "Status": df[coluna_status].to_numpy()[linhas],
+        "Tempo": df["Tempo para titulação (meses)"].to_numpy()[linhas] if "Tempo para titulação (meses)" in df.columns else np.nan,
+    })
+
+    # Uma agregação para todos os conjuntos
+    cubo = longo.groupby(["Conjunto", "Ano", "Status"], observed=False, dropna=False).size()
+    tempo = longo.groupby("Conjunto", observed=False)["Tempo"].median()
+
+    por_ano = cubo.groupby(level=["Conjunto", "Ano"], observed=False).sum().unstack("Ano", fill_value=0)
+    por_ano = por_ano.loc[:, por_ano.columns.notna()]
+    por_status = cubo.groupby(level=["Conjunto", "Status"], observed=False).sum().unstack("Status", fill_value=0)
+    por_status = por_status.reindex(index=nomes, columns=STATUS, fill_value=0)
+    totais = por_status.sum(axis=1)
+
+    return {
+        "conjuntos": nomes,
+        "anos": [int(a) for a in por_ano.columns],
+        "matriculas": por_ano.reindex(nomes).fillna(0).astype(int).to_numpy().tolist(),
+        "status": {s: por_status[s].astype(int).tolist() for s in STATUS},
+        "kpis": [
+            {
+                "Conjunto": nome,
+                "Alunos": int(totais[nome]),
+                "Ativos": int(por_status.loc[nome, "Ativos"]),
+                "Titulados": int(por_status.loc[nome, "Titulados"]),
+                "Desligados": int(por_status.loc[nome, "Desligados"]),
+                "Taxa de titulação (%)": float(round(por_status.loc[nome, "Titulados"] / totais[nome] * 100, 1)) if totais[nome] else None,
+                "Mediana de meses até titular": None if pd.isna(tempo.get(nome)) else float(tempo[nome]),
+            }
+            for nome in nomes
+        ],
+    }
@@ -0,0 +1,96 @@
+import dash_bootstrap_components as dbc
+from dash import html, dcc, dash_table, Input, Output, State, callback, ctx, no_update
+
+from src import comparacao, figuras
+from src.components import filtros
+
+# ============================================================
+# Modo comparação (cartão reutilizado pelas páginas de análise)
+# ============================================================
+# "Adicionar à comparação" guarda o filtro aplicado na página como um
+# conjunto (até comparacao.MAX_CONJUNTOS). Os conjuntos são avaliados
+# juntos, em uma única agregação (src/comparacao.py), e os gráficos
+# mostram as séries de cada conjunto lado a lado.
+
+
+def id_conjuntos(pagina):
+    return f"comparacao-conjuntos-{pagina}"
+
+
+def cartao(pagina):
+    return dbc.Card([
+        dbc.CardHeader(html.H5("Modo Comparação", className="mb-0")),
+        dbc.CardBody([
+            dcc.Store(id=id_conjuntos(pagina), storage_type="session", data=[]),
+            dbc.Row([
+                dbc.Col(html.P("Aplique um filtro e adicione-o; repita para comparar programas, cursos ou períodos.",
+                               className="text-muted mb-0"), className="align-self-center"),
+                dbc.Col([
+                    dbc.Button([html.I(className="bi bi-plus-circle me-2"), "Adicionar à comparação"],
+                               id=f"btn-comparacao-adicionar-{pagina}", color="primary", size="sm", className="me-2"),
+                    dbc.Button([html.I(className="bi bi-x-circle me-2"), "Limpar"],
+                               id=f"btn-comparacao-limpar-{pagina}", color="secondary", size="sm"),
+                ], width="auto"),
+            ], className="mb-3"),
+            html.Div(id=f"comparacao-conteudo-{pagina}"),
+        ]),
+    ], className="bg-dark mb-4")
+
+
+def _conteudo(pagina, estados):
+    resultado = comparacao.comparar(pagina, comparacao.chaves(filtros.valores(e) for e in estados))
+    nomes = resultado["conjuntos"]
+    fig_anos = figuras.barras_agrupadas(
+        resultado["anos"], resultado["matriculas"], nomes,
+        "Matrículas por Ano", "Ano da Matrícula", "Nº de Alunos",
+        legend=dict(orientation="h", yanchor="top", y=-0.25), xaxis=dict(tickangle=-45),
+    )
+    fig_status = figuras.barras_agrupadas(
+        comparacao.STATUS, [[resultado["status"][s][i] for s in comparacao.STATUS] for i in range(len(nomes))], nomes,
+        "Distribuição de Status", "Status", "Nº de Alunos",
+        legend=dict(orientation="h", yanchor="top", y=-0.2),
+    )
+    return [
+        dash_table.DataTable(
+            data=resultado["kpis"],
+            columns=[{"name": c, "id": c} for c in resultado["kpis"][0]],
+            style_table={"overflowX": "auto"},
+            style_header={"backgroundColor": "#2c2c2c", "color": "white", "fontWeight": "bold"},
+            style_cell={"backgroundColor": "#1e1e1e", "color": "white", "textAlign": "left"},
+        ),
+        dbc.Row([
+            dbc.Col(dcc.Graph(figure=fig_anos), md=8),
+            dbc.Col(dcc.Graph(figure=fig_status), md=4),
+        ], className="mt-3"),
+    ]
+
+
+def registrar(pagina, df, filtrar, coluna_status):
+    """`df` e `filtrar` são a tabela e o filtro da própria página (ver comparacao.FONTES)."""
+    comparacao.registrar_fonte(pagina, df, filtrar, coluna_status)
+
+    @callback(
+        Output(id_conjuntos(pagina), "data"),
+        Input(f"btn-comparacao-adicionar-{pagina}", "n_clicks"),
+        Input(f"btn-comparacao-limpar-{pagina}", "n_clicks"),
+        State(filtros.id_estado(pagina), "data"),
+        State(id_conjuntos(pagina), "data"),
+        prevent_initial_call=True,
+    )
+    def atualizar_conjuntos(_adicionar, _limpar, estado, conjuntos):
+        if ctx.triggered_id == f"btn-comparacao-limpar-{pagina}":
+            return []
+        conjuntos = list(conjuntos or [])
+        estado = dict(zip(filtros.CAMPOS, filtros.valores(estado)))
+        if estado in conjuntos or len(conjuntos) >= comparacao.MAX_CONJUNTOS:
+            return no_update
+        return conjuntos + [estado]
+
+    @callback(
+        Output(f"comparacao-conteudo-{pagina}", "children"),
+        Input(id_conjuntos(pagina), "data"),
+    )
+    def atualizar_comparacao(conjuntos):
+        if not conjuntos:
+            return html.P("Nenhum conjunto adicionado.", className="text-muted")
+        return _conteudo(pagina, conjuntos)
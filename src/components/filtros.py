@@ -0,0 +1,272 @@
+import numpy as np
+import dash_bootstrap_components as dbc
+from dash import html, dcc, Input, Output, State, ClientsideFunction, callback, clientside_callback, no_update
+
+from src import busca, config
+
+# ============================================================
+# Filtros em lote: um único estado de filtro por página
+# ============================================================
+# Os dropdowns e o DatePickerRange não disparam mais os callbacks das
+# páginas diretamente. As mudanças ficam no navegador e só são gravadas,
+# todas juntas, no dcc.Store "filtros-<pagina>":
+#   - modo "aplicar": somente ao clicar em "Aplicar filtros";
+#   - modo "debounce": também automaticamente, depois de
+#     DASHBOARD_FILTROS_DEBOUNCE_MS sem novas mudanças.
+# Os callbacks do servidor escutam apenas esse Store (ver assets/filtros.js).
+#
+# O último estado aplicado em qualquer página também vai para o Store global
+# "filtro-estado" (sessão do navegador): ao navegar, display_page monta a
+# página já com esses filtros. Os resultados de cada página por estado ficam
+# em "figuras-cache", no navegador; voltar a um estado já visto redesenha os
+# gráficos a partir dele, sem ida ao servidor. Callbacks secundários da
+# página (opções dos dropdowns, gráficos com controles próprios, tabela)
+# usam o mesmo cache como "grupos": cada grupo tem seu par de Stores
+# pedido/resposta e pode pôr na chave o valor de outros controles (extras).
+CAMPOS = ["programa", "curso", "status", "inicio", "fim"]
+ID_GLOBAL = "filtro-estado"
+ID_CACHE = "figuras-cache"
+
+
+def id_estado(pagina):
+    return f"filtros-{pagina}"
+
+
+def id_cache(pagina, grupo=None):
+    # Nome da página (ou de um grupo de saídas dela) no cache do navegador
+    return f"{pagina}-{grupo}" if grupo else pagina
+
+
+def id_pedido(pagina, grupo=None):
+    return f"pedido-{id_cache(pagina, grupo)}"
+
+
+def id_resposta(pagina, grupo=None):
+    return f"resposta-{id_cache(pagina, grupo)}"
+
+
+def resposta(estado, *extras):
+    # Estado devolvido pelo servidor ao cache: o mesmo formato do pedido
+    # montado no navegador (filtros.js, consultar_cache)
+    return dict(estado or {}, extras=list(extras)) if extras else estado
+
+
+def estado_inicial(inicio, fim):
+    return dict(zip(CAMPOS, [None, None, None, inicio, fim]))
+
+
+def restaurar(estado, programas, cursos, status, inicio, fim):
+    # Estado global -> estado desta página: descarta opções que a página não tem
+    estado = estado or {}
+
+    def manter(campo, validos):
+        selecionados = [v for v in (estado.get(campo) or []) if v in validos]
+        return selecionados or None
+
+    return {
+        "programa": manter("programa", programas),
+        "curso": manter("curso", cursos),
+        "status": manter("status", status),
+        "inicio": estado.get("inicio") or inicio,
+        "fim": estado.get("fim") or fim,
+    }
+
+
+def stores_globais():
+    return [
+        dcc.Store(id=ID_GLOBAL, storage_type="session"),
+        dcc.Store(id=ID_CACHE, data={}),
+    ]
+
+
+def valores(estado):
+    # Ordem dos argumentos das funções gerar_figuras(...) das páginas
+    estado = estado or {}
+    return tuple(estado.get(campo) for campo in CAMPOS)
+
+
+def controles_lote(pagina, estado, grupos=()):
+    return dbc.Row([
+        dbc.Col(
+            dbc.Button([html.I(className="bi bi-funnel-fill me-2"), "Aplicar filtros"],
+                       id=f"btn-aplicar-{pagina}", color="primary", size="sm"),
+            width="auto"
+        ),
+        dcc.Store(id=id_estado(pagina), data=estado),
+        dcc.Store(id=f"filtros-debounce-{pagina}", data=config.FILTROS_DEBOUNCE_MS),
+        # Estado que precisa ir ao servidor (não estava no cache do navegador)
+        # e estado cujos resultados o servidor acabou de devolver, da página e
+        # de cada grupo de saídas (ver registrar_cache)
+        *[
+            dcc.Store(id=id_store(pagina, grupo))
+            for grupo in [None, "opcoes", *grupos]
+            for id_store in (id_pedido, id_resposta)
+        ],
+    ], justify="end", className="mt-3")
+
+
+def registrar_lote(pagina, programa_id, curso_id, status_id, periodo_id):
+    entradas = [
+        (programa_id, "value"),
+        (curso_id, "value"),
+        (status_id, "value"),
+        (periodo_id, "start_date"),
+        (periodo_id, "end_date"),
+    ]
+
+    clientside_callback(
+        ClientsideFunction(namespace="filtros", function_name="aplicar"),
+        Output(id_estado(pagina), "data"),
+        Input(f"btn-aplicar-{pagina}", "n_clicks"),
+        *[State(componente, prop) for componente, prop in entradas],
+        prevent_initial_call=True,
+    )
+
+    clientside_callback(
+        ClientsideFunction(namespace="filtros", function_name="compartilhar"),
+        Output(ID_GLOBAL, "data", allow_duplicate=True),
+        Input(id_estado(pagina), "data"),
+        prevent_initial_call=True,
+    )
+
+    if config.FILTROS_MODO == "debounce":
+        clientside_callback(
+            ClientsideFunction(namespace="filtros", function_name="debounce"),
+            Output(id_estado(pagina), "data", allow_duplicate=True),
+            *[Input(componente, prop) for componente, prop in entradas],
+            State(id_estado(pagina), "id"),
+            State(id_estado(pagina), "data"),
+            State(f"filtros-debounce-{pagina}", "data"),
+            prevent_initial_call=True,
+        )
+
+
+# Índices de busca de Programa por rota ("/page1" -> (IndiceBusca, IndiceDimensoes))
+_BUSCAS_PROGRAMA = {}
+
+
+def registrar_opcoes(pagina, indice, programa_id, curso_id, status_id):
+    """Opções dos dropdowns restritas pelos demais filtros aplicados, com contagens.
+
+    `indice` é um dimensoes.IndiceDimensoes da página. As opções de Curso e
+    Status entram no cache do navegador (grupo "opcoes"): só vão ao servidor
+    para um estado ainda não visto. Os ids dos dropdowns se repetem entre
+    páginas, daí allow_duplicate.
+
+    Programa pode ter centenas de valores: o layout só leva os selecionados
+    e os mais frequentes (opcoes_programa) e as demais opções vêm do
+    servidor conforme a digitação (busca.IndiceBusca), limitadas a
+    config.BUSCA_MAX_OPCOES. Esse callback é um só para todas as páginas
+    (ver _registrar_busca_programa).
+    """
+    saidas = [(curso_id, "options"), (status_id, "options")]
+    registrar_cache(pagina, saidas, grupo="opcoes")
+
+    @callback(
+        saidas_servidor(saidas, pagina, grupo="opcoes"),
+        Input(id_pedido(pagina, "opcoes"), "data"),
+        prevent_initial_call=True,
+    )
+    def atualizar_opcoes(estado):
+        return (*[indice.opcoes(campo, estado) for campo in ("curso", "status")], estado)
+
+    if not _BUSCAS_PROGRAMA:
+        _registrar_busca_programa(programa_id)
+    _BUSCAS_PROGRAMA[f"/{pagina}"] = (busca.IndiceBusca(indice.valores["programa"]), indice)
+
+
+def opcoes_programa(pagina, estado):
+    """Opções de Programa para o layout: as mesmas da busca sem texto.
+
+    Montadas junto com a página (display_page), para o dropdown não
+    precisar de outra ida ao servidor ao navegar.
+    """
+    rota = f"/{pagina}"
+    if rota not in _BUSCAS_PROGRAMA:
+        # Layout montado na importação, antes do registro da página
+        return [{"label": v, "value": v} for v in (estado or {}).get("programa") or []]
+    return _opcoes_programa(rota, None, estado, (estado or {}).get("programa"))
+
+
+def _opcoes_programa(rota, texto, estado, selecionados):
+    programas, indice = _BUSCAS_PROGRAMA[rota]
+    estado = _estado_da_pagina(estado, indice)
+    totais = indice.totais("programa", estado)
+    if texto:
+        posicoes = programas.buscar(texto, config.BUSCA_MAX_OPCOES, aceitar=totais > 0)
+    else:
+        # Sem texto: os programas com mais alunos no recorte
+        posicoes = [int(p) for p in np.argsort(-totais, kind="stable")[:config.BUSCA_MAX_OPCOES] if totais[p] > 0]
+    opcoes = indice.opcoes("programa", estado, posicoes, selecionados, totais)
+    # "search": o filtro do dropdown no navegador também ignora acentos
+    return [dict(o, search=f"{o['value']} {busca.normalizar(o['value'])}") for o in opcoes]
+
+
+def _estado_da_pagina(estado, indice):
+    # Como restaurar(): seleções que a página não tem são descartadas
+    estado = dict(estado or {})
+    for campo in indice.campos:
+        estado[campo] = [v for v in (estado.get(campo) or []) if v in indice.valores[campo]] or None
+    return estado
+
+
+def _registrar_busca_programa(programa_id):
+    # O dropdown de Programa tem o mesmo id em várias páginas; um callback por
+    # página teria entradas de outras páginas ausentes do layout. Este usa só
+    # componentes sempre presentes (rota e estado global, que recebe cada
+    # filtro aplicado) e escolhe o índice pela rota. Não roda ao montar a
+    # página: as opções iniciais já vêm no layout (opcoes_programa).
+    @callback(
+        Output(programa_id, "options"),
+        Input(programa_id, "search_value"),
+        Input(ID_GLOBAL, "data"),
+        State("url", "pathname"),
+        State(programa_id, "value"),
+        prevent_initial_call=True,
+    )
+    def buscar_programas(texto, estado, rota, selecionados):
+        if rota not in _BUSCAS_PROGRAMA:
+            return no_update
+        return _opcoes_programa(rota, texto, estado, selecionados)
+
+
+def registrar_cache(pagina, saidas, grupo=None, extras=()):
+    """Liga o cache do navegador às saídas da página.
+
+    `saidas` é a lista de (id, propriedade) que o callback do servidor da
+    página atualiza. O callback do servidor deve escutar
+    Input(id_pedido(pagina, grupo)) com saidas_servidor(...) e devolver, por
+    último, resposta(estado, *extras).
+
+    `grupo` separa no cache as saídas de um callback secundário da página
+    (os Stores do grupo vêm de controles_lote(..., grupos=[grupo])).
+    `extras` são (id, propriedade) de outros controles de que essas saídas
+    dependem; seus valores entram na chave junto com o estado dos filtros.
+    """
+    clientside_callback(
+        ClientsideFunction(namespace="filtros", function_name="consultar_cache"),
+        *[Output(componente, prop, allow_duplicate=True) for componente, prop in saidas],
+        Output(id_pedido(pagina, grupo), "data"),
+        Input(id_estado(pagina), "data"),
+        State(ID_CACHE, "data"),
+        State(id_pedido(pagina, grupo), "id"),
+        *[State(componente, prop) for componente, prop in extras],
+        prevent_initial_call="initial_duplicate",
+    )
+
+    clientside_callback(
+        ClientsideFunction(namespace="filtros", function_name="guardar_cache"),
+        Output(ID_CACHE, "data", allow_duplicate=True),
+        Input(id_resposta(pagina, grupo), "data"),
+        *[State(componente, prop) for componente, prop in saidas],
+        State(ID_CACHE, "data"),
+        State(id_resposta(pagina, grupo), "id"),
+        prevent_initial_call=True,
+    )
+
+
+def saidas_servidor(saidas, pagina, grupo=None):
+    # Saídas do callback do servidor que atende o pedido da página (ou do grupo)
+    return [Output(componente, prop, allow_duplicate=True) for componente, prop in saidas] + [
+        Output(id_resposta(pagina, grupo), "data")
+    ]
@@ -0,0 +1,53 @@
+import os
+
+# ============================================================
+# Configurações da aplicação (variáveis de ambiente)
+# ============================================================
+# Pasta raiz do projeto (junto com dashboard_home.py)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pasta onde ficam os artefatos gerados em tempo de execução
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+# Cache de figuras: memoria (por processo), arquivos ou sqlite (compartilhados
+# entre os workers da mesma máquina), limitado pelo tamanho total em MB
+CACHE_BACKEND = os.environ.get("DASHBOARD_CACHE_BACKEND", "sqlite")
+CACHE_MAX_MB = int(os.environ.get("DASHBOARD_CACHE_MAX_MB", 256))
+
+# Aquecimento do cache após o boot
+AQUECIMENTO_ATIVO = os.environ.get("DASHBOARD_AQUECIMENTO", "1") != "0"
+AQUECIMENTO_TOP_N = int(os.environ.get("DASHBOARD_AQUECIMENTO_TOP_N", 10))
+
+# Construção paralela das figuras de um callback (1 = sequencial)
+FIGURAS_THREADS = int(os.environ.get("DASHBOARD_FIGURAS_THREADS", 4))
+LOG_TEMPOS = os.environ.get("DASHBOARD_LOG_TEMPOS", "0") == "1"
+
+# Callbacks em segundo plano: processos simultâneos e validade do resultado (s)
+TAREFAS_MAX = int(os.environ.get("DASHBOARD_TAREFAS_MAX", 2))
+TAREFAS_EXPIRA = int(os.environ.get("DASHBOARD_TAREFAS_EXPIRA", 3600))
+
+# Filtros em lote: "aplicar" (só pelo botão) ou "debounce" (botão ou pausa na digitação)
+FILTROS_MODO = os.environ.get("DASHBOARD_FILTROS_MODO", "debounce")
+FILTROS_DEBOUNCE_MS = int(os.environ.get("DASHBOARD_FILTROS_DEBOUNCE_MS", 700))
+
+# Artefatos gerados no build (ex.: Home pré-calculada)
+ARTEFATOS_DIR = os.environ.get("DASHBOARD_ARTEFATOS_DIR", os.path.join(BASE_DIR, "artefatos"))
+
+# Séries temporais longas (WebGL): pontos máximos por linha no intervalo visível
+SERIE_MAX_PONTOS = int(os.environ.get("DASHBOARD_SERIE_MAX_PONTOS", 200))
+
+# Exportação dos alunos filtrados: linhas por bloco e limite para baixar na hora
+# (acima dele o arquivo é gerado em segundo plano)
+EXPORTAR_BLOCO = int(os.environ.get("DASHBOARD_EXPORTAR_BLOCO", 5000))
+EXPORTAR_LIMITE_DIRETO = int(os.environ.get("DASHBOARD_EXPORTAR_LIMITE_DIRETO", 50000))
+
+# Análise por coorte: meses decorridos desde a primeira matrícula (horizonte)
+COORTES_MESES = int(os.environ.get("DASHBOARD_COORTES_MESES", 120))
+
+# Risco de evasão: probabilidade estimada de desligamento a partir da qual o
+# aluno ativo entra na faixa de risco médio e na de risco alto
+RISCO_LIMIAR_MEDIO = float(os.environ.get("DASHBOARD_RISCO_LIMIAR_MEDIO", 0.1))
+RISCO_LIMIAR_ALTO = float(os.environ.get("DASHBOARD_RISCO_LIMIAR_ALTO", 0.25))
+
+# Busca nos dropdowns de alta cardinalidade (ex.: Programa): opções devolvidas por consulta
+BUSCA_MAX_OPCOES = int(os.environ.get("DASHBOARD_BUSCA_MAX_OPCOES", 20))
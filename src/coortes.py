@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from src import cache, config, dados
+
+# ============================================================
+# Análise por coorte (ano da primeira matrícula x Curso)
+# ============================================================
+# Para cada coorte e cada mês decorrido desde a primeira matrícula, a
+# fração acumulada de alunos já titulados, já desligados e ainda ativos.
+#   - Titulado: mês da "Data da defesa" (ou da "Data da ocorrência", se
+#     faltar a defesa);
+#   - Desligado: mês da "Data da ocorrência";
+#   - Outros: alunos cuja trajetória não dá para situar no tempo (status
+#     "Outros", ou titulado/desligado sem data do evento); ficam como uma
+#     fração própria, constante desde o ingresso, e não contam como ativos;
+#   - Ativos: o restante (1 - titulados - desligados - outros).
+# Tudo é feito de uma vez sobre a tabela inteira (np.add.at + cumsum ao
+# longo dos meses), uma vez por versão dos dados, e fica no cache de
+# figuras. Meses que a coorte ainda não viveu (depois da data de corte dos
+# dados) ficam vazios.
+SITUACOES = ["Titulados", "Desligados", "Ativos", "Outros"]
+MESES = config.COORTES_MESES
+
+
+def _meses_entre(inicio, fim):
+    return (fim.dt.year - inicio.dt.year) * 12 + (fim.dt.month - inicio.dt.month)
+
+
+def _vazio():
+    return {"anos": [], "cursos": [], "meses": [], "alunos": [], "corte": None,
+            "fracoes": {nome: [] for nome in SITUACOES}}
+
+
+@cache.memoizar("coortes", versao=2)
+def calcular():
+    df = dados.carregar()
+    df = df[df["Primeira matrícula"].notna() & df["Curso"].notna()]
+    corte = df["Data da ocorrência"].max()
+    if df.empty or pd.isna(corte):
+        return _vazio()
+
+    evento = df["Data da defesa"].where(df["Status_aluno"] == "Titulados").fillna(df["Data da ocorrência"])
+    decorridos = _meses_entre(df["Primeira matrícula"], evento).clip(lower=0)
+    # 0 = titulado, 1 = desligado (com data), 2 = outros, -1 = ativo
+    situacao = pd.Series(-1, index=df.index)
+    situacao[df["Status_aluno"] == "Titulados"] = 0
+    situacao[df["Status_aluno"] == "Desligados"] = 1
+    situacao[~df["Status_aluno"].isin(["Ativos", "Titulados", "Desligados"]) | ((situacao >= 0) & decorridos.isna())] = 2
+
+    # Coorte = (ano da primeira matrícula, Curso)
+    chaves = pd.MultiIndex.from_arrays([df["Primeira matrícula"].dt.year, df["Curso"]])
+    codigos, coortes = pd.factorize(chaves, sort=True)
+    alunos = np.bincount(codigos, minlength=len(coortes))
+
+    # Eventos por coorte x situação x mês (eventos depois do horizonte ficam fora)
+    eventos = np.zeros((len(coortes), 2, MESES + 1), dtype=np.int64)
+    com_evento = situacao.isin([0, 1]).to_numpy() & (decorridos <= MESES).to_numpy()
+    np.add.at(
+        eventos,
+        (codigos[com_evento], situacao.to_numpy()[com_evento], decorridos.to_numpy()[com_evento].astype(int)),
+        1,
+    )
+    acumulado = eventos.cumsum(axis=2) / alunos[:, None, None]
+    outros = np.bincount(codigos[(situacao == 2).to_numpy()], minlength=len(coortes)) / alunos
+    outros = np.broadcast_to(outros[:, None], acumulado[:, 0].shape)
+    fracoes = {
+        "Titulados": acumulado[:, 0],
+        "Desligados": acumulado[:, 1],
+        "Ativos": 1 - acumulado[:, 0] - acumulado[:, 1] - outros,
+        "Outros": outros,
+    }
+
+    # Meses ainda não vividos pela coorte: a partir do ingresso mais antigo dela
+    primeiro = df.groupby(codigos)["Primeira matrícula"].min().reindex(range(len(coortes)))
+    vividos = _meses_entre(primeiro, pd.Series(corte, index=primeiro.index)).to_numpy()
+    futuro = np.arange(MESES + 1)[None, :] > vividos[:, None]
+    for nome in fracoes:
+        fracoes[nome] = np.where(futuro, np.nan, fracoes[nome]).round(4)
+
+    return {
+        "anos": [int(ano) for ano, _ in coortes],
+        "cursos": [curso for _, curso in coortes],
+        "meses": list(range(MESES + 1)),
+        "alunos": alunos.tolist(),
+        "corte": corte.date().isoformat(),
+        "fracoes": {nome: valores.tolist() for nome, valores in fracoes.items()},
+    }
+
+
+def matriz(curso, situacao):
+    """(anos, meses, valores, alunos) das coortes de um curso, para o mapa de calor."""
+    resultado = calcular()
+    linhas = [i for i, c in enumerate(resultado["cursos"]) if c == curso]
+    valores = [resultado["fracoes"][situacao][i] for i in linhas]
+    return (
+        [resultado["anos"][i] for i in linhas],
+        resultado["meses"],
+        valores,
+        [resultado["alunos"][i] for i in linhas],
+    )
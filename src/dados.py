@@ -0,0 +1,56 @@
+import functools
+import hashlib
+import os
+
+import pandas as pd
+
+from src import config
+
+# ============================================================
+# Arquivo de dados compartilhado e sua versão
+# ============================================================
+# Todas as páginas leem o mesmo 'USP_Completa.xlsx' da pasta raiz.
+# A versão é o hash do conteúdo do arquivo: qualquer artefato derivado
+# (cache, JSON pré-calculado) carrega essa versão e é descartado quando
+# os dados mudam.
+DATA_PATH = os.path.join(config.BASE_DIR, "USP_Completa.xlsx")
+
+
+@functools.lru_cache(maxsize=None)
+def versao_dados(path=DATA_PATH):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()[:16]
+    except FileNotFoundError:
+        return "sem-dados"
+
+
+# ============================================================
+# Tabela compartilhada (sem Dash) para os motores de análise
+# ============================================================
+# Mesma normalização das páginas: cursos "Doutorado Direto"/"Doutora" viram
+# "Doutorado", datas convertidas e a classificação de status do filtro da
+# Análise Acadêmica (Ativos, Titulados, Desligados, Outros).
+STATUS_ATIVOS = ["Matrícula de Acompanhamento", "Matriculado", "Mudança de Nível", "Prorrogação", "Trancado", "Transferido de Área"]
+COLUNAS_DATA = ["Primeira matrícula", "Data da ocorrência", "Data da defesa", "Nascimento"]
+
+
+@functools.lru_cache(maxsize=1)
+def carregar(path=DATA_PATH):
+    try:
+        df = pd.read_excel(path)
+    except FileNotFoundError:
+        print(f"ERRO CRÍTICO (dados): O arquivo 'USP_Completa.xlsx' não foi encontrado no caminho esperado: '{path}'.")
+        df = pd.DataFrame(columns=["Programa", "Curso", "Última ocorrência", *COLUNAS_DATA])
+
+    df["Curso"] = df["Curso"].replace({"Doutorado Direto": "Doutorado", "Doutora": "Doutorado"})
+    for coluna in COLUNAS_DATA:
+        df[coluna] = pd.to_datetime(df[coluna], errors="coerce")
+    df["Ano_matricula"] = df["Primeira matrícula"].dt.year
+
+    ocorrencia = df["Última ocorrência"].astype(str).str.strip().str.lower()
+    df["Status_aluno"] = "Outros"
+    df.loc[ocorrencia.isin([a.lower() for a in STATUS_ATIVOS]), "Status_aluno"] = "Ativos"
+    df.loc[ocorrencia == "desligado", "Status_aluno"] = "Desligados"
+    df.loc[ocorrencia.isin(["titulado", "titulados"]), "Status_aluno"] = "Titulados"
+    return df
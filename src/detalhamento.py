@@ -0,0 +1,62 @@
+import pandas as pd
+
+# ============================================================
+# Detalhamento (drill-down): Programa → Curso → Coorte → Alunos
+# ============================================================
+# O caminho é uma lista de [dimensão, valor] na ordem em que o usuário
+# desceu. O próximo nível é a primeira dimensão de NIVEIS que ainda não
+# está no caminho; com todas preenchidas chega-se aos alunos.
+#   - Os níveis agregados saem de um índice de contagens (uma Series com
+#     MultiIndex Programa x Curso x Ano, calculada uma vez por recorte de
+#     filtros): cada nível só soma as contagens do ramo escolhido, sem reler
+#     as linhas.
+#   - A lista de alunos só é montada no último nível, paginada no servidor.
+NIVEIS = ["Programa", "Curso", "Ano"]
+ROTULOS = {"Programa": "Programa", "Curso": "Curso", "Ano": "Coorte (ano de ingresso)"}
+
+
+def _colunas(df):
+    return [df["Programa"], df["Curso"], df["Primeira matrícula"].dt.year.rename("Ano")]
+
+
+def indice_contagens(df):
+    """Contagem de alunos por (Programa, Curso, Ano de ingresso)."""
+    return df.groupby(_colunas(df)).size()
+
+
+def proximo_nivel(caminho):
+    usados = {dimensao for dimensao, _ in caminho or []}
+    return next((n for n in NIVEIS if n not in usados), None)
+
+
+def avancar(caminho, dimensao, valor):
+    """Caminho com `dimensao` = `valor` (substitui se a dimensão já estiver nele)."""
+    if dimensao == "Ano":
+        valor = int(float(valor))
+    return [[d, v] for d, v in caminho or [] if d != dimensao] + [[dimensao, valor]]
+
+
+def agregado(indice, caminho):
+    """Contagens do próximo nível dentro do ramo do caminho (maiores primeiro)."""
+    nivel = proximo_nivel(caminho)
+    if nivel is None or indice.empty:
+        return nivel, pd.Series(dtype=int)
+    ramo = indice
+    for dimensao, valor in caminho or []:
+        ramo = ramo[ramo.index.get_level_values(dimensao) == valor]
+    contagens = ramo.groupby(level=nivel).sum()
+    return nivel, (contagens.sort_index() if nivel == "Ano" else contagens.sort_values(ascending=False))
+
+
+def mascara(df, caminho):
+    """Linhas de `df` no ramo do caminho (usado só no último nível)."""
+    selecionadas = pd.Series(True, index=df.index)
+    colunas = {c.name: c for c in _colunas(df)}
+    for dimensao, valor in caminho or []:
+        selecionadas &= colunas[dimensao] == valor
+    return selecionadas
+
+
+def trilha(caminho):
+    """Rótulos do breadcrumb: "Todos" e um por passo do caminho."""
+    return ["Todos"] + [f"{ROTULOS[d]}: {v}" for d, v in caminho or []]
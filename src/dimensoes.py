@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Índice de dimensões para opções de filtro dependentes
+# ============================================================
+# As opções de cada dropdown (Programa, Curso, Status) mostram só os valores
+# que ainda têm alunos com os demais filtros aplicados, com a contagem no
+# rótulo. Para não filtrar a tabela a cada mudança, o índice é montado uma
+# vez por página:
+#   - cada combinação Programa x Curso x Status é uma "célula";
+#   - as datas da primeira matrícula ficam ordenadas dentro de cada célula,
+#     em um único array com chave (célula, dia).
+# Contar todas as células de um período são duas buscas binárias
+# vetorizadas (np.searchsorted); o resto é somar eixos de um cubo pequeno.
+_SEM_DATA = np.int64(-(2 ** 40))
+_PASSO = np.int64(2 ** 41)
+
+
+class IndiceDimensoes:
+    def __init__(self, df, dimensoes, coluna_data, permitidos=None):
+        """`dimensoes` liga o campo do filtro à coluna ({"programa": "Programa", ...}).
+
+        `permitidos` limita os valores de um campo às opções que a página
+        oferece (ex.: sem "Outros" no status).
+        """
+        self.campos = list(dimensoes)
+        permitidos = permitidos or {}
+        validos = pd.Series(True, index=df.index)
+        for campo, coluna in dimensoes.items():
+            validos &= df[coluna].notna()
+            if campo in permitidos:
+                validos &= df[coluna].isin(permitidos[campo])
+
+        self.valores, codigos = {}, []
+        for campo, coluna in dimensoes.items():
+            presentes = set(df.loc[validos, coluna])
+            # Mesma ordem das opções da página (ou alfabética)
+            self.valores[campo] = [v for v in permitidos.get(campo, sorted(presentes)) if v in presentes]
+            codigos.append(pd.Categorical(df.loc[validos, coluna], categories=self.valores[campo]).codes.astype(np.int64))
+        self.forma = tuple(len(self.valores[c]) for c in self.campos)
+        celulas = np.ravel_multi_index(codigos, self.forma) if all(self.forma) else np.zeros(0, dtype=np.int64)
+
+        datas = pd.to_datetime(df.loc[validos, coluna_data], errors="coerce")
+        dias = datas.to_numpy("datetime64[D]").astype(np.int64)
+        dias = np.where(datas.isna().to_numpy(), _SEM_DATA, dias)
+        self.chaves = np.sort(celulas.astype(np.int64) * _PASSO + dias)
+        self.n_celulas = int(np.prod(self.forma)) if all(self.forma) else 0
+
+    def contagens(self, inicio=None, fim=None):
+        """Cubo de contagens Programa x Curso x Status no período (datas inclusivas)."""
+        if not self.n_celulas:
+            return np.zeros(self.forma, dtype=np.int64)
+        base = np.arange(self.n_celulas, dtype=np.int64) * _PASSO
+        if inicio and fim:
+            de = np.datetime64(pd.Timestamp(inicio).date(), "D").astype(np.int64)
+            ate = np.datetime64(pd.Timestamp(fim).date(), "D").astype(np.int64)
+        else:
+            de, ate = _SEM_DATA, _PASSO // 2
+        a = np.searchsorted(self.chaves, base + de, side="left")
+        b = np.searchsorted(self.chaves, base + ate, side="right")
+        return (b - a).reshape(self.forma)
+
+    def totais(self, campo, estado):
+        """Contagem de cada valor de `campo` (na ordem de self.valores[campo]) dados os outros filtros."""
+        estado = estado or {}
+        cubo = self.contagens(estado.get("inicio"), estado.get("fim"))
+        for eixo, outro in enumerate(self.campos):
+            escolhidos = estado.get(outro)
+            if outro == campo or not escolhidos:
+                continue
+            manter = np.isin(self.valores[outro], escolhidos)
+            cubo = np.compress(manter, cubo, axis=eixo)
+            cubo = np.expand_dims(cubo.sum(axis=eixo), eixo)
+        eixo = self.campos.index(campo)
+        return cubo.sum(axis=tuple(i for i in range(cubo.ndim) if i != eixo))
+
+    def opcoes(self, campo, estado, posicoes=None, selecionados=None, totais=None):
+        """Opções do dropdown `campo` ({"label": "Valor (n)", "value": valor}) dados os outros filtros.
+
+        Valores sem alunos somem, exceto os selecionados (por padrão, os do
+        próprio campo no estado). `posicoes` restringe a lista a alguns
+        valores (ex.: resultado de uma busca).
+        """
+        totais = self.totais(campo, estado) if totais is None else totais
+        valores = self.valores[campo]
+        if selecionados is None:
+            selecionados = (estado or {}).get(campo)
+        selecionados = set(selecionados or [])
+        posicoes = range(len(valores)) if posicoes is None else posicoes
+        escolhidas = [p for p in posicoes if totais[p] > 0 or valores[p] in selecionados]
+        # Selecionados fora da lista continuam como opção (senão o dropdown os perde)
+        faltando = selecionados - {valores[p] for p in escolhidas}
+        escolhidas += [p for p, valor in enumerate(valores) if valor in faltando]
+        return [{"label": f"{valores[p]} ({int(totais[p])})", "value": valores[p]} for p in escolhidas]
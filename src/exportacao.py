@@ -0,0 +1,193 @@
+import codecs
+import hashlib
+import io
+import json
+import os
+import tempfile
+from urllib.parse import urlencode
+
+from flask import Response, abort, request, send_from_directory, stream_with_context
+
+from src import config, dados
+
+# ============================================================
+# Exportação dos alunos filtrados (CSV, Parquet e XLSX)
+# ============================================================
+# As linhas saem em blocos de DASHBOARD_EXPORTAR_BLOCO, sem montar o
+# arquivo inteiro em memória:
+#   - CSV: cada bloco vai direto para a resposta HTTP (o download começa
+#     na hora);
+#   - Parquet: cada bloco vira um row group, enviado assim que é escrito;
+#   - XLSX: não é streaming. openpyxl em modo write-only grava o arquivo
+#     inteiro (o formato zip só fecha no fim) antes do primeiro byte; por
+#     isso o XLSX sempre vai para a tarefa em segundo plano quando ela está
+#     disponível, e a rota direta só serve de alternativa sem ela.
+# Exportações com mais de DASHBOARD_EXPORTAR_LIMITE_DIRETO linhas (ou fora
+# de STREAMING) rodam como tarefa em segundo plano (ver dashboard_home.py)
+# e ficam em EXPORTACOES_DIR.
+EXPORTACOES_DIR = os.path.join(config.CACHE_DIR, "exportacoes")
+BYTES_POR_ENVIO = 1024 * 1024
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+CAMPOS = ["programa", "curso", "status", "inicio", "fim"]
+# Formatos cujo download direto começa antes de o arquivo estar pronto
+STREAMING = {"csv", "parquet"}
+
+
+def _formatos_disponiveis():
+    formatos = ["csv", "xlsx"]
+    try:
+        import pyarrow  # noqa: F401
+        formatos.insert(1, "parquet")
+    except ImportError:
+        print("⚠️ AVISO (exportação): pyarrow não instalado; exportação em Parquet indisponível.")
+    return formatos
+
+
+DISPONIVEIS = _formatos_disponiveis()
+
+
+def blocos(df, progresso=None):
+    # Fatias de DASHBOARD_EXPORTAR_BLOCO linhas; progresso(escritas, total) após cada uma
+    tamanho = config.EXPORTAR_BLOCO
+    for inicio in range(0, len(df), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+        if progresso:
+            progresso(min(inicio + tamanho, len(df)), len(df))
+
+
+def gerar_csv(df, progresso=None):
+    # BOM para o Excel reconhecer UTF-8 (acentos)
+    yield codecs.BOM_UTF8 + df.iloc[:0].to_csv(index=False).encode("utf-8")
+    for bloco in blocos(df, progresso):
+        yield bloco.to_csv(index=False, header=False).encode("utf-8")
+
+
+class _Saida(io.RawIOBase):
+    # Arquivo só de escrita que acumula os bytes até alguém retirá-los
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.buffer.extend(b)
+        return len(b)
+
+    def retirar(self):
+        dados_escritos, self.buffer = bytes(self.buffer), bytearray()
+        return dados_escritos
+
+
+def _para_parquet(bloco):
+    # Colunas "object" misturam tipos (ex.: datas e textos); vão como texto
+    mistas = bloco.columns[bloco.dtypes == object]
+    return bloco.astype({c: "string" for c in mistas})
+
+
+def gerar_parquet(df, progresso=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    saida = _Saida()
+    esquema = pa.Schema.from_pandas(_para_parquet(df.iloc[:0]), preserve_index=False)
+    with pq.ParquetWriter(saida, esquema) as escritor:
+        for bloco in blocos(df, progresso):
+            escritor.write_table(pa.Table.from_pandas(_para_parquet(bloco), schema=esquema, preserve_index=False))
+            yield saida.retirar()
+    yield saida.retirar()
+
+
+def _valor_xlsx(valor):
+    # openpyxl não aceita NaN/NaT
+    return None if valor != valor else valor
+
+
+def gravar_xlsx(df, destino, progresso=None):
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet("Alunos")
+    planilha.append(list(df.columns))
+    for bloco in blocos(df, progresso):
+        for linha in bloco.itertuples(index=False, name=None):
+            planilha.append([_valor_xlsx(v) for v in linha])
+    livro.save(destino)
+
+
+def gerar_xlsx(df):
+    arquivo = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+    arquivo.close()
+    try:
+        gravar_xlsx(df, arquivo.name)
+        with open(arquivo.name, "rb") as f:
+            while pedaco := f.read(BYTES_POR_ENVIO):
+                yield pedaco
+    finally:
+        os.remove(arquivo.name)
+
+
+GERADORES = {"csv": gerar_csv, "parquet": gerar_parquet, "xlsx": gerar_xlsx}
+
+
+def gravar(df, formato, destino, progresso=None):
+    """Grava a exportação em `destino` (usado pelas tarefas em segundo plano)."""
+    tmp = f"{destino}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    if formato == "xlsx":
+        gravar_xlsx(df, tmp, progresso)
+    else:
+        with open(tmp, "wb") as f:
+            for pedaco in GERADORES[formato](df, progresso):
+                f.write(pedaco)
+    os.replace(tmp, destino)
+
+
+def nome_arquivo(estado, formato):
+    # Mesmo filtro e mesma versão dos dados -> mesmo arquivo
+    chave = json.dumps([estado.get(c) for c in CAMPOS], sort_keys=True, default=str)
+    resumo = hashlib.sha256(chave.encode("utf-8")).hexdigest()[:16]
+    return f"alunos-{dados.versao_dados()}-{resumo}.{FORMATOS[formato][1]}"
+
+
+def url_exportacao(estado, formato):
+    parametros = {c: v for c, v in (estado or {}).items() if c in CAMPOS and v}
+    return f"/exportar/{formato}?{urlencode(parametros, doseq=True)}"
+
+
+def _estado_da_requisicao():
+    return (
+        request.args.getlist("programa") or None,
+        request.args.getlist("curso") or None,
+        request.args.getlist("status") or None,
+        request.args.get("inicio"),
+        request.args.get("fim"),
+    )
+
+
+def registrar_rotas(server, consultar):
+    """Rotas de download.
+
+    `consultar(programa, curso, status, inicio, fim)` devolve o DataFrame
+    filtrado que será exportado.
+    """
+    @server.route("/exportar/<formato>")
+    def exportar(formato):
+        if formato not in DISPONIVEIS:
+            abort(404)
+        df = consultar(*_estado_da_requisicao())
+        mimetype, extensao = FORMATOS[formato]
+        return Response(
+            stream_with_context(GERADORES[formato](df)),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f'attachment; filename="alunos.{extensao}"'},
+        )
+
+    @server.route("/exportar/arquivos/<nome>")
+    def exportacao_pronta(nome):
+        return send_from_directory(EXPORTACOES_DIR, nome, as_attachment=True)
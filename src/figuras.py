@@ -0,0 +1,200 @@
+import functools
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# ============================================================
+# Construtores leves de figuras (sem plotly.express)
+# ============================================================
+# Para entradas já agregadas (poucas barras, fatias de uma pizza) quase
+# todo o custo do plotly.express está na validação do DataFrame, no
+# agrupamento de traces e na resolução do template. Aqui os traces são
+# montados direto com graph_objects a partir dos arrays agregados e o
+# layout base (template do dashboard já resolvido) é calculado uma única
+# vez. O resultado é o dicionário da figura, que o dcc.Graph aceita como
+# está. Comparação de tempos:
+#   python benchmarks/bench_figuras.py
+#
+# Tema: o estilo comum dos gráficos fica em templates do Plotly registrados
+# na importação deste módulo. Os gráficos já nascem estilizados (px com
+# template=figuras.TEMPLATE), sem cadeias de update_layout por figura.
+#   - "dashboard": plotly_dark com fundo transparente (páginas 1, 2, 3 e Home);
+#   - "dashboard_faixas": tema da página de faixa etária (fonte clara,
+#     título centralizado e grade suave sobre o template padrão do Plotly).
+TEMPLATE = "dashboard"
+TEMPLATE_FAIXAS = "dashboard_faixas"
+FUNDO_TRANSPARENTE = "rgba(0,0,0,0)"
+
+
+def _registrar_templates():
+    dashboard = go.layout.Template(pio.templates["plotly_dark"])
+    dashboard.layout.update(paper_bgcolor=FUNDO_TRANSPARENTE, plot_bgcolor=FUNDO_TRANSPARENTE)
+    pio.templates[TEMPLATE] = dashboard
+
+    grade = dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)")
+    faixas = go.layout.Template(pio.templates["plotly"])
+    faixas.layout.update(
+        paper_bgcolor=FUNDO_TRANSPARENTE, plot_bgcolor=FUNDO_TRANSPARENTE,
+        font_color="#dbe9ff", title_font_size=18, title_x=0.5,
+        xaxis=grade, yaxis=grade,
+    )
+    pio.templates[TEMPLATE_FAIXAS] = faixas
+
+
+_registrar_templates()
+
+
+@functools.lru_cache(maxsize=None)
+def _template():
+    return pio.templates[TEMPLATE].to_plotly_json()
+
+
+def layout_base(titulo, **extra):
+    layout = {"template": _template(), "title": {"text": titulo}}
+    layout.update(extra)
+    return layout
+
+
+def vazia(titulo, texto="Sem dados para os filtros", **layout):
+    """Figura sem dados: só o título e um aviso no centro, eixos ocultos."""
+    return {
+        "data": [],
+        "layout": layout_base(
+            titulo, xaxis={"visible": False}, yaxis={"visible": False},
+            annotations=[{"text": texto, "x": 0.5, "y": 0.5, "showarrow": False}],
+            **layout
+        ),
+    }
+
+
+def _valores(seq):
+    return seq.tolist() if hasattr(seq, "tolist") else list(seq)
+
+
+def barras(categorias, valores, titulo, rotulo_categoria, rotulo_valor,
+           texto=False, posicao_texto=None, horizontal=False, **layout):
+    """Barras simples a partir de categorias e totais já agregados.
+
+    `texto=True` mostra o valor em cada barra (como text_auto do px).
+    Os demais argumentos nomeados vão para o layout da figura.
+    """
+    categorias, valores = _valores(categorias), _valores(valores)
+    x, y = (valores, categorias) if horizontal else (categorias, valores)
+    rotulo_x, rotulo_y = (rotulo_valor, rotulo_categoria) if horizontal else (rotulo_categoria, rotulo_valor)
+    trace = go.Bar(
+        x=x, y=y,
+        orientation="h" if horizontal else "v",
+        hovertemplate=f"{rotulo_x}=%{{x}}<br>{rotulo_y}=%{{y}}<extra></extra>",
+        texttemplate=("%{x}" if horizontal else "%{y}") if texto else None,
+        textposition=posicao_texto,
+        showlegend=False,
+    )
+    eixo_x = {"title": {"text": rotulo_x}}
+    eixo_y = {"title": {"text": rotulo_y}}
+    eixo_x.update(layout.pop("xaxis", {}))
+    eixo_y.update(layout.pop("yaxis", {}))
+    return {
+        "data": [trace.to_plotly_json()],
+        "layout": layout_base(titulo, xaxis=eixo_x, yaxis=eixo_y, **layout),
+    }
+
+
+def pizza(rotulos, valores, titulo, rotulo_nome, rotulo_valor, buraco=None, cores=None, **layout):
+    """Pizza/donut a partir de rótulos e totais já agregados.
+
+    `cores` é um dicionário rótulo -> cor (como color_discrete_map do px).
+    """
+    rotulos, valores = _valores(rotulos), _valores(valores)
+    trace = go.Pie(
+        labels=rotulos, values=valores, hole=buraco,
+        marker_colors=[cores.get(r) for r in rotulos] if cores else None,
+        hovertemplate=f"{rotulo_nome}=%{{label}}<br>{rotulo_valor}=%{{value}}<extra></extra>",
+    )
+    return {"data": [trace.to_plotly_json()], "layout": layout_base(titulo, **layout)}
+
+
+def linhas_tempo(xs, ys, nomes, titulo, rotulo_x, rotulo_y, **layout):
+    """Uma linha WebGL (Scattergl) por série, com eixo x de datas.
+
+    `xs` e `ys` têm um array por nome; as séries podem ter tamanhos
+    diferentes (ver src/series.py).
+    """
+    traces = [
+        go.Scattergl(
+            x=_valores(x), y=_valores(y), name=nome, mode="lines",
+            hovertemplate=f"{rotulo_x}=%{{x|%m/%Y}}<br>{rotulo_y}=%{{y}}<extra>{nome}</extra>",
+        ).to_plotly_json()
+        for x, y, nome in zip(xs, ys, nomes)
+    ]
+    eixo_x = {"type": "date", "title": {"text": rotulo_x}}
+    eixo_y = {"title": {"text": rotulo_y}, "rangemode": "tozero"}
+    eixo_x.update(layout.pop("xaxis", {}))
+    eixo_y.update(layout.pop("yaxis", {}))
+    return {"data": traces, "layout": layout_base(titulo, xaxis=eixo_x, yaxis=eixo_y, **layout)}
+
+
+def mapa_calor(x, y, z, titulo, rotulo_x, rotulo_y, rotulo_z, extra=None, rotulo_extra=None, **layout):
+    """Mapa de calor a partir de uma matriz já calculada (linhas = `y`).
+
+    `extra` é um valor por linha mostrado no hover (ex.: nº de alunos).
+    Valores entre 0 e 1 são exibidos como porcentagem.
+    """
+    hover = f"{rotulo_y}=%{{y}}<br>{rotulo_x}=%{{x}}<br>{rotulo_z}=%{{z:.1%}}"
+    customdata = None
+    if extra is not None:
+        customdata = [[valor] * len(x) for valor in _valores(extra)]
+        hover += f"<br>{rotulo_extra}=%{{customdata}}"
+    trace = go.Heatmap(
+        x=_valores(x), y=_valores(y), z=_valores(z), customdata=customdata,
+        zmin=0, zmax=1, colorscale="Viridis",
+        colorbar={"title": {"text": rotulo_z}, "tickformat": ".0%"},
+        hovertemplate=hover + "<extra></extra>",
+    )
+    eixo_x = {"title": {"text": rotulo_x}}
+    eixo_y = {"title": {"text": rotulo_y}, "type": "category"}
+    eixo_x.update(layout.pop("xaxis", {}))
+    eixo_y.update(layout.pop("yaxis", {}))
+    return {"data": [trace.to_plotly_json()], "layout": layout_base(titulo, xaxis=eixo_x, yaxis=eixo_y, **layout)}
+
+
+def degraus(xs, ys, nomes, titulo, rotulo_x, rotulo_y, extras=None, rotulo_extra=None, **layout):
+    """Uma curva em degraus por série (ex.: Kaplan–Meier), com y em porcentagem.
+
+    `extras` tem, por série, um valor por ponto mostrado no hover.
+    """
+    traces = []
+    for i, (x, y, nome) in enumerate(zip(xs, ys, nomes)):
+        hover = f"{rotulo_x}=%{{x}}<br>{rotulo_y}=%{{y:.1%}}"
+        customdata = None
+        if extras is not None:
+            customdata = _valores(extras[i])
+            hover += f"<br>{rotulo_extra}=%{{customdata}}"
+        traces.append(go.Scatter(
+            x=_valores(x), y=_valores(y), name=nome, mode="lines", line_shape="hv",
+            customdata=customdata, hovertemplate=hover + f"<extra>{nome}</extra>",
+        ).to_plotly_json())
+    eixo_x = {"title": {"text": rotulo_x}, "rangemode": "tozero"}
+    eixo_y = {"title": {"text": rotulo_y}, "tickformat": ".0%", "range": [0, 1]}
+    eixo_x.update(layout.pop("xaxis", {}))
+    eixo_y.update(layout.pop("yaxis", {}))
+    return {"data": traces, "layout": layout_base(titulo, xaxis=eixo_x, yaxis=eixo_y, **layout)}
+
+
+def barras_agrupadas(categorias, valores, nomes, titulo, rotulo_categoria, rotulo_valor, modo="group", **layout):
+    """Barras lado a lado (ou sobrepostas, `modo="overlay"`), uma série por nome.
+
+    `valores` tem uma lista por nome, alinhada com `categorias`.
+    """
+    categorias = _valores(categorias)
+    traces = [
+        go.Bar(
+            x=categorias, y=_valores(v), name=nome,
+            hovertemplate=f"{rotulo_categoria}=%{{x}}<br>{rotulo_valor}=%{{y}}<extra>{nome}</extra>",
+        ).to_plotly_json()
+        for v, nome in zip(valores, nomes)
+    ]
+    eixo_x = {"title": {"text": rotulo_categoria}, "type": "category"}
+    eixo_y = {"title": {"text": rotulo_valor}}
+    eixo_x.update(layout.pop("xaxis", {}))
+    eixo_y.update(layout.pop("yaxis", {}))
+    return {"data": traces, "layout": layout_base(titulo, xaxis=eixo_x, yaxis=eixo_y, barmode=modo, **layout)}
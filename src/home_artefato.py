@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+import plotly.express as px
+from plotly.utils import PlotlyJSONEncoder
+
+from src import config, dados, figuras
+
+# ============================================================
+# Artefato pré-calculado da página Home
+# ============================================================
+# KPIs e gráficos da Home só mudam quando os dados mudam. Este módulo
+# calcula tudo uma vez (no build) e grava um JSON marcado com a versão
+# dos dados; a página apenas lê esse arquivo.
+#
+#   python -m src.home_artefato            # grava artefatos/home.json
+#   python -m src.home_artefato --saida x  # grava em outro caminho
+ARTEFATO_PATH = os.path.join(config.ARTEFATOS_DIR, "home.json")
+
+CORES_GRAFICO = ["#00e5ff", "#f800ff"]
+
+# Classificar Alunos
+ativos_list = ["Matrícula de Acompanhamento", "Matriculado", "Mudança de Nível", "Mudança de Regulamento", "Nova Matrícula", "Prorrogação", "Trancado", "Transferido de Área"]
+
+
+def classificar_aluno(row):
+    if row["Última ocorrência"] in ativos_list: return "Ativo"
+    elif row["Última ocorrência"] == "Titulado": return "Titulado"
+    else: return "Outro"
+
+
+def calcular_home(path=dados.DATA_PATH):
+    try:
+        df = pd.read_excel(path)
+        print(f"SUCESSO (home): Arquivo de dados carregado de '{path}'")
+    except FileNotFoundError:
+        print(f"ERRO CRÍTICO (home): O arquivo 'USP_Completa.xlsx' não foi encontrado no caminho esperado: '{path}'.")
+        df = pd.DataFrame(columns=["Curso", "Última ocorrência"])
+
+    df["Status"] = df.apply(classificar_aluno, axis=1) if not df.empty else pd.Series(dtype=str)
+    df["Curso"] = df["Curso"].replace("Doutorado Direto", "Doutorado")
+    df_filtrado = df[df["Status"].isin(["Ativo", "Titulado"])]
+
+    # Calcular KPIs
+    kpis = {
+        "total_ativos": int(len(df_filtrado[df_filtrado["Status"] == "Ativo"])),
+        "total_titulados": int(len(df_filtrado[df_filtrado["Status"] == "Titulado"])),
+        "total_geral": int(len(df_filtrado)),
+    }
+
+    # Criar Gráficos
+    graficos = {}
+    for curso in ["Mestrado", "Doutorado"]:
+        contagem = df_filtrado[df_filtrado["Curso"] == curso]["Status"].value_counts().reset_index()
+        contagem.columns = ['Status', 'Total']
+        fig = px.pie(contagem, values='Total', names='Status', title=curso, hole=.4, template=figuras.TEMPLATE, color_discrete_sequence=CORES_GRAFICO)
+        fig.update_layout(title_x=0.5, legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
+        graficos[curso.lower()] = fig.to_plotly_json()
+
+    return {"versao": dados.versao_dados(path), "kpis": kpis, "figuras": graficos}
+
+
+def gerar_artefato(saida=ARTEFATO_PATH):
+    artefato = calcular_home()
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    tmp = f"{saida}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artefato, f, cls=PlotlyJSONEncoder, ensure_ascii=False)
+    os.replace(tmp, saida)
+    return artefato
+
+
+def carregar_artefato(path=ARTEFATO_PATH):
+    # Devolve None se o artefato não existe ou foi gerado com outros dados
+    try:
+        with open(path, encoding="utf-8") as f:
+            artefato = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if artefato.get("versao") != dados.versao_dados():
+        return None
+    return artefato
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pré-calcula os KPIs e gráficos da página Home.")
+    parser.add_argument("--saida", default=ARTEFATO_PATH, help="Caminho do JSON gerado")
+    args = parser.parse_args()
+    artefato = gerar_artefato(args.saida)
+    print(f"✅ Artefato da Home gravado em '{args.saida}' (versão dos dados {artefato['versao']})")
@@ -0,0 +1,135 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+from flask import abort, jsonify, request
+
+from src import cache, dados
+
+# ============================================================
+# Métricas (KPIs) sem Dash: CLI em JSON e rotas JSON no servidor
+# ============================================================
+# Os mesmos números que o dashboard mostra (KPIs da Home, matrículas por
+# ano, variação ano atual x anterior da Análise Acadêmica, distribuição por
+# Curso e Programa), calculados direto da tabela compartilhada (src/dados.py), sem montar figuras.
+# Aceitam os mesmos filtros das páginas (programa, curso, status, período).
+# Ativos e titulados seguem a mesma classificação do filtro de status
+# (Status_aluno, src/dados.py): filtrar status=Ativos não muda total_ativos.
+# A Home conta também "Mudança de Regulamento" e "Nova Matrícula" como
+# ativos, então o total dela pode ser maior.
+#
+#   python -m src.metricas                          # JSON no stdout
+#   python -m src.metricas --programa ENF --secao variacao --ano 2024
+#
+#   GET /api/metricas?programa=ENF&curso=Mestrado&inicio=2010-01-01
+#   GET /api/metricas/<secao>?...    (kpis, matriculas_por_ano, variacao,
+#                                     por_curso, por_programa)
+#
+# As respostas das rotas ficam no cache de figuras (por filtro e versão dos
+# dados) e levam um ETag com a versão dos dados.
+SECOES = ["kpis", "matriculas_por_ano", "variacao", "por_curso", "por_programa"]
+
+
+def filtrar(df, programa=None, curso=None, status=None, inicio=None, fim=None):
+    if programa:
+        df = df[df["Programa"].isin(programa)]
+    if curso:
+        df = df[df["Curso"].isin(curso)]
+    if status:
+        df = df[df["Status_aluno"].isin(status)]
+    if inicio:
+        df = df[df["Primeira matrícula"] >= pd.to_datetime(inicio)]
+    if fim:
+        df = df[df["Primeira matrícula"] <= pd.to_datetime(fim)]
+    return df
+
+
+def _contagem(serie):
+    return {str(k): int(v) for k, v in serie.value_counts().sort_index().items()}
+
+
+def estado_padrao():
+    return None, None, None, None, None, pd.Timestamp.today().year
+
+
+@cache.memoizar("metricas", estado_padrao=estado_padrao, versao=2)
+def calcular(programa=None, curso=None, status=None, inicio=None, fim=None, ano=None):
+    df = filtrar(dados.carregar(), programa, curso, status, inicio, fim)
+    ano = int(ano) if ano else pd.Timestamp.today().year
+
+    # Ativos e titulados (total = soma dos dois), pela classificação do filtro de status
+    ativos = int((df["Status_aluno"] == "Ativos").sum())
+    titulados = int((df["Status_aluno"] == "Titulados").sum())
+
+    # Variação de matrículas: ano x ano anterior (como no card da Análise Acadêmica)
+    atual = int((df["Ano_matricula"] == ano).sum())
+    anterior = int((df["Ano_matricula"] == ano - 1).sum())
+
+    return {
+        "versao": dados.versao_dados(),
+        "filtros": {"programa": programa, "curso": curso, "status": status, "inicio": inicio, "fim": fim},
+        "kpis": {
+            "total_ativos": ativos,
+            "total_titulados": titulados,
+            "total_geral": ativos + titulados,
+            "total_alunos": int(len(df)),
+        },
+        "matriculas_por_ano": _contagem(df["Ano_matricula"].dropna().astype(int)),
+        "variacao": {
+            "ano": ano,
+            "matriculas_ano": atual,
+            "matriculas_ano_anterior": anterior,
+            "variacao_percentual": round((atual - anterior) / anterior * 100, 2) if anterior > 0 else None,
+        },
+        "por_curso": _contagem(df["Curso"].dropna()),
+        "por_programa": _contagem(df["Programa"].dropna()),
+    }
+
+
+def _argumentos_requisicao():
+    return (
+        request.args.getlist("programa") or None,
+        request.args.getlist("curso") or None,
+        request.args.getlist("status") or None,
+        request.args.get("inicio"),
+        request.args.get("fim"),
+        request.args.get("ano", type=int) or pd.Timestamp.today().year,
+    )
+
+
+def registrar_rotas(server):
+    def responder(secao=None):
+        if secao is not None and secao not in SECOES:
+            abort(404)
+        metricas = calcular(*_argumentos_requisicao())
+        corpo = metricas if secao is None else {"versao": metricas["versao"], "filtros": metricas["filtros"], secao: metricas[secao]}
+        resposta = jsonify(corpo)
+        resposta.set_etag(f"{metricas['versao']}-{request.query_string.decode()}-{secao}")
+        return resposta.make_conditional(request)
+
+    @server.route("/api/metricas")
+    def api_metricas():
+        return responder()
+
+    @server.route("/api/metricas/<secao>")
+    def api_metricas_secao(secao):
+        return responder(secao)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula os KPIs do dashboard e imprime em JSON.")
+    parser.add_argument("--programa", nargs="+")
+    parser.add_argument("--curso", nargs="+")
+    parser.add_argument("--status", nargs="+", choices=["Ativos", "Titulados", "Desligados", "Outros"])
+    parser.add_argument("--inicio", help="Primeira matrícula a partir de (AAAA-MM-DD)")
+    parser.add_argument("--fim", help="Primeira matrícula até (AAAA-MM-DD)")
+    parser.add_argument("--ano", type=int, help="Ano da variação (padrão: ano atual)")
+    parser.add_argument("--secao", choices=SECOES, help="Só uma seção das métricas")
+    args = parser.parse_args()
+
+    metricas = calcular.func(args.programa, args.curso, args.status, args.inicio, args.fim, args.ano)
+    if args.secao:
+        metricas = {"versao": metricas["versao"], args.secao: metricas[args.secao]}
+    json.dump(metricas, sys.stdout, ensure_ascii=False, indent=2)
+    print()
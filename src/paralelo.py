@@ -0,0 +1,55 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import config
+
+# ============================================================
+# Construção paralela das figuras de um callback
+# ============================================================
+# As figuras de um mesmo callback são independentes entre si: cada
+# construtora recebe o mesmo DataFrame já filtrado (somente leitura) e
+# devolve sua figura. Os groupbys do pandas e a serialização do Plotly
+# liberam o GIL boa parte do tempo, então um pool de threads limitado
+# (DASHBOARD_FIGURAS_THREADS) reduz a latência do callback inteiro.
+_executor = None
+_lock = threading.Lock()
+
+# Tempos (em segundos) da última execução de cada página, por figura
+ULTIMOS_TEMPOS = {}
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.FIGURAS_THREADS, thread_name_prefix="figuras"
+                )
+    return _executor
+
+
+def construir_figuras(pagina, dff, construtores):
+    """Executa `construtores` ({nome: função(dff)}) e devolve os resultados na mesma ordem."""
+    tempos = {}
+
+    def medir(nome, construtora):
+        inicio = time.perf_counter()
+        resultado = construtora(dff)
+        tempos[nome] = time.perf_counter() - inicio
+        return resultado
+
+    inicio = time.perf_counter()
+    if config.FIGURAS_THREADS <= 1:
+        resultados = [medir(nome, f) for nome, f in construtores.items()]
+    else:
+        futuros = [executor().submit(medir, nome, f) for nome, f in construtores.items()]
+        resultados = [futuro.result() for futuro in futuros]
+    total = time.perf_counter() - inicio
+
+    ULTIMOS_TEMPOS[pagina] = dict(tempos, total=total)
+    if config.LOG_TEMPOS:
+        detalhes = ", ".join(f"{nome}={t * 1000:.0f}ms" for nome, t in tempos.items())
+        print(f"⏱️ {pagina}: {detalhes} (total {total * 1000:.0f}ms)")
+    return resultados
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Comparação entre períodos (período atual x anterior)
+# ============================================================
+# As datas do recorte viram, uma única vez, contagens mensais acumuladas
+# (um bincount por mês + cumsum). Com elas, o total de qualquer intervalo
+# de meses é uma subtração (acumulado[fim] - acumulado[início]), então
+# comparar ano, semestre, trimestre ou os últimos 12 meses com o período
+# anterior não relê a tabela. As contagens são JSON (vão para o cache de
+# figuras junto com o estado de filtro).
+TIPOS = {
+    "ano": "Ano",
+    "semestre": "Semestre",
+    "trimestre": "Trimestre",
+    "12m": "Últimos 12 meses",
+}
+PADRAO = "ano"
+MESES_POR_TIPO = {"ano": 12, "semestre": 6, "trimestre": 3, "12m": 12}
+ANTERIOR = {
+    "ano": "Ano Anterior",
+    "semestre": "Semestre Anterior",
+    "trimestre": "Trimestre Anterior",
+    "12m": "12 Meses Anteriores",
+}
+
+
+def _ordinal(ano, mes):
+    # Meses contados desde o ano 0 (janeiro = 0)
+    return int(ano) * 12 + int(mes) - 1
+
+
+def contagens_mensais(datas):
+    """{"inicio": ordinal do primeiro mês, "acumulado": [0, c1, c1+c2, ...]}"""
+    datas = pd.to_datetime(datas, errors="coerce").dropna()
+    if datas.empty:
+        return {"inicio": 0, "acumulado": [0]}
+    ordinais = (datas.dt.year * 12 + datas.dt.month - 1).to_numpy()
+    inicio = int(ordinais.min())
+    contagem = np.bincount(ordinais - inicio)
+    return {"inicio": inicio, "acumulado": [0, *np.cumsum(contagem).tolist()]}
+
+
+def total(contagens, primeiro, ultimo):
+    """Matrículas entre os meses `primeiro` e `ultimo` (ordinais, inclusive)."""
+    acumulado = contagens["acumulado"]
+    i = min(max(primeiro - contagens["inicio"], 0), len(acumulado) - 1)
+    j = min(max(ultimo - contagens["inicio"] + 1, 0), len(acumulado) - 1)
+    return acumulado[j] - acumulado[i] if j > i else 0
+
+
+def intervalo(tipo, referencia):
+    """(primeiro, último) mês do período `tipo` que contém o mês `referencia`."""
+    if tipo == "12m":
+        return referencia - 11, referencia
+    tamanho = MESES_POR_TIPO[tipo]
+    ano, mes = divmod(referencia, 12)
+    primeiro = ano * 12 + (mes // tamanho) * tamanho
+    return primeiro, primeiro + tamanho - 1
+
+
+def rotulo(tipo, primeiro, ultimo):
+    ano, mes = divmod(primeiro, 12)
+    if tipo == "ano":
+        return str(ano)
+    if tipo == "semestre":
+        return f"{ano}-S{mes // 6 + 1}"
+    if tipo == "trimestre":
+        return f"{ano}-T{mes // 3 + 1}"
+    ano_fim, mes_fim = divmod(ultimo, 12)
+    return f"{mes + 1:02d}/{ano} a {mes_fim + 1:02d}/{ano_fim}"
+
+
+def comparar(contagens, tipo=PADRAO, referencia=None):
+    """Período que contém `referencia` (padrão: mês atual) x o período anterior.
+
+    Devolve os rótulos e totais dos dois períodos e a variação percentual
+    (None quando o período anterior não tem matrículas).
+    """
+    if referencia is None:
+        hoje = pd.Timestamp.today()
+        referencia = _ordinal(hoje.year, hoje.month)
+    primeiro, ultimo = intervalo(tipo, referencia)
+    tamanho = ultimo - primeiro + 1
+    anterior = (primeiro - tamanho, primeiro - 1)
+
+    atual_total = total(contagens, primeiro, ultimo)
+    anterior_total = total(contagens, *anterior)
+    return {
+        "tipo": tipo,
+        "atual": {"rotulo": rotulo(tipo, primeiro, ultimo), "total": atual_total},
+        "anterior": {"rotulo": rotulo(tipo, *anterior), "total": anterior_total},
+        "variacao": (atual_total - anterior_total) / anterior_total * 100 if anterior_total > 0 else None,
+    }
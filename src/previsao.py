@@ -0,0 +1,225 @@
+import argparse
+import functools
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import cache, config, dados, risco
+
+# ============================================================
+# Previsão do mês de titulação dos alunos ativos
+# ============================================================
+# Modelo treinado fora do servidor com o histórico dos titulados: o tempo
+# até a titulação ("Tempo para titulação (meses)", ou os meses entre a
+# "Primeira matrícula" e a "Data da defesa" quando faltar) é explicado, em
+# escala log, por Curso, Programa, Financiamento, idade no início do prazo
+# e ano de ingresso (regressão linear com penalidade L2; mesmas
+# características e codificação do modelo de risco, src/risco.py).
+#
+# Para cada aluno ativo a previsão é a mediana do tempo total condicionada
+# ao tempo que ele já cursou: os quantis dos resíduos do treino dão a
+# distribuição prevista, e só entram os valores maiores que os meses já
+# decorridos. Tudo em uma passada vetorizada sobre a população ativa.
+#
+# Modelo e previsões vão para um JSON marcado com a versão dos dados; os
+# filtros só reagrupam as previsões (nunca rodam o modelo de novo).
+#
+#   python -m src.previsao            # grava artefatos/previsao.json
+#   python -m src.previsao --saida x  # grava em outro caminho
+ARTEFATO_PATH = os.path.join(config.ARTEFATOS_DIR, "previsao.json")
+# Sobe quando o modelo (ou a codificação compartilhada com src/risco.py)
+# muda: artefatos de outro formato são refeitos e o cache das agregações
+# por filtro (titulacoes_previstas) é invalidado junto
+FORMATO = 1
+
+NUMERICAS = ["Idade", "Ano de ingresso"]
+QUANTIS = np.linspace(0.005, 0.995, 199)
+
+COLUNAS_PREVISAO = ["NUSP", "Nome", "Programa", "Curso", "Primeira matrícula",
+                    "Meses decorridos", "Meses previstos", "Titulação prevista"]
+
+
+def _caracteristicas(df, corte):
+    carac = risco.caracteristicas(df, corte)
+    carac["Ano de ingresso"] = df["Primeira matrícula"].dt.year
+    return carac
+
+
+def _meses_ate_titulacao(df):
+    return df["Tempo para titulação (meses)"].fillna(
+        risco._meses_entre(df["Primeira matrícula"], df["Data da defesa"])
+    )
+
+
+def ajustar_linear(X, y, penalidade=1.0):
+    """Mínimos quadrados com penalidade L2 (fechada); o intercepto não é penalizado."""
+    regularizacao = np.full(X.shape[1], penalidade)
+    regularizacao[0] = 0
+    return np.linalg.solve(X.T @ X + np.diag(regularizacao), X.T @ y)
+
+
+def treinar(df, corte):
+    titulados = df[(df["Status_aluno"] == "Titulados") & df["Primeira matrícula"].notna()]
+    meses = _meses_ate_titulacao(titulados)
+    titulados, meses = titulados[meses > 0], meses[meses > 0]
+
+    carac = _caracteristicas(titulados, corte)
+    categorias = {
+        "Curso": sorted(carac["Curso"].dropna().unique().tolist()),
+        "Programa": sorted(carac["Programa"].dropna().unique().tolist()),
+        "Financiamento": risco._categorias(carac)["Financiamento"],
+    }
+    escala = risco.padronizacao(carac, NUMERICAS)
+    X = risco.matriz(carac, categorias, escala)
+    y = np.log(meses.to_numpy(dtype=float))
+    pesos = ajustar_linear(X, y)
+    previsto = X @ pesos
+    return {
+        "categorias": categorias,
+        "escala": escala,
+        "colunas": risco.nomes_colunas(categorias, escala),
+        "pesos": pesos.round(6).tolist(),
+        "residuos": np.quantile(y - previsto, QUANTIS).round(6).tolist(),
+        "amostras": int(len(y)),
+        "erro_medio_meses": float(np.abs(np.exp(previsto) - meses.to_numpy()).mean()),
+    }
+
+
+def prever(modelo, df, corte):
+    """Meses previstos até a titulação, dado o tempo já cursado (vetorizado)."""
+    carac = _caracteristicas(df, corte)
+    centro = risco.matriz(carac, modelo["categorias"], modelo["escala"]) @ np.asarray(modelo["pesos"])
+
+    # Distribuição prevista de cada aluno (linhas ordenadas, pois os resíduos estão em ordem)
+    possiveis = np.exp(centro[:, None] + np.asarray(modelo["residuos"])[None, :])
+    decorridos = carac["Meses decorridos"].to_numpy(dtype=float)
+
+    # Só os valores além do tempo já cursado; a previsão é a mediana deles
+    primeiro = (possiveis <= decorridos[:, None]).sum(axis=1)
+    restantes = possiveis.shape[1] - primeiro
+    mediana = np.minimum(primeiro + restantes // 2, possiveis.shape[1] - 1)
+    previsto = possiveis[np.arange(len(possiveis)), mediana]
+
+    # Já passou de todos os cenários: titulação esperada no mês seguinte
+    previsto = np.where(restantes > 0, previsto, decorridos + 1)
+    return np.ceil(np.maximum(previsto, decorridos + 1)).astype(int), decorridos.astype(int)
+
+
+def calcular_previsao():
+    df = dados.carregar()
+    df = df[df["Primeira matrícula"].notna()]
+    corte = df["Data da ocorrência"].max()
+    modelo = treinar(df, corte)
+
+    # A planilha repete linhas do mesmo aluno; cada um é previsto uma vez
+    ativos = df[df["Status_aluno"] == "Ativos"].drop_duplicates(subset=["NUSP", "Programa", "Curso"])
+    meses, decorridos = prever(modelo, ativos, corte)
+    inicio = ativos["Primeira matrícula"].dt.to_period("M")
+    previsoes = pd.DataFrame({
+        "NUSP": ativos["NUSP"],
+        "Nome": ativos["Nome"],
+        "Programa": ativos["Programa"],
+        "Curso": ativos["Curso"],
+        "Primeira matrícula": ativos["Primeira matrícula"].dt.strftime("%Y-%m-%d"),
+        "Meses decorridos": decorridos,
+        "Meses previstos": meses,
+        "Titulação prevista": (inicio + meses).astype(str),
+    }).sort_values("Titulação prevista")
+
+    return {
+        "versao": dados.versao_dados(),
+        "formato": FORMATO,
+        "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "corte": corte.date().isoformat() if pd.notna(corte) else None,
+        "modelo": modelo,
+        "previsoes": json.loads(previsoes.to_json(orient="split", index=False)),
+    }
+
+
+def gerar_artefato(saida=ARTEFATO_PATH):
+    artefato = calcular_previsao()
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    tmp = f"{saida}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artefato, f, ensure_ascii=False)
+    os.replace(tmp, saida)
+    return artefato
+
+
+def carregar_artefato(path=ARTEFATO_PATH):
+    # Devolve None se o artefato não existe ou foi gerado com outros dados ou outro modelo
+    try:
+        with open(path, encoding="utf-8") as f:
+            artefato = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if artefato.get("versao") != dados.versao_dados() or artefato.get("formato") != FORMATO:
+        return None
+    return artefato
+
+
+@functools.lru_cache(maxsize=1)
+def artefato_atual():
+    """Artefato da versão atual dos dados; se faltar, treina e grava na hora."""
+    artefato = carregar_artefato()
+    if artefato is None:
+        print("⚠️ AVISO (previsão): artefato de previsão ausente ou desatualizado. Treinando a partir dos dados "
+              "(rode 'python -m src.previsao' no build para evitar este passo).")
+        try:
+            artefato = gerar_artefato()
+        except OSError:
+            artefato = calcular_previsao()
+    return artefato
+
+
+@functools.lru_cache(maxsize=1)
+def previsoes():
+    """Previsões dos alunos ativos como DataFrame (titulação mais próxima primeiro)."""
+    tabela = artefato_atual()["previsoes"]
+    df = pd.DataFrame(tabela["data"], columns=tabela["columns"])
+    df["Primeira matrícula"] = pd.to_datetime(df["Primeira matrícula"])
+    return df
+
+
+# ============================================================
+# Agregação das previsões (o que os filtros recalculam)
+# ============================================================
+def estado_padrao():
+    return None, None, None, None, None
+
+
+@cache.memoizar("previsao_titulacoes", estado_padrao=estado_padrao, versao=FORMATO)
+def titulacoes_previstas(programa=None, curso=None, status=None, inicio=None, fim=None):
+    """Titulações previstas por trimestre para os alunos ativos do recorte."""
+    if status and "Ativos" not in status:
+        return {"trimestres": [], "alunos": [], "total": 0}
+    df = previsoes()
+    if programa:
+        df = df[df["Programa"].isin(programa)]
+    if curso:
+        df = df[df["Curso"].isin(curso)]
+    if inicio:
+        df = df[df["Primeira matrícula"] >= pd.to_datetime(inicio)]
+    if fim:
+        df = df[df["Primeira matrícula"] <= pd.to_datetime(fim)]
+    contagem = pd.PeriodIndex(df["Titulação prevista"], freq="M").asfreq("Q").value_counts().sort_index()
+    return {
+        "trimestres": [f"{p.year}-T{p.quarter}" for p in contagem.index],
+        "alunos": contagem.astype(int).tolist(),
+        "total": int(len(df)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina o modelo de tempo até a titulação e prevê os alunos ativos.")
+    parser.add_argument("--saida", default=ARTEFATO_PATH, help="Caminho do JSON gerado")
+    args = parser.parse_args()
+    artefato = gerar_artefato(args.saida)
+    modelo = artefato["modelo"]
+    print(f"✅ Modelo de titulação treinado com {modelo['amostras']} titulados "
+          f"(erro médio no treino: {modelo['erro_medio_meses']:.1f} meses)")
+    print(f"✅ {len(artefato['previsoes']['data'])} alunos ativos com titulação prevista")
+    print(f"✅ Artefato de previsão gravado em '{args.saida}' (versão dos dados {artefato['versao']})")
@@ -0,0 +1,219 @@
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import re
+import time
+import unicodedata
+
+# O gerador roda fora do servidor: sem aquecimento do cache e, como os
+# programas já são processados em paralelo por processos, uma thread por
+# callback (definidos antes de importar src.config)
+os.environ.setdefault("DASHBOARD_AQUECIMENTO", "0")
+os.environ.setdefault("DASHBOARD_FIGURAS_THREADS", "1")
+
+import pandas as pd  # noqa: E402
+import plotly.io as pio  # noqa: E402
+from plotly.offline import get_plotlyjs  # noqa: E402
+
+from src import cache, config, dados  # noqa: E402
+
+# ============================================================
+# Relatórios em lote (HTML autocontido por programa)
+# ============================================================
+# Gera, sem abrir o navegador, um HTML por Programa (ou por preset de
+# filtros) com todas as visões das páginas 1 a 4, reaproveitando as mesmas
+# funções que montam as figuras nos callbacks.
+#   - As planilhas já lidas, os KPIs gerais da Home, o plotly.js embutido
+#     e o agrupamento de cada página por Programa são preparados uma vez,
+#     no processo principal; os processos filhos herdam tudo já pronto (fork).
+#   - Cada relatório roda as funções das páginas (calcular_page2,
+#     gerar_figuras, ...) só sobre as linhas dos seus programas, tiradas
+#     desse agrupamento (parâmetro `base`): nenhum relatório percorre nem
+#     copia a tabela inteira. O agrupamento guarda as linhas, e não só
+#     contagens, porque as figuras usam outras colunas (raça, nacionalidade,
+#     faixa etária, datas para a série mensal).
+#
+#   python -m src.relatorios                           # todos os programas
+#   python -m src.relatorios --programas ENF INTER     # só alguns
+#   python -m src.relatorios --presets presets.json    # lista de filtros
+#   python -m src.relatorios --saida pasta --processos 4
+#
+# presets.json: [{"nome": "...", "programa": [...], "curso": [...],
+#                 "status": [...], "inicio": "AAAA-MM-DD", "fim": "AAAA-MM-DD"}]
+RELATORIOS_DIR = os.path.join(config.ARTEFATOS_DIR, "relatorios")
+CAMPOS = ["programa", "curso", "status", "inicio", "fim"]
+
+# Preenchidos no processo principal antes de criar o pool
+_COMUM = {}
+_RECORTES = {}  # título da seção -> {Programa: linhas da página}
+
+
+def _paginas():
+    import dashboard_home
+    from pages import page1, page2, page3, page4
+
+    # (título, dados da página, estado padrão, função das figuras, resultado -> (kpis, figuras))
+    return [
+        ("Informações Acadêmicas", page1.df, page1.estado_padrao, page1.gerar_figuras.func,
+         lambda r: ([], list(r))),
+        ("Análise Acadêmica", page2.df, dashboard_home.estado_padrao_page2, _analise_academica,
+         lambda r: ([("Variação de matrículas (ano atual x anterior)", r[2])], [r[0], r[1], *r[3:]])),
+        ("Exploração Acadêmica", page3.df, page3.estado_padrao, page3.gerar_figuras.func,
+         lambda r: ([("Total de alunos", r[0])], list(r[1:]))),
+        ("Análise Etária", page4.df, page4.estado_padrao, page4.gerar_figuras.func,
+         lambda r: ([], list(r))),
+    ]
+
+
+def _analise_academica(*argumentos, base=None):
+    # Figuras da página + comparativo ano atual x anterior: (fig2, fig3, variação, fig5, fig6, fig7)
+    import dashboard_home
+
+    fig2, *demais = dashboard_home.calcular_page2.func(*argumentos, base=base)
+    contagens = dashboard_home.contagens_page2.func(*argumentos, base=base)
+    fig3, variacao = dashboard_home._fig3_comparativo(contagens, "ano")[:2]
+    return fig2, fig3, variacao, *demais
+
+
+def _agrupar(df):
+    # Linhas de cada Programa, na ordem original da tabela; [None] = sem linhas
+    grupos = {programa: linhas for programa, linhas in df.groupby("Programa", sort=False)}
+    grupos[None] = df.iloc[:0]
+    return grupos
+
+
+def _base(titulo, preset):
+    # Linhas dos programas do preset (None: sem recorte por Programa, tabela inteira)
+    grupos = _RECORTES.get(titulo)
+    if not grupos or not preset.get("programa"):
+        return None
+    partes = [grupos[p] for p in preset["programa"] if p in grupos]
+    if not partes:
+        return grupos[None]
+    return partes[0] if len(partes) == 1 else pd.concat(partes).sort_index()
+
+
+def _argumentos(preset, estado_padrao):
+    # Campos ausentes no preset usam o padrão da página (ex.: período completo);
+    # valores no mesmo formato que os callbacks recebem (datas como texto)
+    padrao = dict(zip(CAMPOS, estado_padrao()))
+    return list(cache.chave_filtros([preset.get(campo) or padrao[campo] for campo in CAMPOS]))
+
+
+def _secao(titulo, kpis, figuras):
+    kpis = "".join(f'<span class="kpi">{html.escape(rotulo)}: {html.escape(str(valor))}</span>' for rotulo, valor in kpis)
+    graficos = "".join(
+        f'<div class="grafico">{pio.to_html(fig, full_html=False, include_plotlyjs=False)}</div>'
+        for fig in figuras
+    )
+    return f"<section><h2>{html.escape(titulo)}</h2>{kpis}{graficos}</section>"
+
+
+def _pagina_html(titulo, filtros, secoes):
+    kpis = _COMUM["kpis"]
+    resumo = "".join(
+        f'<span class="kpi">{html.escape(rotulo)}: {kpis[chave]}</span>'
+        for chave, rotulo in [("total_ativos", "Ativos"), ("total_titulados", "Titulados"), ("total_geral", "Total")]
+    )
+    descricao = html.escape(json.dumps(filtros, ensure_ascii=False, default=str))
+    return f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titulo)}</title>
+<script>{_COMUM["plotlyjs"]}</script>
+<style>
+body {{ background: #111; color: #eee; font-family: sans-serif; margin: 2rem; }}
+section {{ margin-top: 2rem; }}
+.kpi {{ display: inline-block; margin: 0 1rem 1rem 0; padding: .5rem 1rem; background: #222; border-radius: 6px; }}
+.grafico {{ margin-bottom: 1rem; }}
+small {{ color: #999; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(titulo)}</h1>
+<small>Filtros: {descricao} | Dados: versão {_COMUM["versao"]} | Gerado em {_COMUM["gerado_em"]}</small>
+<section><h2>Visão Geral (todos os programas)</h2>{resumo}</section>
+{"".join(secoes)}
+</body>
+</html>
+"""
+
+
+def nome_arquivo(nome):
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", texto).strip("_") or "relatorio"
+
+
+def gerar_relatorio(preset, saida):
+    inicio = time.perf_counter()
+    secoes = [
+        _secao(titulo, *separar(func(*_argumentos(preset, estado_padrao), base=_base(titulo, preset))))
+        for titulo, _, estado_padrao, func, separar in _paginas()
+    ]
+    filtros = {campo: preset.get(campo) for campo in CAMPOS if preset.get(campo)}
+    caminho = os.path.join(saida, f"{nome_arquivo(preset['nome'])}.html")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(_pagina_html(f"Relatório - {preset['nome']}", filtros, secoes))
+    return caminho, time.perf_counter() - inicio
+
+
+def _gerar(argumentos):
+    return gerar_relatorio(*argumentos)
+
+
+def presets_por_programa(programas=None):
+    from pages import page3
+
+    return [{"nome": p, "programa": [p]} for p in (programas or page3.programas_opcoes)]
+
+
+def preparar():
+    """Carrega dados e calcula o que é comum a todos os relatórios (uma vez)."""
+    from src import home_artefato
+
+    # Importa as páginas (lê as planilhas) e agrupa as linhas por Programa antes do fork
+    for titulo, df, *_ in _paginas():
+        _RECORTES[titulo] = _agrupar(df)
+    home = home_artefato.carregar_artefato() or home_artefato.calcular_home()
+    _COMUM.update(
+        kpis=home["kpis"],
+        versao=dados.versao_dados(),
+        plotlyjs=get_plotlyjs(),
+        gerado_em=time.strftime("%d/%m/%Y %H:%M"),
+    )
+
+
+def gerar_relatorios(presets, saida=RELATORIOS_DIR, processos=None):
+    os.makedirs(saida, exist_ok=True)
+    preparar()
+    tarefas = [(preset, saida) for preset in presets]
+    if "fork" in multiprocessing.get_all_start_methods():
+        contexto, inicializar = multiprocessing.get_context("fork"), None
+    else:
+        # Sem fork os filhos não herdam os dados: cada um prepara os seus
+        contexto, inicializar = multiprocessing.get_context(), preparar
+    with contexto.Pool(processos or os.cpu_count(), initializer=inicializar) as pool:
+        return pool.map(_gerar, tarefas, chunksize=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera relatórios HTML autocontidos com todas as visões do dashboard.")
+    parser.add_argument("--programas", nargs="+", help="Programas (padrão: todos)")
+    parser.add_argument("--presets", help="JSON com uma lista de presets de filtro (substitui --programas)")
+    parser.add_argument("--saida", default=RELATORIOS_DIR, help="Pasta dos relatórios")
+    parser.add_argument("--processos", type=int, help="Processos em paralelo (padrão: nº de CPUs)")
+    args = parser.parse_args()
+
+    if args.presets:
+        with open(args.presets, encoding="utf-8") as f:
+            presets = json.load(f)
+    else:
+        presets = presets_por_programa(args.programas)
+
+    inicio = time.perf_counter()
+    for caminho, segundos in gerar_relatorios(presets, args.saida, args.processos):
+        print(f"✅ {caminho} ({segundos:.1f}s)")
+    print(f"✅ {len(presets)} relatório(s) em {time.perf_counter() - inicio:.1f}s")
@@ -0,0 +1,248 @@
+import argparse
+import functools
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import config, dados
+
+# ============================================================
+# Risco de evasão (pontuação em lote dos alunos ativos)
+# ============================================================
+# Um modelo de regressão logística é treinado fora do servidor com o
+# desfecho histórico dos alunos que já saíram (Desligado = 1, Titulado = 0)
+# e aplicado de uma vez a todos os alunos ativos. Características:
+#   - Curso, Programa e Financiamento (one-hot; sem financiamento é uma
+#     categoria, financiadores raros viram "Outro");
+#   - idade no início da contagem de prazo (como na Análise Etária).
+# Meses decorridos desde a primeira matrícula não entram no modelo: para
+# quem saiu é o tempo até a saída, para quem segue ativo o tempo até o corte
+# dos dados, e o modelo aprenderia "pouco tempo => desligado" com quem saiu
+# cedo e aplicaria isso aos ingressantes recentes. A coluna continua na
+# tabela de pontuações, só para exibição.
+# Modelo e pontuações vão para um JSON marcado com a versão dos dados; a
+# página de risco só lê esse arquivo.
+#
+#   python -m src.risco            # grava artefatos/risco.json
+#   python -m src.risco --saida x  # grava em outro caminho
+ARTEFATO_PATH = os.path.join(config.ARTEFATOS_DIR, "risco.json")
+# Sobe quando o modelo muda: artefatos de outro formato são refeitos.
+# caracteristicas()/matriz() também são usadas por src/previsao.py: mudar a
+# codificação exige subir previsao.FORMATO também.
+FORMATO = 2
+
+CATEGORICAS = ["Curso", "Programa", "Financiamento"]
+NUMERICAS = ["Idade"]
+SEM_FINANCIAMENTO = "Sem financiamento"
+OUTRO = "Outro"
+FINANCIAMENTO_MIN_ALUNOS = 20
+
+# Faixas de risco (probabilidade estimada de desligamento)
+FAIXAS = ["Baixo", "Médio", "Alto"]
+LIMIARES = [config.RISCO_LIMIAR_MEDIO, config.RISCO_LIMIAR_ALTO]
+
+COLUNAS_PONTUACAO = ["NUSP", "Nome", "Programa", "Curso", "Financiamento", "Idade", "Meses decorridos", "Risco", "Faixa"]
+
+
+def _meses_entre(inicio, fim):
+    return (fim.dt.year - inicio.dt.year) * 12 + (fim.dt.month - inicio.dt.month)
+
+
+def caracteristicas(df, corte):
+    """Tabela com as características do modelo (e os meses decorridos, só exibidos), uma linha por aluno."""
+    inicio_prazo = pd.to_datetime(df["Início da contagem de prazo"], errors="coerce").fillna(df["Primeira matrícula"])
+    fim = df["Data da ocorrência"].where(df["Status_aluno"] != "Ativos", corte)
+    return pd.DataFrame({
+        "Curso": df["Curso"],
+        "Programa": df["Programa"],
+        "Financiamento": df["Financiamento"].fillna(SEM_FINANCIAMENTO),
+        "Idade": (inicio_prazo - df["Nascimento"]).dt.days // 365,
+        "Meses decorridos": _meses_entre(df["Primeira matrícula"], fim.fillna(corte)).clip(lower=0),
+    }, index=df.index)
+
+
+def _categorias(carac):
+    financiamento = carac["Financiamento"].value_counts()
+    return {
+        "Curso": sorted(carac["Curso"].dropna().unique().tolist()),
+        "Programa": sorted(carac["Programa"].dropna().unique().tolist()),
+        "Financiamento": sorted(financiamento[financiamento >= FINANCIAMENTO_MIN_ALUNOS].index.tolist()) + [OUTRO],
+    }
+
+
+def matriz(carac, categorias, escala):
+    """Matriz do modelo: intercepto, one-hot das categóricas e numéricas padronizadas.
+
+    `categorias` ({coluna: níveis}) e `escala` ({coluna: média e desvio})
+    vêm do treino; níveis não vistos caem em "Outro" quando ele existe.
+    """
+    colunas = [np.ones(len(carac))]
+    for nome, niveis in categorias.items():
+        valores = carac[nome]
+        if OUTRO in niveis:
+            valores = valores.where(valores.isin(niveis), OUTRO)
+        codigos = pd.Categorical(valores, categories=niveis).codes
+        colunas.extend((codigos == i).astype(float) for i in range(len(niveis)))
+    for nome, parametros in escala.items():
+        # Faltando -> média (0 depois de padronizar)
+        valores = carac[nome].astype(float).fillna(parametros["media"]).to_numpy()
+        colunas.append((valores - parametros["media"]) / parametros["desvio"])
+    return np.column_stack(colunas)
+
+
+def nomes_colunas(categorias, escala):
+    return ["Intercepto"] + [f"{nome}={valor}" for nome, niveis in categorias.items() for valor in niveis] + list(escala)
+
+
+def padronizacao(carac, colunas):
+    return {nome: {"media": float(carac[nome].mean()), "desvio": float(carac[nome].std() or 1.0)} for nome in colunas}
+
+
+def _sigmoide(z):
+    return 1 / (1 + np.exp(-np.clip(z, -30, 30)))
+
+
+def ajustar_logistica(X, y, penalidade=1.0, iteracoes=50, tolerancia=1e-8):
+    """Regressão logística com penalidade L2 (Newton/IRLS); o intercepto não é penalizado."""
+    pesos = np.zeros(X.shape[1])
+    regularizacao = np.full(X.shape[1], penalidade)
+    regularizacao[0] = 0
+    for _ in range(iteracoes):
+        p = _sigmoide(X @ pesos)
+        gradiente = X.T @ (y - p) - regularizacao * pesos
+        hessiana = (X * (p * (1 - p))[:, None]).T @ X + np.diag(regularizacao)
+        passo = np.linalg.solve(hessiana, gradiente)
+        pesos += passo
+        if np.abs(passo).max() < tolerancia:
+            break
+    return pesos
+
+
+def auc(y, pontuacao):
+    """Área sob a curva ROC (estatística de Mann–Whitney)."""
+    positivos = y == 1
+    n_pos, n_neg = positivos.sum(), (~positivos).sum()
+    if not n_pos or not n_neg:
+        return None
+    postos = pd.Series(pontuacao).rank().to_numpy()
+    return float((postos[positivos].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def faixa(risco):
+    return np.asarray(FAIXAS, dtype=object)[np.searchsorted(LIMIARES, risco, side="right")]
+
+
+def treinar(df, corte):
+    historico = df[df["Status_aluno"].isin(["Desligados", "Titulados"]) & df["Primeira matrícula"].notna()]
+    carac = caracteristicas(historico, corte)
+    y = (historico["Status_aluno"] == "Desligados").to_numpy(dtype=float)
+    categorias = _categorias(carac)
+    escala = padronizacao(carac, NUMERICAS)
+    X = matriz(carac, categorias, escala)
+    pesos = ajustar_logistica(X, y)
+    return {
+        "categorias": categorias,
+        "escala": escala,
+        "colunas": nomes_colunas(categorias, escala),
+        "pesos": pesos.round(6).tolist(),
+        "amostras": {"desligados": int(y.sum()), "titulados": int(len(y) - y.sum())},
+        "auc_treino": auc(y, X @ pesos),
+    }
+
+
+def pontuar(modelo, df, corte):
+    """Probabilidade de desligamento de cada aluno (uma passada vetorizada)."""
+    X = matriz(caracteristicas(df, corte), modelo["categorias"], modelo["escala"])
+    return _sigmoide(X @ np.asarray(modelo["pesos"]))
+
+
+def calcular_risco():
+    df = dados.carregar()
+    df = df[df["Primeira matrícula"].notna()]
+    corte = df["Data da ocorrência"].max()
+    modelo = treinar(df, corte)
+
+    # A planilha repete linhas do mesmo aluno; cada um é pontuado uma vez
+    ativos = df[df["Status_aluno"] == "Ativos"].drop_duplicates(subset=["NUSP", "Programa", "Curso"])
+    carac = caracteristicas(ativos, corte)
+    risco = pontuar(modelo, ativos, corte)
+    pontuacoes = pd.DataFrame({
+        "NUSP": ativos["NUSP"],
+        "Nome": ativos["Nome"],
+        "Programa": carac["Programa"],
+        "Curso": carac["Curso"],
+        "Financiamento": carac["Financiamento"],
+        "Idade": carac["Idade"].astype("Int64"),
+        "Meses decorridos": carac["Meses decorridos"].astype("Int64"),
+        "Risco": risco.round(4),
+        "Faixa": faixa(risco),
+    }).sort_values("Risco", ascending=False)
+
+    return {
+        "versao": dados.versao_dados(),
+        "formato": FORMATO,
+        "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "corte": corte.date().isoformat() if pd.notna(corte) else None,
+        "modelo": modelo,
+        "pontuacoes": json.loads(pontuacoes.to_json(orient="split", index=False)),
+    }
+
+
+def gerar_artefato(saida=ARTEFATO_PATH):
+    artefato = calcular_risco()
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    tmp = f"{saida}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artefato, f, ensure_ascii=False)
+    os.replace(tmp, saida)
+    return artefato
+
+
+def carregar_artefato(path=ARTEFATO_PATH):
+    # Devolve None se o artefato não existe ou foi gerado com outros dados
+    try:
+        with open(path, encoding="utf-8") as f:
+            artefato = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if artefato.get("versao") != dados.versao_dados() or artefato.get("formato") != FORMATO:
+        return None
+    return artefato
+
+
+@functools.lru_cache(maxsize=1)
+def artefato_atual():
+    """Artefato da versão atual dos dados; se faltar, treina e grava na hora."""
+    artefato = carregar_artefato()
+    if artefato is None:
+        print("⚠️ AVISO (risco): artefato de risco ausente ou desatualizado. Treinando a partir dos dados "
+              "(rode 'python -m src.risco' no build para evitar este passo).")
+        try:
+            artefato = gerar_artefato()
+        except OSError:
+            artefato = calcular_risco()
+    return artefato
+
+
+@functools.lru_cache(maxsize=1)
+def pontuacoes():
+    """Pontuações dos alunos ativos como DataFrame (maior risco primeiro)."""
+    tabela = artefato_atual()["pontuacoes"]
+    return pd.DataFrame(tabela["data"], columns=tabela["columns"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina o modelo de risco de evasão e pontua os alunos ativos.")
+    parser.add_argument("--saida", default=ARTEFATO_PATH, help="Caminho do JSON gerado")
+    args = parser.parse_args()
+    artefato = gerar_artefato(args.saida)
+    modelo = artefato["modelo"]
+    contagem = pd.Series(artefato["pontuacoes"]["data"]).str[COLUNAS_PONTUACAO.index("Faixa")].value_counts()
+    print(f"✅ Modelo de risco treinado com {modelo['amostras']['desligados']} desligados e "
+          f"{modelo['amostras']['titulados']} titulados (AUC no treino: {modelo['auc_treino']:.3f})")
+    print(f"✅ {len(artefato['pontuacoes']['data'])} alunos ativos pontuados "
+          f"({', '.join(f'{f}: {int(contagem.get(f, 0))}' for f in FAIXAS)})")
+    print(f"✅ Artefato de risco gravado em '{args.saida}' (versão dos dados {artefato['versao']})")
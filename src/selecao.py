@@ -0,0 +1,76 @@
+import pandas as pd
+
+# ============================================================
+# Seleção cruzada entre gráficos de uma página
+# ============================================================
+# Um clique (clickData) ou uma seleção por caixa (selectedData) em um
+# gráfico vira um filtro extra, por dimensão (ex.: Programa, Curso,
+# Status), guardado em um dcc.Store da página:
+#   {"valores": {dimensao: [valores] ou [inicio, fim]}, "alteradas": [dimensao]}
+# Cada gráfico ignora a dimensão que ele mesmo define e só é redesenhado
+# quando alguma das dimensões de que depende mudou ("alteradas"). O recorte
+# dos filtros da página é reaproveitado: a seleção só filtra esse recorte.
+
+
+def vazia():
+    return {"valores": {}, "alteradas": []}
+
+
+def pontos(evento, campo):
+    """Valores de `campo` ("x", "y" ou "label") dos pontos de um clickData/selectedData."""
+    return list(dict.fromkeys(p[campo] for p in (evento or {}).get("points") or [] if campo in p))
+
+
+def faixa(evento):
+    """[inicio, fim] do eixo x de uma seleção por caixa, ou [] sem seleção."""
+    intervalo = ((evento or {}).get("range") or {}).get("x")
+    return [str(intervalo[0]), str(intervalo[1])] if intervalo else []
+
+
+def alternar(selecao, dimensao, valores):
+    """Nova seleção com `dimensao` = `valores`; repetir a mesma seleção a desfaz."""
+    atuais = dict((selecao or {}).get("valores") or {})
+    if not valores or atuais.get(dimensao) == valores:
+        if dimensao not in atuais:
+            return {"valores": atuais, "alteradas": []}
+        atuais.pop(dimensao)
+    else:
+        atuais[dimensao] = valores
+    return {"valores": atuais, "alteradas": [dimensao]}
+
+
+def limpar(selecao):
+    return {"valores": {}, "alteradas": list((selecao or {}).get("valores") or {})}
+
+
+def afeta(selecao, dimensoes):
+    """Se algum gráfico que depende de `dimensoes` precisa ser redesenhado."""
+    return bool(set((selecao or {}).get("alteradas") or []) & set(dimensoes))
+
+
+def aplicar(df, selecao, colunas, ignorar=(), faixas=()):
+    """Filtra `df` pela seleção; `colunas` liga cada dimensão a uma coluna.
+
+    Dimensões em `faixas` guardam [inicio, fim] (datas); as demais, a lista
+    de valores escolhidos.
+    """
+    for dimensao, valores in ((selecao or {}).get("valores") or {}).items():
+        if dimensao in ignorar or dimensao not in colunas:
+            continue
+        coluna = df[colunas[dimensao]]
+        if dimensao in faixas:
+            df = df[(coluna >= pd.to_datetime(valores[0])) & (coluna <= pd.to_datetime(valores[1]))]
+        else:
+            df = df[coluna.isin(valores)]
+    return df
+
+
+def descrever(selecao):
+    valores = (selecao or {}).get("valores") or {}
+    if not valores:
+        return "Clique ou selecione em um gráfico para filtrar os demais."
+    partes = [
+        f"{dimensao}: {' a '.join(v[:10] for v in escolhidos) if dimensao == 'Período' else ', '.join(map(str, escolhidos))}"
+        for dimensao, escolhidos in valores.items()
+    ]
+    return "Seleção: " + " | ".join(partes)
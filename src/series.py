@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from src import config
+
+# ============================================================
+# Séries temporais longas: contagens mensais e redução por zoom
+# ============================================================
+# As séries mensais (décadas de histórico, uma linha por grupo) são
+# guardadas como uma matriz densa grupos x meses. Para desenhar, só o
+# intervalo visível é enviado ao navegador, na resolução mais fina que
+# caiba em DASHBOARD_SERIE_MAX_PONTOS pontos por linha:
+#   - "mes": todos os meses do intervalo;
+#   - "trimestre" / "ano": em cada trimestre/ano ficam só o mês de menor e
+#     o de maior valor (redução min/max), para que os picos continuem
+#     visíveis mesmo com menos pontos.
+# O gráfico usa eixo de datas real e traces WebGL (Scattergl); ao dar zoom,
+# o relayoutData do gráfico pede a faixa nova (ver intervalo_relayout).
+RESOLUCOES = [("mes", 1), ("trimestre", 3), ("ano", 12)]
+MAX_PONTOS = config.SERIE_MAX_PONTOS
+
+
+def contagens_mensais(datas, grupos):
+    """Matriz densa de contagens por mês.
+
+    Devolve (meses, nomes_dos_grupos, matriz) com `meses` sendo o início de
+    cada mês entre a primeira e a última data, sem lacunas.
+    """
+    datas = pd.to_datetime(pd.Series(datas), errors="coerce")
+    grupos = pd.Series(grupos, index=datas.index)
+    validos = datas.notna() & grupos.notna()
+    if not validos.any():
+        return pd.DatetimeIndex([]), [], np.zeros((0, 0), dtype=np.int64)
+
+    mes = datas[validos].dt.year * 12 + datas[validos].dt.month - 1
+    primeiro, ultimo = int(mes.min()), int(mes.max())
+    codigos, nomes = pd.factorize(grupos[validos], sort=True)
+    matriz = np.zeros((len(nomes), ultimo - primeiro + 1), dtype=np.int64)
+    np.add.at(matriz, (codigos, mes.to_numpy() - primeiro), 1)
+    return _meses(primeiro, ultimo), list(nomes), matriz
+
+
+def _meses(primeiro, ultimo):
+    # Índices "ano * 12 + mês - 1" -> início de cada mês
+    return pd.date_range(
+        pd.Timestamp(year=primeiro // 12, month=primeiro % 12 + 1, day=1),
+        periods=ultimo - primeiro + 1, freq="MS",
+    )
+
+
+def escolher_resolucao(n_meses, max_pontos=MAX_PONTOS):
+    for nome, tamanho in RESOLUCOES:
+        pontos = n_meses if tamanho == 1 else 2 * -(-n_meses // tamanho)
+        if pontos <= max_pontos:
+            return nome, tamanho
+    return RESOLUCOES[-1]
+
+
+def reduzir(meses, matriz, inicio=None, fim=None, max_pontos=MAX_PONTOS):
+    """Recorta [inicio, fim] e reduz para no máximo ~max_pontos por linha.
+
+    Devolve (resolucao, x, y): `x` e `y` são listas com um array por linha
+    da matriz (as linhas podem ficar com tamanhos diferentes).
+    """
+    if not len(meses):
+        return RESOLUCOES[0][0], [], []
+
+    # Recorte no intervalo visível, com os blocos alinhados ao calendário
+    a = 0 if inicio is None else int(meses.searchsorted(pd.Timestamp(inicio).to_period("M").start_time))
+    b = len(meses) if fim is None else int(meses.searchsorted(pd.Timestamp(fim), side="right"))
+    a, b = min(a, len(meses) - 1), max(b, a + 1)
+    resolucao, tamanho = escolher_resolucao(b - a, max_pontos)
+    if tamanho == 1:
+        x = meses[a:b]
+        return resolucao, [x] * len(matriz), list(matriz[:, a:b])
+
+    a -= (meses[a].month - 1) % tamanho
+    a = max(a, 0)
+    recorte = matriz[:, a:b].astype(float)
+    faltam = -recorte.shape[1] % tamanho
+    blocos = np.pad(recorte, ((0, 0), (0, faltam)), constant_values=np.nan)
+    blocos = blocos.reshape(len(matriz), -1, tamanho)
+
+    # Em cada bloco: posição do mínimo e do máximo, em ordem de tempo
+    pos_min = np.argmin(np.where(np.isnan(blocos), np.inf, blocos), axis=2)
+    pos_max = np.argmax(np.where(np.isnan(blocos), -np.inf, blocos), axis=2)
+    base = np.arange(blocos.shape[1]) * tamanho
+    posicoes = np.sort(np.stack([base + pos_min, base + pos_max], axis=2), axis=2)
+    posicoes = posicoes.reshape(len(matriz), -1)
+
+    x, y = [], []
+    for linha, pos in zip(recorte, posicoes):
+        pos = np.unique(pos)
+        x.append(meses[a + pos])
+        y.append(linha[pos].astype(matriz.dtype))
+    return resolucao, x, y
+
+
+def intervalo_relayout(relayout):
+    """(inicio, fim) a partir do relayoutData de um gráfico.
+
+    Devolve (None, None) quando o usuário volta ao zoom automático e None
+    quando o evento não mexeu no eixo x (ex.: só na legenda ou no eixo y).
+    """
+    relayout = relayout or {}
+    if relayout.get("xaxis.autorange"):
+        return None, None
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    if isinstance(relayout.get("xaxis.range"), list):
+        return tuple(relayout["xaxis.range"][:2])
+    return None
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Tempo até a titulação (Kaplan–Meier, com censura)
+# ============================================================
+# O histograma de "Tempo para titulação" só enxerga quem já se titulou.
+# Aqui cada aluno entra com o tempo (meses desde a primeira matrícula) até:
+#   - a titulação ("Data da defesa", ou "Data da ocorrência" se faltar) -> evento;
+#   - o desligamento ("Data da ocorrência") -> censurado;
+#   - a data de corte dos dados, para quem segue ativo -> censurado.
+# As curvas saem de uma tabela de eventos por (estrato, mês) montada com
+# groupby/cumsum/cumprod, sem laço por aluno.
+
+
+def _meses_entre(inicio, fim):
+    return (fim.dt.year - inicio.dt.year) * 12 + (fim.dt.month - inicio.dt.month)
+
+
+def tempos_e_eventos(df, corte=None):
+    """(meses, titulou) por aluno; linhas sem primeira matrícula ficam de fora."""
+    df = df[df["Primeira matrícula"].notna()]
+    corte = corte if corte is not None else df["Data da ocorrência"].max()
+    titulou = df["Última ocorrência"] == "Titulado"
+    desligou = df["Última ocorrência"] == "Desligado"
+
+    fim = pd.Series(corte, index=df.index)
+    fim = fim.mask(desligou, df["Data da ocorrência"])
+    fim = fim.mask(titulou, df["Data da defesa"].fillna(df["Data da ocorrência"]))
+    meses = _meses_entre(df["Primeira matrícula"], fim.fillna(corte)).clip(lower=0)
+    return meses.astype(int), titulou
+
+
+def kaplan_meier(meses, titulou, grupos):
+    """Curvas de Kaplan–Meier por grupo.
+
+    Devolve uma lista de dicionários (um por grupo) com os meses em que
+    houve titulação, a fração já titulada (1 - S(t)), os alunos em risco
+    naquele mês, a mediana (meses até metade titular; None se não chegou)
+    e os totais de alunos e titulados.
+    """
+    tabela = pd.DataFrame({"grupo": grupos, "meses": meses, "evento": titulou.astype(int)}).dropna(subset=["grupo"])
+    if tabela.empty:
+        return []
+
+    eventos = tabela.groupby(["grupo", "meses"]).agg(saidas=("evento", "size"), titulados=("evento", "sum"))
+    por_grupo = eventos.groupby(level="grupo")
+    total = por_grupo["saidas"].transform("sum")
+    em_risco = total - por_grupo["saidas"].cumsum() + eventos["saidas"]
+    eventos["em_risco"] = em_risco
+    eventos["sobrevivencia"] = (1 - eventos["titulados"] / em_risco).groupby(level="grupo").cumprod()
+
+    curvas = []
+    for grupo, linhas in eventos.groupby(level="grupo", sort=True):
+        linhas = linhas.droplevel("grupo")
+        com_evento = linhas[linhas["titulados"] > 0]
+        abaixo = linhas.index[linhas["sobrevivencia"].to_numpy() <= 0.5]
+        curvas.append({
+            "grupo": grupo,
+            "meses": [0, *com_evento.index.astype(int).tolist()],
+            "titulados": [0.0, *np.round(1 - com_evento["sobrevivencia"].to_numpy(), 4).tolist()],
+            "em_risco": [int(linhas["em_risco"].iloc[0]), *com_evento["em_risco"].astype(int).tolist()],
+            "mediana": int(abaixo[0]) if len(abaixo) else None,
+            "alunos": int(linhas["saidas"].sum()),
+            "total_titulados": int(linhas["titulados"].sum()),
+        })
+    return curvas
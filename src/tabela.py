@@ -0,0 +1,114 @@
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Tabela paginada no servidor (dash_table.DataTable)
+# ============================================================
+# A tabela usa page_action / sort_action / filter_action = "custom": o
+# navegador só recebe as linhas da página visível. A ordenação não é
+# refeita a cada pedido: na criação, cada coluna ganha dois índices de
+# ordenação (crescente e decrescente, vazios sempre no fim). Um pedido só
+# aplica a máscara dos filtros sobre o índice já ordenado e fatia a página.
+COMPARACOES = {
+    "=": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+}
+_TERMO = re.compile(r"\{(?P<coluna>[^}]+)\}\s+(?P<op>\S+)\s+(?P<valor>.+)")
+_EQUIVALENTES = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+
+def _exibir(serie):
+    # Valor mostrado na tabela (datas como AAAA-MM-DD, vazios como "")
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.strftime("%Y-%m-%d").fillna("")
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(object).where(serie.notna(), "")
+    return serie.astype(object).where(serie.notna(), "").astype(str)
+
+
+def _indices_ordenacao(serie):
+    valores = serie.to_numpy()
+    vazios = serie.isna().to_numpy()
+    codigos = pd.factorize(valores, sort=True)[0]
+    crescente = np.lexsort((codigos, vazios))
+    decrescente = np.lexsort((-codigos, vazios))
+    return crescente.astype(np.int32), decrescente.astype(np.int32)
+
+
+class TabelaPaginada:
+    def __init__(self, df, colunas):
+        self.colunas = [c for c in colunas if c in df.columns]
+        dados = df[self.colunas].reset_index(drop=True)
+        self.indice_original = df.index
+        self.valores = dados
+        self.exibicao = pd.DataFrame({c: _exibir(dados[c]) for c in self.colunas})
+        self.texto = {c: self.exibicao[c].astype(str).str.lower() for c in self.colunas}
+        self.ordens = {}
+        for coluna in self.colunas:
+            crescente, decrescente = _indices_ordenacao(dados[coluna])
+            self.ordens[(coluna, "asc")] = crescente
+            self.ordens[(coluna, "desc")] = decrescente
+        self.ordem_natural = np.arange(len(dados), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.valores)
+
+    def colunas_datatable(self):
+        return [{"name": c, "id": c} for c in self.colunas]
+
+    def mascara_indices(self, indices):
+        # Linhas selecionadas pelos filtros da página (índices do DataFrame original)
+        return self.indice_original.isin(indices)
+
+    def _mascara_termo(self, coluna, op, valor):
+        op = _EQUIVALENTES.get(op.lstrip("s"), op.lstrip("s"))
+        valor = valor.strip().strip("\"'`")
+        serie = self.valores[coluna]
+        if op == "contains":
+            return self.texto[coluna].str.contains(valor.lower(), regex=False).to_numpy()
+        if op == "datestartswith":
+            return self.exibicao[coluna].str.startswith(valor).to_numpy()
+
+        if pd.api.types.is_numeric_dtype(serie):
+            try:
+                alvo, comparar = float(valor), serie.to_numpy(dtype=float)
+            except ValueError:
+                return np.zeros(len(serie), dtype=bool)
+        elif pd.api.types.is_datetime64_any_dtype(serie):
+            alvo, comparar = valor, self.exibicao[coluna].to_numpy()
+        else:
+            alvo, comparar = valor.lower(), self.texto[coluna].to_numpy()
+
+        if op not in COMPARACOES:
+            return np.ones(len(serie), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            return np.asarray(COMPARACOES[op](comparar, alvo), dtype=bool)
+
+    def mascara_consulta(self, filter_query):
+        """Máscara para o filter_query da DataTable (termos unidos por &&)."""
+        mascara = np.ones(len(self), dtype=bool)
+        for termo in (filter_query or "").split(" && "):
+            encontrado = _TERMO.match(termo.strip())
+            if not encontrado or encontrado["coluna"] not in self.colunas:
+                continue
+            mascara &= self._mascara_termo(encontrado["coluna"], encontrado["op"], encontrado["valor"])
+        return mascara
+
+    def pagina(self, mascara, pagina, tamanho, sort_by=None, filter_query=None):
+        """Devolve (linhas da página, total de linhas, número de páginas)."""
+        if filter_query:
+            mascara = mascara & self.mascara_consulta(filter_query)
+        ordem = self.ordem_natural
+        if sort_by:
+            ordem = self.ordens.get((sort_by[0]["column_id"], sort_by[0]["direction"]), ordem)
+
+        selecionadas = ordem[mascara[ordem]]
+        total = len(selecionadas)
+        paginas = max(-(-total // tamanho), 1)
+        pagina = min(pagina or 0, paginas - 1)
+        fatia = selecionadas[pagina * tamanho:(pagina + 1) * tamanho]
+        return self.exibicao.iloc[fatia].to_dict("records"), total, paginas
@@ -0,0 +1,158 @@
+import os
+import time
+from functools import partial
+
+from dash import DiskcacheManager
+
+from src import config, dados
+
+# ============================================================
+# Gerenciador de callbacks em segundo plano (análises pesadas)
+# ============================================================
+# Análises que passam do timeout do gunicorn rodam como "background
+# callbacks" do Dash. A fila fica em disco (diskcache, na pasta de cache)
+# e é compartilhada por todos os workers da máquina, sem broker externo:
+#   - cada tarefa roda em um processo separado, mas no máximo
+#     DASHBOARD_TAREFAS_MAX ao mesmo tempo; as demais esperam vaga;
+#   - tarefas com a mesma chave (mesmas entradas e mesma versão dos dados)
+#     não são duplicadas: quem chega depois acompanha o processo que já
+#     está rodando, e o resultado fica guardado por DASHBOARD_TAREFAS_EXPIRA.
+#
+# As vagas são chaves "tarefas:vaga:<i>" com o PID do processo que a ocupa.
+# O processo pode ser morto antes de liberar a vaga (cancelamento, ou o
+# terminate_job que o Dash chama depois de ler o resultado); por isso uma
+# vaga cujo PID não está mais vivo é considerada livre, e toda vaga expira
+# em DASHBOARD_TAREFAS_EXPIRA como garantia contra reuso de PID.
+TAREFAS_DIR = os.path.join(config.CACHE_DIR, "tarefas")
+PREFIXO_VAGA = "tarefas:vaga:"
+ESPERA_VAGA = 0.5
+
+
+def _pid_vivo(pid):
+    import psutil
+
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+def ocupar_vaga(handle, vagas, expire):
+    """Espera uma vaga livre e a marca com o PID deste processo; devolve a chave."""
+    pid = os.getpid()
+    while True:
+        with handle.transact():
+            for i in range(vagas):
+                chave = f"{PREFIXO_VAGA}{i}"
+                dono = handle.get(chave)
+                if dono is None or dono == pid or not _pid_vivo(dono):
+                    handle.set(chave, pid, expire=expire)
+                    return chave
+        time.sleep(ESPERA_VAGA)
+
+
+def liberar_vaga(handle, chave):
+    with handle.transact():
+        if handle.get(chave) == os.getpid():
+            handle.delete(chave)
+
+
+def _executar_com_vaga(job_fn, handle, vagas, expire, result_key, progress_key, args, context):
+    # Roda no processo filho: espera uma vaga antes de começar a tarefa
+    chave = ocupar_vaga(handle, vagas, expire)
+    try:
+        job_fn(result_key, progress_key, args, context)
+    finally:
+        liberar_vaga(handle, chave)
+
+
+class GerenciadorTarefas(DiskcacheManager):
+    def __init__(self, pasta, vagas, expire):
+        import diskcache
+
+        os.makedirs(pasta, exist_ok=True)
+        self.vagas = vagas
+        super().__init__(
+            cache=diskcache.Cache(pasta),
+            cache_by=[dados.versao_dados],
+            expire=expire,
+        )
+
+    def make_job_fn(self, fn, progress, key=None):
+        job_fn = super().make_job_fn(fn, progress, key)
+        return partial(_executar_com_vaga, job_fn, self.handle, self.vagas, self.expire)
+
+    def call_job_fn(self, key, job_fn, args, context):
+        # Deduplicação: a mesma chave só tem um processo rodando por vez
+        # (trava via diskcache.Lock, e não transação SQLite, porque o
+        # processo filho é criado aqui dentro e não pode herdar a transação)
+        from diskcache import Lock
+
+        chave_job = f"tarefas:job:{key}"
+        with Lock(self.handle, "tarefas:trava-fila", expire=30):
+            pid = self.handle.get(chave_job)
+            if pid is not None and self.job_running(pid):
+                return pid
+            pid = super().call_job_fn(key, job_fn, args, context)
+            self.handle.set(chave_job, pid, expire=self.expire)
+        return pid
+
+
+def disponivel():
+    try:
+        import diskcache, multiprocess, psutil  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def criar_gerenciador():
+    try:
+        return GerenciadorTarefas(TAREFAS_DIR, config.TAREFAS_MAX, config.TAREFAS_EXPIRA)
+    except ImportError as e:
+        print(f"⚠️ AVISO (tarefas): callbacks em segundo plano indisponíveis ({e}).")
+        return None
+
+
+# ============================================================
+# Verificação: vagas de tarefas canceladas voltam a ficar livres
+# ============================================================
+#   python -m src.tarefas
+def _dormir(_result_key, _progress_key, segundos, _context):
+    time.sleep(segundos)
+
+
+def verificar_cancelamento(vagas=2, pasta=None, timeout=15):
+    """Mata `vagas` tarefas no meio (como o botão cancelar) e confere que a seguinte ainda começa."""
+    import tempfile
+
+    from multiprocess import Process
+
+    gerenciador = GerenciadorTarefas(pasta or tempfile.mkdtemp(prefix="tarefas-"), vagas, expire=600)
+    rodar = partial(_executar_com_vaga, _dormir, gerenciador.handle, gerenciador.vagas, gerenciador.expire)
+
+    for _ in range(vagas):
+        processo = Process(target=rodar, args=(None, None, 60, None))
+        processo.start()
+        limite = time.time() + timeout
+        while processo.pid not in (gerenciador.handle.get(f"{PREFIXO_VAGA}{i}") for i in range(vagas)):
+            if time.time() > limite:
+                return False
+            time.sleep(0.05)
+        gerenciador.terminate_job(processo.pid)
+
+    seguinte = Process(target=rodar, args=(None, None, 0, None))
+    seguinte.start()
+    seguinte.join(timeout)
+    if seguinte.is_alive():
+        seguinte.kill()
+        return False
+    return seguinte.exitcode == 0
+
+
+if __name__ == "__main__":
+    if verificar_cancelamento(config.TAREFAS_MAX):
+        print(f"✅ Tarefa seguinte começou depois de {config.TAREFAS_MAX} cancelamentos.")
+    else:
+        print(f"ERRO CRÍTICO (tarefas): nenhuma vaga livre depois de {config.TAREFAS_MAX} cancelamentos.")
+        raise SystemExit(1)
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from src import series
+
+# ============================================================
+# Tendências: médias móveis de matrículas e titulações
+# ============================================================
+# Para cada (Programa, Curso) as contagens mensais ficam em matrizes densas
+# grupos x meses (uma por série: matrículas pelo mês da primeira matrícula,
+# titulações pelo mês da defesa), junto com a soma acumulada de cada linha.
+# A média móvel de w meses no mês t é (acumulado[t] - acumulado[t - w]) / w,
+# calculada para todas as linhas e meses de uma vez.
+#
+# Dados novos entram por `acrescentar`: as contagens são somadas no lugar e
+# só a cauda (do mês mais antigo tocado em diante) dos acumulados e das
+# médias móveis é recalculada; o histórico anterior fica como está.
+JANELAS = [3, 6, 12]
+SERIES = ["Matrículas", "Titulações"]
+
+
+def _ordinais(datas):
+    datas = pd.to_datetime(pd.Series(datas), errors="coerce")
+    return datas.dt.year * 12 + datas.dt.month - 1
+
+
+class Tendencias:
+    """Séries mensais densas por (Programa, Curso) com médias móveis incrementais."""
+
+    def __init__(self, janelas=JANELAS, nomes_series=SERIES):
+        self.janelas = list(janelas)
+        self.nomes_series = list(nomes_series)
+        self.grupos = []
+        self._linhas = {}
+        self.inicio = None
+        self.contagens = {s: np.zeros((0, 0), dtype=np.int64) for s in self.nomes_series}
+        # Acumulado com uma coluna 0 à esquerda: acumulado[:, t + 1] = soma até o mês t
+        self.acumulado = {s: np.zeros((0, 1), dtype=np.int64) for s in self.nomes_series}
+        self.moveis = {(s, w): np.zeros((0, 0)) for s in self.nomes_series for w in self.janelas}
+
+    @property
+    def n_meses(self):
+        return self.contagens[self.nomes_series[0]].shape[1]
+
+    @property
+    def meses(self):
+        if self.inicio is None:
+            return pd.DatetimeIndex([])
+        return series._meses(self.inicio, self.inicio + self.n_meses - 1)
+
+    def linhas(self, programas=None, cursos=None):
+        """Índices e nomes dos grupos que passam pelos filtros de Programa e Curso."""
+        escolhidos = [
+            (i, grupo) for i, grupo in enumerate(self.grupos)
+            if (not programas or grupo[0] in programas) and (not cursos or grupo[1] in cursos)
+        ]
+        return [i for i, _ in escolhidos], [grupo for _, grupo in escolhidos]
+
+    def _crescer(self, novos_grupos, primeiro, ultimo):
+        # Aumenta as matrizes para caber novos grupos (linhas) e meses (colunas);
+        # devolve a primeira coluna cujo acumulado/média precisa ser refeito
+        for grupo in novos_grupos:
+            self._linhas[grupo] = len(self.grupos)
+            self.grupos.append(grupo)
+        if self.inicio is None:
+            self.inicio = primeiro
+        antes = max(self.inicio - primeiro, 0)
+        depois = max(ultimo - (self.inicio + self.n_meses - 1), 0)
+        linhas_extra = len(self.grupos) - self.contagens[self.nomes_series[0]].shape[0]
+        n_antigo = self.n_meses
+        for s in self.nomes_series:
+            self.contagens[s] = np.pad(self.contagens[s], ((0, linhas_extra), (antes, depois)))
+        self.inicio -= antes
+        # Meses novos antes do início deslocam tudo: refaz desde o começo
+        return 0 if antes else n_antigo
+
+    def acrescentar(self, serie, datas, programas, cursos):
+        """Soma eventos (um por linha) à `serie` e atualiza só a cauda das médias."""
+        meses = _ordinais(datas)
+        grupos = pd.Series(list(zip(programas, cursos)), index=meses.index)
+        validos = meses.notna() & pd.Series(programas, index=meses.index).notna() & pd.Series(cursos, index=meses.index).notna()
+        if not validos.any():
+            return
+        meses, grupos = meses[validos].astype(int).to_numpy(), grupos[validos]
+
+        novos = [g for g in dict.fromkeys(grupos) if g not in self._linhas]
+        coluna = self._crescer(novos, int(meses.min()), int(meses.max()))
+        linhas = grupos.map(self._linhas).to_numpy()
+        np.add.at(self.contagens[serie], (linhas, meses - self.inicio), 1)
+        self._recalcular(min(coluna, int(meses.min()) - self.inicio))
+
+    def _recalcular(self, coluna):
+        # Acumulados e médias móveis dos meses `coluna` em diante (todas as linhas)
+        n = self.n_meses
+        for s in self.nomes_series:
+            anterior = self.acumulado[s]
+            acumulado = np.zeros((len(self.grupos), n + 1), dtype=np.int64)
+            acumulado[:anterior.shape[0], :coluna + 1] = anterior[:, :coluna + 1]
+            acumulado[:, coluna + 1:] = acumulado[:, [coluna]] + self.contagens[s][:, coluna:].cumsum(axis=1)
+            self.acumulado[s] = acumulado
+
+            fim = np.arange(coluna, n) + 1
+            for w in self.janelas:
+                movel = np.zeros((len(self.grupos), n))
+                antigo = self.moveis[(s, w)]
+                movel[:antigo.shape[0], :min(coluna, antigo.shape[1])] = antigo[:, :coluna]
+                movel[:, coluna:] = (acumulado[:, fim] - acumulado[:, np.maximum(fim - w, 0)]) / w
+                self.moveis[(s, w)] = movel
+
+    def media_movel(self, serie, janela, programas=None, cursos=None):
+        """(meses, nomes, matriz) da média móvel mensal dos grupos filtrados."""
+        indices, grupos = self.linhas(programas, cursos)
+        return self.meses, [f"{programa} · {curso}" for programa, curso in grupos], self.moveis[(serie, janela)][indices]